@@ -11,17 +11,44 @@
 - ProductInfo: Информационный список о продуктах
 - Parameter: Список имен параметров
 - ProductParameter: Список параметров
+- PriceListSource: Список источников прайс-листов
 - Contact: Список контактов пользователя
 - Order: Список заказов
 - OrderItem: Список заказанных позиций
 """
 
 from django.contrib import admin
-from .models import Shop, Category, Product, ProductInfo, Parameter, ProductParameter, Contact, Order, OrderItem
+from .models import Shop, Category, Product, ProductInfo, Parameter, ProductParameter, PriceListSource, Contact, Order, OrderItem
+from .signals import notify_offers_changed, notify_parameters_changed, offers_by_shop
+
+
+class OffersDeleteAdminMixin:
+    """
+    Удаление в админке отправляет offers_changed для удаленных предложений:
+    обновляются фасеты, витрина и версии каталога.
+
+    offers_lookup - путь от предложения к удаляемому объекту.
+    """
+
+    offers_lookup = 'id'
+
+    def _offers_by_shop(self, queryset):
+        offers = ProductInfo.objects.filter(**{f'{self.offers_lookup}__in': queryset.values('pk')})
+        return offers_by_shop(offers.values_list('id', flat=True))
+
+    def delete_model(self, request, obj):
+        shops = self._offers_by_shop(type(obj).objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+        notify_offers_changed(type(obj), shops)
+
+    def delete_queryset(self, request, queryset):
+        shops = self._offers_by_shop(queryset)
+        super().delete_queryset(request, queryset)
+        notify_offers_changed(queryset.model, shops)
 
 
 @admin.register(Shop)
-class ShopAdmin(admin.ModelAdmin):
+class ShopAdmin(OffersDeleteAdminMixin, admin.ModelAdmin):
     """
     Административный интерфейс для модели Shop.
     
@@ -34,9 +61,10 @@ class ShopAdmin(admin.ModelAdmin):
     """
     list_display = ('id', 'name', 'url')
     search_fields = ('name',)
+    offers_lookup = 'shop_id'
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(OffersDeleteAdminMixin, admin.ModelAdmin):
     """
     Административный интерфейс для модели Category.
     
@@ -50,9 +78,10 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ('id', 'name')
     search_fields = ('name',)
     filter_horizontal = ('shops',)
+    offers_lookup = 'product__category_id'
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(OffersDeleteAdminMixin, admin.ModelAdmin):
     """
     Административный интерфейс для модели Product.
     
@@ -67,9 +96,10 @@ class ProductAdmin(admin.ModelAdmin):
     list_display = ('id', 'name', 'category')
     list_filter = ('category',)
     search_fields = ('name',)
+    offers_lookup = 'product_id'
 
 @admin.register(ProductInfo)
-class ProductInfoAdmin(admin.ModelAdmin):
+class ProductInfoAdmin(OffersDeleteAdminMixin, admin.ModelAdmin):
     """
     Административный интерфейс для модели ProductInfo.
     
@@ -119,6 +149,39 @@ class ProductParameterAdmin(admin.ModelAdmin):
     list_filter = ('parameter',)
     search_fields = ('value',)
 
+    # Изменения параметров обновляют поисковый индекс, фасеты и витрину каталога
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        notify_parameters_changed([obj.product_info_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        notify_parameters_changed([obj.product_info_id])
+
+    def delete_queryset(self, request, queryset):
+        product_info_ids = set(queryset.values_list('product_info_id', flat=True))
+        super().delete_queryset(request, queryset)
+        notify_parameters_changed(product_info_ids)
+
+@admin.register(PriceListSource)
+class PriceListSourceAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс для модели PriceListSource.
+    
+    Отображает колонки:
+    - id: Идентификатор источника
+    - url: Адрес прайс-листа
+    - shop: Магазин
+    - imported_at: Время последнего импорта
+    
+    Фильтрация доступна по магазину.
+    Поиск осуществляется по адресу прайс-листа.
+    """
+    list_display = ('id', 'url', 'shop', 'imported_at')
+    list_filter = ('shop',)
+    search_fields = ('url',)
+
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
     """
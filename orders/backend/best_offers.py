@@ -0,0 +1,63 @@
+"""
+Лучшие предложения товаров: самое дешевое предложение в наличии среди
+всех магазинов.
+
+Лучшее предложение каждого товара выбирается в базе одним запросом
+DISTINCT ON (product_id) ... ORDER BY product_id, price, id по индексу
+витрины catalogentry_best_offer (product_id, price, product_info) для
+предложений в наличии.
+
+Предложения одного товара (GET /api/products/<id>/offers) кэшируются
+до изменения версии каталога (см. backend.catalog_version).
+"""
+
+from django.core.cache import cache
+
+from .catalog_version import get_catalog_version
+from .models import CatalogEntry, Product
+from .serializers_fast import CATALOG_ENTRY_VALUES
+
+
+BEST_OFFER_QUERY_PARAM = 'best_offer'
+
+PRODUCT_OFFERS_TIMEOUT = 60 * 60
+
+
+def best_offers(queryset):
+    """
+    Оставляет в выборке только самое дешевое предложение каждого товара.
+
+    При равной цене выбирается предложение с меньшим id.
+
+    Args:
+        queryset: Предложения в наличии (CatalogEntry или ProductInfo)
+
+    Returns:
+        QuerySet: Предложения той же модели без сортировки и выбранных полей
+    """
+    cheapest = queryset.order_by('product_id', 'price', 'pk').distinct('product_id').values('pk')
+    return queryset.model.objects.filter(pk__in=cheapest)
+
+
+def get_product_offers(product_id):
+    """
+    Возвращает предложения товара в наличии, начиная с самого дешевого.
+
+    Args:
+        product_id (int): Товар
+
+    Returns:
+        list: Строки витрины .values(*CATALOG_ENTRY_VALUES) или None, если товара нет
+    """
+    key = f'product_offers:{get_catalog_version()}:{product_id}'
+    offers = cache.get(key)
+    if offers is None:
+        offers = list(
+            CatalogEntry.objects.filter(product_id=product_id, quantity__gt=0)
+            .order_by('price', 'product_info_id')
+            .values(*CATALOG_ENTRY_VALUES)
+        )
+        if not offers and not Product.objects.filter(pk=product_id).exists():
+            return None
+        cache.set(key, offers, PRODUCT_OFFERS_TIMEOUT)
+    return offers
@@ -0,0 +1,137 @@
+"""
+Витрина каталога (CatalogEntry) для списка товаров.
+
+Список товаров читает готовые строки витрины одним запросом вместо
+соединения ProductInfo, Product, ProductParameter и ProductImage на
+каждый запрос. Витрина обновляется инкрементально:
+
+- данные предложений - множественным INSERT ... ON CONFLICT по
+  сигналу offers_changed (импорт, изменение остатков, редактирование),
+  строки удаленных предложений удаляются;
+- при изменении только остатков и цен - одним UPDATE;
+- изображения - при сохранении товара и его изображений: URL
+  изображений и миниатюр вычисляются в Python один раз при записи,
+  а не при каждом запросе.
+"""
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import CatalogEntry, Parameter, Product, ProductInfo, ProductParameter
+from .serializers_images import ProductImageSerializer
+
+
+CATALOG_ENTRY_BATCH_SIZE = 1000
+
+# Изменения этих полей обновляют витрину без пересборки строк
+STOCK_FIELDS = {'quantity', 'price'}
+
+
+def refresh_catalog_entries(product_info_ids, fields=None, batch_size=CATALOG_ENTRY_BATCH_SIZE):
+    """
+    Обновляет строки витрины предложений.
+
+    Args:
+        product_info_ids: Предложения
+        fields (set): Измененные поля (None - предложения могли измениться целиком)
+        batch_size (int): Размер пакета
+    """
+    catalog_entry_table = CatalogEntry._meta.db_table
+    product_info_table = ProductInfo._meta.db_table
+
+    if fields is not None and fields <= STOCK_FIELDS:
+        product_info_ids = sorted(product_info_ids)
+        with connection.cursor() as cursor:
+            for start in range(0, len(product_info_ids), batch_size):
+                cursor.execute(f'''
+                    UPDATE {catalog_entry_table} ce SET quantity = pi.quantity, price = pi.price
+                    FROM {product_info_table} pi
+                    WHERE ce.product_info_id = pi.id AND pi.id = ANY(%s)
+                ''', [product_info_ids[start:start + batch_size]])
+        return
+
+    default = Product()
+    image_columns = ('image', 'image_url', 'thumbnail_url', 'additional_images')
+    columns = (
+        'product_id', 'category_id', 'shop_id', 'product_name', 'model', 'external_id',
+        'quantity', 'price', 'price_rrc', 'parameters',
+    )
+    # Изображения остаются прежними, пока предложение относится к тому же товару
+    updates = ', '.join(
+        [f'{column} = EXCLUDED.{column}' for column in columns]
+        + [f'{column} = CASE WHEN ce.product_id = EXCLUDED.product_id THEN ce.{column} ELSE EXCLUDED.{column} END'
+           for column in image_columns]
+    )
+    sql = f'''
+        INSERT INTO {catalog_entry_table} AS ce (product_info_id, {', '.join(columns)}, {', '.join(image_columns)})
+        SELECT pi.id, p.id, p.category_id, pi.shop_id, p.name, pi.model, pi.external_id,
+               pi.quantity, pi.price, pi.price_rrc,
+               coalesce((
+                   SELECT jsonb_agg(jsonb_build_array(par.name, pp.value) ORDER BY pp.id)
+                   FROM {ProductParameter._meta.db_table} pp
+                   JOIN {Parameter._meta.db_table} par ON par.id = pp.parameter_id
+                   WHERE pp.product_info_id = pi.id
+               ), '[]'::jsonb),
+               NULL, %(image_url)s, %(thumbnail_url)s, '[]'::jsonb
+        FROM {product_info_table} pi
+        JOIN {Product._meta.db_table} p ON p.id = pi.product_id
+        WHERE pi.id = ANY(%(ids)s)
+        ON CONFLICT (product_info_id) DO UPDATE SET {updates}
+        RETURNING ce.product_id
+    '''
+
+    product_ids = set()
+    product_info_ids = sorted(product_info_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(product_info_ids), batch_size):
+            cursor.execute(sql, {
+                'ids': product_info_ids[start:start + batch_size],
+                'image_url': default.image_url,
+                'thumbnail_url': default.thumbnail_url,
+            })
+            product_ids.update(product_id for product_id, in cursor.fetchall())
+            # Строки удаленных предложений
+            cursor.execute(f'''
+                DELETE FROM {catalog_entry_table} ce
+                WHERE ce.product_info_id = ANY(%s)
+                  AND NOT EXISTS (SELECT 1 FROM {product_info_table} pi WHERE pi.id = ce.product_info_id)
+            ''', [product_info_ids[start:start + batch_size]])
+
+    with_images = Product.objects.filter(id__in=product_ids).filter(
+        Q(image__gt='') | Q(additional_images__isnull=False)
+    ).order_by().values_list('id', flat=True).distinct()
+    refresh_product_images(with_images)
+
+
+def refresh_product_entries(product_ids):
+    """
+    Обновляет в витрине данные товаров: название, категорию и изображения.
+
+    Args:
+        product_ids: Товары
+    """
+    product_ids = list(product_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(f'''
+            UPDATE {CatalogEntry._meta.db_table} ce SET product_name = p.name, category_id = p.category_id
+            FROM {Product._meta.db_table} p
+            WHERE ce.product_id = p.id AND p.id = ANY(%s)
+        ''', [product_ids])
+    refresh_product_images(product_ids)
+
+
+def refresh_product_images(product_ids):
+    """
+    Записывает в витрину URL изображений товаров.
+
+    Args:
+        product_ids: Товары
+    """
+    products = Product.objects.filter(id__in=list(product_ids)).prefetch_related('additional_images')
+    for product in products:
+        CatalogEntry.objects.filter(product_id=product.id).update(
+            image=product.image.url if product.image else None,
+            image_url=product.image_url,
+            thumbnail_url=product.thumbnail_url,
+            additional_images=ProductImageSerializer(product.additional_images.all(), many=True).data,
+        )
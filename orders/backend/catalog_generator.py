@@ -0,0 +1,104 @@
+"""
+Генератор синтетических прайс-листов в формате shop1.yaml.
+
+Используется для нагрузочного тестирования импорта: позволяет получить
+прайс-листы с любым числом магазинов, категорий, товаров и параметров.
+Товары записываются в файл по одному, поэтому размер прайс-листа
+не ограничен памятью. При одинаковом seed результат воспроизводим.
+"""
+
+import os
+import random
+
+from .price_list import dump_good, dump_price_list_header
+
+
+# Идентификаторы синтетических категорий начинаются с этого значения,
+# чтобы не пересекаться с категориями реальных прайс-листов
+CATEGORY_ID_BASE = 900000
+
+SHOP_NAME_PREFIX = 'Synthetic shop'
+PARAMETER_NAME_PREFIX = 'Synthetic parameter'
+
+BRANDS = ('Apple', 'Samsung', 'Xiaomi', 'Huawei', 'Sony', 'LG', 'Lenovo', 'Asus', 'Philips', 'Bosch')
+KINDS = ('Смартфон', 'Планшет', 'Ноутбук', 'Телевизор', 'Наушники', 'Монитор', 'Часы', 'Колонка')
+COLORS = ('черный', 'белый', 'серебристый', 'золотистый', 'красный', 'синий', 'зеленый')
+
+
+def category_name(index):
+    return f'Категория {index + 1}'
+
+
+def parameter_name(index):
+    return f'{PARAMETER_NAME_PREFIX} {index + 1}'
+
+
+def product_name(index):
+    """
+    Детерминированное название товара: одни и те же товары
+    встречаются в прайс-листах разных магазинов.
+    """
+    brand = BRANDS[index % len(BRANDS)]
+    kind = KINDS[index // len(BRANDS) % len(KINDS)]
+    color = COLORS[index % len(COLORS)]
+    return f'{kind} {brand} M{index + 1} ({color})'
+
+
+def generate_price_list(file, shop, categories, goods, parameters, seed=0):
+    """
+    Записывает синтетический прайс-лист в файл.
+
+    Args:
+        file: Текстовый файл для записи
+        shop (str): Название магазина
+        categories (int): Число категорий
+        goods (int): Число товаров
+        parameters (int): Число параметров у каждого товара
+        seed (int): Начальное значение генератора случайных чисел
+    """
+    rng = random.Random(seed)
+    # Пул параметров больше числа параметров товара, чтобы наборы различались
+    pool = max(parameters * 2, parameters + 1)
+
+    file.write(dump_price_list_header(shop, [
+        {'id': CATEGORY_ID_BASE + index, 'name': category_name(index)}
+        for index in range(categories)
+    ]))
+
+    for index in range(goods):
+        price = rng.randrange(500, 200000, 10)
+        good = {
+            'id': index + 1,
+            'category': CATEGORY_ID_BASE + index % categories,
+            'model': f'{BRANDS[index % len(BRANDS)].lower()}/m{index + 1}',
+            'name': product_name(index),
+            'price': price,
+            'price_rrc': int(price * rng.uniform(1.05, 1.2)),
+            'quantity': rng.randint(0, 100),
+            'parameters': {
+                parameter_name(number): (
+                    round(rng.uniform(1, 100), 1) if number % 2 else rng.choice(COLORS)
+                )
+                for number in sorted(rng.sample(range(pool), parameters))
+            },
+        }
+        file.write(dump_good(good))
+
+
+def write_price_lists(output_dir, shops, categories, goods, parameters, seed=0):
+    """
+    Генерирует по прайс-листу на каждый магазин.
+
+    Returns:
+        list: Пути к созданным файлам
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for index in range(shops):
+        path = os.path.join(output_dir, f'shop_{index + 1}.yaml')
+        with open(path, 'w', encoding='utf-8') as file:
+            generate_price_list(
+                file, f'{SHOP_NAME_PREFIX} {index + 1}', categories, goods, parameters, seed=seed + index
+            )
+        paths.append(path)
+    return paths
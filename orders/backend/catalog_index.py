@@ -0,0 +1,259 @@
+"""
+Индекс каталога в памяти процесса (NumPy).
+
+Для самых частых запросов списка товаров (фильтр по категории и
+магазину, сортировка по цене или id) индекс в каждом веб-процессе
+хранит идентификаторы, цены, остатки, магазины и категории предложений
+витрины в массивах NumPy. Отбор и сортировка выполняются векторно в
+памяти, из базы загружаются только строки витрины запрошенной страницы
+по первичному ключу.
+
+Индекс сверяется с версией каталога (см. backend.catalog_version) не
+чаще раза в CATALOG_INDEX_CHECK_INTERVAL секунд. Если версия изменилась,
+из базы заново читаются предложения только тех магазинов, версии
+которых изменились; остальная часть индекса переиспользуется. Список
+товаров передает версию каталога, уже прочитанную для ETag: индекс
+другой версии сверяется сразу, без ожидания интервала, а ответ по
+индексу получает ETag версии индекса (CatalogIndex.catalog_version).
+
+При CATALOG_SNAPSHOT_ENABLED процесс строит индекс не из базы, а
+отображает в память общий для всех процессов снимок индекса (см.
+backend.catalog_snapshot) и дочитывает только магазины, изменившиеся
+после записи снимка.
+
+Индекс включается настройкой CATALOG_INDEX_ENABLED и требует numpy;
+без него список товаров читается из базы как обычно.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from .catalog_version import get_catalog_version, get_shop_catalog_versions
+from .models import CatalogEntry, Shop
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+INDEX_COLUMNS = ('product_info_id', 'price', 'quantity', 'shop_id', 'category_id')
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _load_rows(shop_ids=None):
+    """
+    Читает из витрины столбцы индекса.
+
+    Args:
+        shop_ids: Магазины (None - все)
+
+    Returns:
+        numpy.ndarray: Массив строк (N, len(INDEX_COLUMNS))
+    """
+    entries = CatalogEntry.objects.order_by()
+    if shop_ids is not None:
+        entries = entries.filter(shop_id__in=list(shop_ids))
+    rows = list(entries.values_list(*INDEX_COLUMNS).iterator(chunk_size=10000))
+    return np.array(rows, dtype=np.int64).reshape(-1, len(INDEX_COLUMNS))
+
+
+class CatalogIndex:
+    """
+    Снимок предложений витрины в массивах NumPy, упорядоченных по id.
+
+    Attributes:
+        ids, prices, quantities, shop_ids, category_ids: Столбцы предложений
+        price_order: Позиции предложений в порядке (price, id)
+        version: Глобальная версия каталога на момент чтения
+        shop_versions (dict): Магазин -> версия каталога магазина
+    """
+
+    # Массивы индекса (столбцы снимка, см. backend.catalog_snapshot)
+    ARRAYS = ('ids', 'prices', 'quantities', 'shop_ids', 'category_ids', 'price_order')
+
+    def __init__(self, rows, version, shop_versions):
+        rows = rows[np.argsort(rows[:, 0], kind='stable')]
+        self.ids = rows[:, 0].copy()
+        self.prices = rows[:, 1].copy()
+        self.quantities = rows[:, 2].astype(np.int32)
+        self.shop_ids = rows[:, 3].astype(np.int32)
+        self.category_ids = rows[:, 4].copy()
+        self.price_order = np.lexsort((self.ids, self.prices))
+        self.version = version
+        self.shop_versions = shop_versions
+        self.checked_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_arrays(cls, arrays, version, shop_versions):
+        """
+        Индекс из готовых массивов ARRAYS без сортировки и копирования.
+
+        Args:
+            arrays (dict): Имя массива -> numpy.ndarray (в том числе только для чтения)
+            version: Глобальная версия каталога
+            shop_versions (dict): Магазин -> версия каталога магазина
+        """
+        index = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(index, name, arrays[name])
+        index.version = version
+        index.shop_versions = shop_versions
+        index.checked_at = time.monotonic()
+        return index
+
+    def arrays(self):
+        """
+        Массивы индекса по именам из ARRAYS.
+        """
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def catalog_version(self, shop_id=None):
+        """
+        Версия каталога, по которой построен индекс (для ETag ответов по индексу).
+
+        Args:
+            shop_id (int): Магазин (None - весь каталог)
+
+        Returns:
+            str: Версия магазина или глобальная версия индекса
+        """
+        if shop_id is None:
+            return self.version
+        return self.shop_versions.get(shop_id, self.version)
+
+    @classmethod
+    def build(cls):
+        """
+        Строит индекс по всей витрине.
+        """
+        # Версии читаются до данных: изменение во время чтения приведет к повторной проверке
+        version = get_catalog_version()
+        shop_versions = get_shop_catalog_versions(Shop.objects.values_list('id', flat=True))
+        return cls(_load_rows(), version, shop_versions)
+
+    def patched(self):
+        """
+        Возвращает индекс, в котором перечитаны предложения магазинов с новыми версиями.
+        """
+        version = get_catalog_version()
+        shop_versions = get_shop_catalog_versions(Shop.objects.values_list('id', flat=True))
+        changed = [
+            shop_id for shop_id in set(shop_versions) | set(self.shop_versions)
+            if shop_versions.get(shop_id) != self.shop_versions.get(shop_id)
+        ]
+        if not changed:
+            # Изменение без версий магазинов (например, категорий): данные индекса не меняются
+            self.version, self.checked_at = version, time.monotonic()
+            return self
+
+        kept = ~np.isin(self.shop_ids, changed)
+        current = np.column_stack((
+            self.ids[kept], self.prices[kept], self.quantities[kept], self.shop_ids[kept], self.category_ids[kept],
+        )).astype(np.int64)
+        return self.__class__(np.concatenate((current, _load_rows(changed))), version, shop_versions)
+
+    def select(self, fields, values, direction, limit, category_id=None, shop_id=None):
+        """
+        Выбирает идентификаторы предложений в наличии для страницы KeysetPagination.
+
+        Args:
+            fields (tuple): Ключ сортировки: ('product_info_id',) или ('price', 'product_info_id'),
+                с '-' для убывания
+            values (list): Значения ключа курсора или None
+            direction (str): 'next', 'prev' или None (первая страница)
+            limit (int): Число строк
+            category_id (int): Категория
+            shop_id (int): Магазин
+
+        Returns:
+            list: Идентификаторы предложений в порядке выдачи (для 'prev' - в обратном)
+        """
+        by_price = len(fields) == 2
+        # Порядок выборки: по возрастанию ключа или по убыванию
+        ascending = fields[0].startswith('-') == (direction == 'prev')
+
+        mask = self.quantities > 0
+        if category_id is not None:
+            mask &= self.category_ids == category_id
+        if shop_id is not None:
+            mask &= self.shop_ids == shop_id
+        if values is not None:
+            product_info_id = values[-1]
+            after = np.greater if ascending else np.less
+            if by_price:
+                price = values[0]
+                mask &= after(self.prices, price) | ((self.prices == price) & after(self.ids, product_info_id))
+            else:
+                mask &= after(self.ids, product_info_id)
+
+        if by_price:
+            positions = self.price_order[mask[self.price_order]]
+        else:
+            positions = np.flatnonzero(mask)
+        positions = positions[:limit] if ascending else positions[::-1][:limit]
+        return self.ids[positions].tolist()
+
+
+def get_catalog_index(version=None):
+    """
+    Возвращает актуальный индекс каталога процесса.
+
+    Args:
+        version (str): Известная вызывающему глобальная версия каталога;
+            индекс другой версии сверяется, не дожидаясь CATALOG_INDEX_CHECK_INTERVAL
+
+    Returns:
+        CatalogIndex: Индекс или None, если индекс выключен или numpy не установлен
+    """
+    global _index
+    if np is None or not getattr(settings, 'CATALOG_INDEX_ENABLED', False):
+        return None
+
+    interval = getattr(settings, 'CATALOG_INDEX_CHECK_INTERVAL', 1.0)
+
+    def needs_check(index):
+        return (
+            index is None
+            or time.monotonic() - index.checked_at >= interval
+            or version not in (None, index.version)
+        )
+
+    index = _index
+    if not needs_check(index):
+        return index
+
+    with _index_lock:
+        index = _index
+        if needs_check(index):
+            current = get_catalog_version()
+            if index is None or current != index.version:
+                index = _refreshed(index, current)
+            else:
+                index.checked_at = time.monotonic()
+        _index = index
+    return index
+
+
+def _refreshed(index, version):
+    # Снимок текущей версии используется как есть; иначе перечитываются
+    # только изменившиеся магазины - индекса процесса или более нового снимка
+    from .catalog_snapshot import get_catalog_snapshot
+
+    snapshot = get_catalog_snapshot()
+    if snapshot is not None and (index is None or snapshot.version != index.version):
+        if snapshot.version == version:
+            snapshot.checked_at = time.monotonic()
+            return snapshot
+        if index is None or int(snapshot.version) > int(index.version):
+            index = snapshot
+    if index is None:
+        return CatalogIndex.build()
+    return index.patched()
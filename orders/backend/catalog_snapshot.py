@@ -0,0 +1,231 @@
+"""
+Снимок индекса каталога в файле, общий для веб-процессов.
+
+Celery-задача (backend.tasks_catalog) после изменений предложений
+записывает массивы индекса каталога (см. backend.catalog_index) в
+двоичный файл CATALOG_SNAPSHOT_DIR/catalog-<версия>.bin:
+
+    SNAPSHOT_MAGIC | длина заголовка (uint32) | заголовок JSON | массивы
+
+Заголовок содержит версии каталога и для каждого массива смещение,
+тип и длину; массивы фиксированной ширины выровнены по SNAPSHOT_ALIGN
+байт. Веб-процессы отображают файл в память только для чтения (mmap) и
+используют массивы как numpy.ndarray без копирования и разбора: страницы
+файла в кэше ОС общие для всех процессов, а запуск процесса и переход на
+новый снимок не требуют чтения витрины из базы.
+
+Файл указателя current содержит имя актуального снимка. Снимок и
+указатель пишутся во временные файлы и переименовываются атомарно
+(os.replace), поэтому процесс всегда видит целый снимок - прежний или
+новый. Прежний снимок удаляется при записи следующего.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .catalog_index import CatalogIndex, np
+from .catalog_version import get_catalog_version
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_MAGIC = b'CATSNAP1'
+SNAPSHOT_ALIGN = 64
+CURRENT_POINTER = 'current'
+SCHEDULED_KEY = 'catalog_snapshot:scheduled'
+
+_HEADER = struct.Struct('<8sI')
+
+# Отображенный снимок процесса: (путь, CatalogIndex)
+_snapshot = None
+
+
+def _aligned(offset):
+    return -(-offset // SNAPSHOT_ALIGN) * SNAPSHOT_ALIGN
+
+
+def snapshot_enabled():
+    """
+    Включены ли снимки индекса каталога (CATALOG_SNAPSHOT_ENABLED и numpy).
+    """
+    return np is not None and getattr(settings, 'CATALOG_SNAPSHOT_ENABLED', False)
+
+
+def dump_catalog_index(index, file):
+    """
+    Записывает индекс каталога в файл в формате снимка.
+
+    Args:
+        index (CatalogIndex): Индекс
+        file: Файл, открытый на запись в двоичном режиме
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in index.arrays().items()}
+    columns = {}
+    offset = 0
+    for name, array in arrays.items():
+        columns[name] = [offset, array.dtype.str, len(array)]
+        offset = _aligned(offset + array.nbytes)
+    meta = json.dumps({
+        'version': index.version,
+        'shop_versions': {str(shop_id): version for shop_id, version in index.shop_versions.items()},
+        'rows': len(index),
+        'columns': columns,
+    }).encode()
+
+    file.write(_HEADER.pack(SNAPSHOT_MAGIC, len(meta)))
+    file.write(meta)
+    data_start = _aligned(_HEADER.size + len(meta))
+    position = _HEADER.size + len(meta)
+    for name, array in arrays.items():
+        start = data_start + columns[name][0]
+        file.write(b'\0' * (start - position))
+        file.write(memoryview(array).cast('B'))
+        position = start + array.nbytes
+
+
+def load_catalog_index(path):
+    """
+    Отображает снимок в память и возвращает индекс поверх него.
+
+    Массивы индекса - представления numpy над отображением только для
+    чтения; отображение освобождается вместе с индексом.
+
+    Args:
+        path (str): Файл снимка
+
+    Returns:
+        CatalogIndex: Индекс снимка
+
+    Raises:
+        ValueError: Файл не является снимком каталога
+    """
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < _HEADER.size:
+        raise ValueError(f'Файл {path} не является снимком каталога')
+    magic, meta_length = _HEADER.unpack_from(buffer)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f'Файл {path} не является снимком каталога')
+    meta = json.loads(buffer[_HEADER.size:_HEADER.size + meta_length])
+
+    data_start = _aligned(_HEADER.size + meta_length)
+    arrays = {
+        name: np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + offset)
+        if count else np.empty(0, dtype=dtype)
+        for name, (offset, dtype, count) in meta['columns'].items()
+    }
+    shop_versions = {int(shop_id): version for shop_id, version in meta['shop_versions'].items()}
+    return CatalogIndex.from_arrays(arrays, meta['version'], shop_versions)
+
+
+def current_snapshot_path(directory=None):
+    """
+    Путь актуального снимка по указателю current или None, если снимка нет.
+    """
+    directory = directory or settings.CATALOG_SNAPSHOT_DIR
+    try:
+        with open(os.path.join(directory, CURRENT_POINTER)) as file:
+            name = file.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, name) if name else None
+
+
+def _replace_atomically(path, write):
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(tmp_path, 'wb') as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_catalog_snapshot(directory=None):
+    """
+    Записывает снимок индекса каталога или возвращает готовый для текущей версии.
+
+    После записи снимка указатель current переключается на него, прежние
+    снимки удаляются. Процессы, которые еще используют удаленный снимок,
+    продолжают читать его отображение до перехода на новый.
+
+    Args:
+        directory (str): Каталог снимков (по умолчанию CATALOG_SNAPSHOT_DIR)
+
+    Returns:
+        dict: file (имя файла), version, rows (None для готового снимка), reused
+    """
+    directory = directory or settings.CATALOG_SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+    current = current_snapshot_path(directory)
+    version = get_catalog_version()
+    name = f'catalog-{version}.bin'
+    if current == os.path.join(directory, name) and os.path.exists(current):
+        return {'file': name, 'version': version, 'rows': None, 'reused': True}
+
+    index = CatalogIndex.build()
+    name = f'catalog-{index.version}.bin'
+    _replace_atomically(os.path.join(directory, name), lambda file: dump_catalog_index(index, file))
+    _replace_atomically(os.path.join(directory, CURRENT_POINTER), lambda file: file.write(name.encode()))
+
+    for existing in os.listdir(directory):
+        if existing != name and existing.startswith('catalog-') and existing.endswith('.bin'):
+            os.remove(os.path.join(directory, existing))
+
+    return {'file': name, 'version': index.version, 'rows': len(index), 'reused': False}
+
+
+def get_catalog_snapshot():
+    """
+    Возвращает индекс актуального снимка, отображенного в память процесса.
+
+    Снимок отображается заново, только если указатель current сменился.
+
+    Returns:
+        CatalogIndex: Индекс снимка или None, если снимки выключены или снимка нет
+    """
+    global _snapshot
+    if not snapshot_enabled():
+        return None
+    path = current_snapshot_path()
+    if path is None:
+        return None
+    if _snapshot is None or _snapshot[0] != path:
+        try:
+            _snapshot = (path, load_catalog_index(path))
+        except (OSError, ValueError):
+            logger.exception(f'Не удалось отобразить снимок каталога {path}')
+            return None
+    return _snapshot[1]
+
+
+def schedule_catalog_snapshot():
+    """
+    Планирует запись снимка после фиксации транзакции.
+
+    Изменения за CATALOG_SNAPSHOT_DELAY секунд (например, все пакеты
+    импорта прайс-листа) объединяются в одну запись снимка.
+    """
+    if not snapshot_enabled():
+        return
+
+    def schedule():
+        from .tasks_catalog import write_catalog_snapshot_task
+
+        delay = getattr(settings, 'CATALOG_SNAPSHOT_DELAY', 30)
+        # add не перезапишет метку уже запланированной задачи
+        if cache.add(SCHEDULED_KEY, 1, delay + 60):
+            write_catalog_snapshot_task.apply_async(countdown=delay)
+
+    transaction.on_commit(schedule)
@@ -0,0 +1,97 @@
+"""
+Статистика каталога для справочников категорий и магазинов.
+
+CatalogStats хранит для каждой категории магазина число предложений в
+наличии и диапазон цен. Строки пересчитываются по витрине каталога
+(CatalogEntry) при изменении предложений (см. backend.signals): при
+изменении остатков и цен - только категории измененных предложений,
+а если категория предложения могла измениться или предложение удалено
+(импорт, изменение товара) - все категории магазина.
+
+Справочники /api/categories и /api/shops суммируют строки CatalogStats
+и не считают предложения при каждом запросе.
+"""
+
+from django.db import connection
+from django.db.models import Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import CatalogEntry, CatalogStats
+
+
+# Поля предложений, от которых зависит статистика
+CATALOG_STATS_FIELDS = {'product_id', 'quantity', 'price'}
+
+# Первый ключ рекомендательной блокировки статистики магазина (второй - магазин)
+CATALOG_STATS_LOCK_ID = 22401503
+
+
+def refresh_catalog_stats(shop_id, product_info_ids=None):
+    """
+    Пересчитывает статистику CatalogStats магазина.
+
+    Статистика записывается одним запросом (INSERT ... ON CONFLICT DO
+    UPDATE и удаление категорий без предложений в наличии) под
+    блокировкой магазина до конца транзакции, поэтому параллельные
+    изменения предложений одного магазина не пересекаются.
+
+    Args:
+        shop_id (int): Магазин
+        product_info_ids: Измененные предложения (None - все категории магазина)
+    """
+    category_ids = None
+    if product_info_ids is not None:
+        product_info_ids = set(product_info_ids)
+        entries = dict(CatalogEntry.objects.filter(pk__in=product_info_ids).values_list('pk', 'category_id'))
+        if len(entries) == len(product_info_ids):
+            category_ids = sorted(set(entries.values()))
+            if not category_ids:
+                return
+
+    params = {'shop_id': shop_id, 'category_ids': category_ids, 'lock_id': CATALOG_STATS_LOCK_ID}
+    stats_condition = stale_condition = ''
+    if category_ids is not None:
+        stats_condition = 'AND category_id = ANY(%(category_ids)s)'
+        stale_condition = 'AND cs.category_id = ANY(%(category_ids)s)'
+
+    stats_table = CatalogStats._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%(lock_id)s, %(shop_id)s)', params)
+        cursor.execute(f'''
+            WITH stats AS (
+                SELECT category_id, count(*) AS offers, min(price) AS min_price, max(price) AS max_price
+                FROM {CatalogEntry._meta.db_table}
+                WHERE shop_id = %(shop_id)s AND quantity > 0 {stats_condition}
+                GROUP BY category_id
+            ), stale AS (
+                DELETE FROM {stats_table} cs
+                WHERE cs.shop_id = %(shop_id)s {stale_condition}
+                  AND NOT EXISTS (SELECT 1 FROM stats s WHERE s.category_id = cs.category_id)
+            )
+            INSERT INTO {stats_table} AS cs (shop_id, category_id, offers, min_price, max_price)
+            SELECT %(shop_id)s, category_id, offers, min_price, max_price FROM stats
+            ON CONFLICT (shop_id, category_id) DO UPDATE SET
+                offers = EXCLUDED.offers, min_price = EXCLUDED.min_price, max_price = EXCLUDED.max_price
+            WHERE (cs.offers, cs.min_price, cs.max_price)
+                IS DISTINCT FROM (EXCLUDED.offers, EXCLUDED.min_price, EXCLUDED.max_price)
+        ''', params)
+
+
+def annotate_catalog_stats(queryset, **filters):
+    """
+    Добавляет к категориям или магазинам offers, min_price и max_price.
+
+    Args:
+        queryset: Category или Shop
+        **filters: Условия на строки CatalogStats, например shop_id=1
+
+    Returns:
+        QuerySet: queryset с аннотациями (без предложений в наличии - offers=0, цены None)
+    """
+    lookup = {f'catalog_stats__{name}': value for name, value in filters.items()}
+    condition = Q(**lookup) if lookup else None
+    return queryset.annotate(
+        offers=Coalesce(Sum('catalog_stats__offers', filter=condition), Value(0)),
+        min_price=Min('catalog_stats__min_price', filter=condition),
+        max_price=Max('catalog_stats__max_price', filter=condition),
+    )
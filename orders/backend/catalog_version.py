@@ -0,0 +1,124 @@
+"""
+Версии каталога: глобальная и по магазинам.
+
+Версия меняется после каждого изменения предложений магазина (импорт,
+обновление остатков, изменения предложений, товаров и параметров в
+админке - см. backend.signals) и позволяет проверить, изменился ли
+каталог, не обращаясь к базе данных: повторно использовать выгрузку
+каталога или ответить 304 Not Modified на запрос с If-None-Match
+(catalog_etag).
+
+Версии хранятся в кэше (Redis). Значение версии - время изменения
+в наносекундах, поэтому после вытеснения ключа из кэша версия
+инициализируется новым значением и никогда не повторяет старую.
+"""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+GLOBAL_VERSION_KEY = 'catalog_version'
+
+
+def _version_key(shop_id=None):
+    if shop_id is None:
+        return GLOBAL_VERSION_KEY
+    return f'{GLOBAL_VERSION_KEY}:shop:{shop_id}'
+
+
+def get_catalog_version(shop_id=None):
+    """
+    Возвращает версию каталога магазина или глобальную версию.
+
+    Args:
+        shop_id (int): Магазин (None - весь каталог)
+
+    Returns:
+        str: Версия каталога
+    """
+    key = _version_key(shop_id)
+    version = cache.get(key)
+    if version is None:
+        version = str(time.time_ns())
+        # add не перезапишет версию, установленную параллельным процессом
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_shop_catalog_versions(shop_ids):
+    """
+    Возвращает версии каталогов магазинов одним обращением к кэшу.
+
+    Args:
+        shop_ids: Магазины
+
+    Returns:
+        dict: Магазин -> версия каталога магазина
+    """
+    shop_ids = list(shop_ids)
+    cached = cache.get_many([_version_key(shop_id) for shop_id in shop_ids])
+    return {
+        shop_id: cached.get(_version_key(shop_id)) or get_catalog_version(shop_id)
+        for shop_id in shop_ids
+    }
+
+
+def get_catalog_versions(shop_ids):
+    """
+    Возвращает общую версию каталога нескольких магазинов.
+
+    Args:
+        shop_ids (list): Магазины (пустой список - весь каталог)
+
+    Returns:
+        str: Версия каталога
+    """
+    if not shop_ids:
+        return get_catalog_version()
+    versions = ','.join(f'{shop_id}:{get_catalog_version(shop_id)}' for shop_id in sorted(shop_ids))
+    return hashlib.sha1(versions.encode()).hexdigest()[:16]
+
+
+def bump_catalog_version(*shop_ids):
+    """
+    Меняет версии магазинов и глобальную версию после фиксации транзакции.
+
+    Args:
+        *shop_ids: Измененные магазины
+    """
+    def bump():
+        version = str(time.time_ns())
+        cache.set_many({_version_key(shop_id): version for shop_id in (None, *shop_ids)}, None)
+
+    transaction.on_commit(bump)
+
+
+def catalog_etag(request, shop_id=None, version=None):
+    """
+    Сильный ETag ответа каталога.
+
+    Зависит от версии каталога (магазина или глобальной), адреса запроса с
+    упорядоченными параметрами и формата ответа, поэтому меняется при любом
+    изменении данных, которые могут попасть в ответ.
+
+    Args:
+        request: Запрос DRF (после согласования формата ответа)
+        shop_id (int): Магазин, если ответ содержит только его предложения
+        version (str): Версия, по которой построен ответ (по умолчанию текущая)
+
+    Returns:
+        str: Значение заголовка ETag в кавычках
+    """
+    query = urlencode(sorted((key, value) for key, values in request.query_params.lists() for value in values))
+    parts = (
+        version if version is not None else get_catalog_version(shop_id),
+        request.accepted_media_type,
+        request.build_absolute_uri(request.path),
+        query,
+    )
+    return '"%s"' % hashlib.sha1('|'.join(parts).encode()).hexdigest()
@@ -0,0 +1,224 @@
+"""
+Асинхронная выгрузка каталога в сжатые файлы.
+
+Выгрузка пишется потоково, по пакетам предложений, в gzip-файл в
+MEDIA_ROOT/exports. Имя файла содержит область выгрузки (магазины),
+формат и версию каталога, поэтому, пока каталог не изменился,
+повторный запрос возвращает уже готовый файл.
+
+Состояние задачи хранится в кэше так же, как у задач импорта
+(см. import_jobs), по ключу export_job:<id>.
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .catalog_version import get_catalog_versions
+from .exporter import export_categories, iter_goods
+from .import_jobs import DEFAULT_JOB_TTL, JOB_PENDING
+from .models import Shop
+from .price_list import dump_good, dump_price_list_header
+
+
+EXPORT_DIR = 'exports'
+
+# Формат выгрузки -> расширение файла
+SNAPSHOT_FORMATS = {
+    'yaml': 'yaml.gz',
+    'jsonl': 'jsonl.gz',
+    'csv': 'csv.gz',
+}
+
+CSV_COLUMNS = ('shop_id', 'shop', 'id', 'category', 'model', 'name', 'price', 'price_rrc', 'quantity', 'parameters')
+
+
+def _job_key(job_id):
+    return f'export_job:{job_id}'
+
+
+def _save_job(job):
+    timeout = getattr(settings, 'PRICE_LIST_IMPORT_JOB_TTL', DEFAULT_JOB_TTL)
+    cache.set(_job_key(job['id']), job, timeout)
+    return job
+
+
+def create_export_job(user_id, shop_ids, export_format):
+    """
+    Регистрирует новую задачу выгрузки в состоянии pending.
+
+    Args:
+        user_id (int): Пользователь, запустивший выгрузку
+        shop_ids (list): Магазины (пустой список - весь каталог)
+        export_format (str): Формат из SNAPSHOT_FORMATS
+
+    Returns:
+        dict: Состояние задачи
+    """
+    return _save_job({
+        'id': uuid.uuid4().hex,
+        'user_id': user_id,
+        'shops': sorted(shop_ids),
+        'format': export_format,
+        'state': JOB_PENDING,
+        'rows': 0,
+        'file': None,
+        'reused': False,
+        'version': None,
+        'errors': [],
+        'created_at': time.time(),
+        'started_at': None,
+        'finished_at': None,
+    })
+
+
+def get_export_job(job_id):
+    """
+    Возвращает состояние задачи выгрузки или None, если задача не найдена.
+    """
+    return cache.get(_job_key(job_id))
+
+
+def update_export_job(job_id, error=None, **fields):
+    """
+    Обновляет поля задачи выгрузки и при необходимости добавляет ошибку.
+
+    Returns:
+        dict: Обновленное состояние задачи или None
+    """
+    job = get_export_job(job_id)
+    if job is None:
+        return None
+
+    job.update(fields)
+    if error:
+        job['errors'].append(error)
+    return _save_job(job)
+
+
+def export_job_as_dict(job):
+    """
+    Представление задачи выгрузки для API (без служебных полей).
+    """
+    return {
+        'id': job['id'],
+        'state': job['state'],
+        'shops': job['shops'],
+        'format': job['format'],
+        'rows': job['rows'],
+        'reused': job['reused'],
+        'version': job['version'],
+        'errors': job['errors'],
+        'download_url': settings.MEDIA_URL + job['file'] if job['file'] else None,
+    }
+
+
+def snapshot_name(shop_ids, export_format, version):
+    """
+    Относительный путь (от MEDIA_ROOT) файла выгрузки.
+    """
+    if not shop_ids:
+        scope = 'all'
+    elif len(shop_ids) <= 10:
+        scope = 'shop_' + '-'.join(str(shop_id) for shop_id in sorted(shop_ids))
+    else:
+        scope = 'shops_' + hashlib.sha1(','.join(map(str, sorted(shop_ids))).encode()).hexdigest()[:12]
+    return f'{EXPORT_DIR}/catalog_{scope}_{version}.{SNAPSHOT_FORMATS[export_format]}'
+
+
+def _write_yaml(file, shops, chunk_size):
+    # Каждый магазин - отдельный YAML-документ в схеме прайс-листа
+    rows = 0
+    for number, shop in enumerate(shops):
+        if number:
+            file.write('---\n')
+        file.write(dump_price_list_header(shop.name, export_categories(shop)))
+        for good in iter_goods(shop, chunk_size):
+            file.write(dump_good(good))
+            rows += 1
+    return rows
+
+
+def _write_jsonl(file, shops, chunk_size):
+    rows = 0
+    for shop in shops:
+        for good in iter_goods(shop, chunk_size):
+            file.write(json.dumps({'shop_id': shop.id, 'shop': shop.name, **good}, ensure_ascii=False))
+            file.write('\n')
+            rows += 1
+    return rows
+
+
+def _write_csv(file, shops, chunk_size):
+    writer = csv.writer(file)
+    writer.writerow(CSV_COLUMNS)
+    rows = 0
+    for shop in shops:
+        for good in iter_goods(shop, chunk_size):
+            writer.writerow((
+                shop.id, shop.name, good['id'], good['category'], good['model'], good['name'],
+                good['price'], good['price_rrc'], good['quantity'],
+                json.dumps(good['parameters'], ensure_ascii=False),
+            ))
+            rows += 1
+    return rows
+
+
+WRITERS = {
+    'yaml': _write_yaml,
+    'jsonl': _write_jsonl,
+    'csv': _write_csv,
+}
+
+
+def write_snapshot(shop_ids, export_format, chunk_size=None):
+    """
+    Записывает выгрузку каталога или возвращает готовую для текущей версии.
+
+    Файл пишется во временный и переименовывается атомарно, поэтому
+    незаконченная выгрузка никогда не отдается по ссылке. Выгрузки той
+    же области и формата для прежних версий каталога удаляются.
+
+    Args:
+        shop_ids (list): Магазины (пустой список - весь каталог)
+        export_format (str): Формат из SNAPSHOT_FORMATS
+        chunk_size (int): Размер пакета чтения предложений
+
+    Returns:
+        dict: file (путь от MEDIA_ROOT), version, rows (None для готовой выгрузки), reused
+    """
+    version = get_catalog_versions(shop_ids)
+    name = snapshot_name(shop_ids, export_format, version)
+    path = os.path.join(settings.MEDIA_ROOT, name)
+    if os.path.exists(path):
+        return {'file': name, 'version': version, 'rows': None, 'reused': True}
+
+    shops = Shop.objects.order_by('id')
+    if shop_ids:
+        shops = shops.filter(id__in=shop_ids)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='') as file:
+            rows = WRITERS[export_format](file, shops, chunk_size)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    prefix, suffix = name.split(f'_{version}.')
+    directory = os.path.dirname(path)
+    for existing in os.listdir(directory):
+        candidate = f'{EXPORT_DIR}/{existing}'
+        if candidate != name and candidate.startswith(prefix + '_') and candidate.endswith('.' + suffix):
+            os.remove(os.path.join(directory, existing))
+
+    return {'file': name, 'version': version, 'rows': rows, 'reused': False}
@@ -0,0 +1,111 @@
+"""
+Потоковый экспорт каталога магазина в формате прайс-листа.
+
+Экспорт возвращает данные в той же схеме, что принимает импорт
+(shop, categories, goods), в YAML или JSON. JSON является подмножеством
+YAML, поэтому оба формата можно снова загрузить через PartnerUpdate.
+
+Предложения читаются через .iterator(chunk_size=...) (на PostgreSQL -
+серверным курсором), параметры подгружаются одним запросом на пакет.
+Потребление памяти определяется размером пакета, а не каталога.
+"""
+
+import json
+
+from django.conf import settings
+from django.db.models import Prefetch
+
+from .importer import DEFAULT_BATCH_SIZE
+from .models import ProductInfo, ProductParameter
+from .price_list import dump_good, dump_price_list_header
+
+
+EXPORT_FORMATS = {
+    'yaml': 'application/x-yaml; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+}
+
+
+def export_categories(shop):
+    """
+    Категории магазина в формате прайс-листа.
+    """
+    return [
+        {'id': category_id, 'name': name}
+        for category_id, name in shop.categories.order_by('id').values_list('id', 'name')
+    ]
+
+
+def iter_goods(shop, chunk_size=None):
+    """
+    Отдает предложения магазина по одному в формате goods прайс-листа.
+
+    Args:
+        shop (Shop): Магазин
+        chunk_size (int): Размер пакета чтения (по умолчанию PARTNER_EXPORT_CHUNK_SIZE)
+
+    Yields:
+        dict: Товар (id, category, model, name, price, price_rrc, quantity, parameters)
+    """
+    chunk_size = chunk_size or getattr(settings, 'PARTNER_EXPORT_CHUNK_SIZE', DEFAULT_BATCH_SIZE)
+    offers = (
+        ProductInfo.objects
+        .filter(shop=shop)
+        .select_related('product')
+        .defer('search_vector')
+        .prefetch_related(Prefetch(
+            'product_parameters',
+            queryset=ProductParameter.objects.select_related('parameter').order_by('parameter__name'),
+        ))
+        .order_by('external_id')
+    )
+    for offer in offers.iterator(chunk_size=chunk_size):
+        yield {
+            'id': offer.external_id,
+            'category': offer.product.category_id,
+            'model': offer.model,
+            'name': offer.product.name,
+            'price': offer.price,
+            'price_rrc': offer.price_rrc,
+            'quantity': offer.quantity,
+            'parameters': {
+                product_parameter.parameter.name: product_parameter.value
+                for product_parameter in offer.product_parameters.all()
+            },
+        }
+
+
+def iter_yaml(shop, chunk_size=None):
+    """
+    Отдает прайс-лист магазина в YAML по частям.
+    """
+    yield dump_price_list_header(shop.name, export_categories(shop))
+    for good in iter_goods(shop, chunk_size):
+        yield dump_good(good)
+
+
+def iter_json(shop, chunk_size=None):
+    """
+    Отдает прайс-лист магазина в JSON по частям.
+    """
+    header = json.dumps({'shop': shop.name, 'categories': export_categories(shop)}, ensure_ascii=False)
+    yield header[:-1] + ', "goods": ['
+    separator = ''
+    for good in iter_goods(shop, chunk_size):
+        yield separator + json.dumps(good, ensure_ascii=False)
+        separator = ', '
+    yield ']}'
+
+
+def iter_price_list(shop, export_format='yaml', chunk_size=None):
+    """
+    Отдает прайс-лист магазина в указанном формате по частям.
+
+    Raises:
+        ValueError: Неизвестный формат
+    """
+    if export_format == 'yaml':
+        return iter_yaml(shop, chunk_size)
+    if export_format == 'json':
+        return iter_json(shop, chunk_size)
+    raise ValueError(f'Неизвестный формат экспорта: {export_format}. Доступные: {", ".join(EXPORT_FORMATS)}')
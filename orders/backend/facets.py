@@ -0,0 +1,291 @@
+"""
+Фасетная фильтрация каталога по значениям параметров.
+
+Индекс фасетов состоит из двух частей:
+
+- ProductInfo.facets - массив идентификаторов FacetValue значений
+  параметров предложения (индекс GIN); по нему выполняются фильтры
+  ?param[<имя>]=<значение> без соединения с таблицей ProductParameter;
+- FacetCount - число предложений в наличии по магазину, категории и
+  значению параметра.
+
+Обе части пересчитываются при импорте и изменении остатков (сигнал
+offers_changed). Счетчики выдачи, отфильтрованной только по категории
+и магазину, суммируются по FacetCount. При фильтрах по параметрам или
+поиске счетчики считаются по массивам facets отобранных предложений.
+
+Диапазонные фильтры ?param_min[<имя>]=&param_max[<имя>]= выполняются
+по числовым значениям параметров (см. backend.parameter_values) в
+нормализованной единице измерения, по индексу (parameter, numeric_value).
+"""
+
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import Q, Sum
+from rest_framework.exceptions import ValidationError
+
+from .models import FacetCount, FacetValue, Parameter, Product, ProductInfo, ProductParameter
+
+
+FACET_BATCH_SIZE = 1000
+
+# Поля предложения, от которых зависит массив facets
+FACET_FIELDS = {'parameters'}
+
+# Поля предложения, от которых зависят счетчики FacetCount
+FACET_COUNT_FIELDS = {'parameters', 'product_id', 'quantity'}
+
+# Первый ключ рекомендательной блокировки счетчиков магазина (второй - магазин)
+FACET_COUNTS_LOCK_ID = 22401502
+
+PARAM_QUERY_PARAM = re.compile(r'^param\[(.+)\]$')
+PARAM_RANGE_QUERY_PARAM = re.compile(r'^param_(min|max)\[(.+)\]$')
+
+
+def parse_param_filters(query_params):
+    """
+    Извлекает фильтры ?param[<имя>]=<значение> из параметров запроса.
+
+    Повторяющийся параметр задает несколько допустимых значений.
+
+    Returns:
+        dict: Имя параметра -> список значений
+    """
+    filters = {}
+    for key in query_params:
+        match = PARAM_QUERY_PARAM.match(key)
+        if match:
+            values = [value for value in query_params.getlist(key) if value]
+            if values:
+                filters[match.group(1)] = values
+    return filters
+
+
+def parse_range_filters(query_params):
+    """
+    Извлекает фильтры ?param_min[<имя>]= и ?param_max[<имя>]= из параметров запроса.
+
+    Returns:
+        dict: Имя параметра -> (нижняя граница, верхняя граница), граница может быть None
+
+    Raises:
+        ValidationError: Граница не является числом
+    """
+    ranges = {}
+    for key, value in query_params.items():
+        match = PARAM_RANGE_QUERY_PARAM.match(key)
+        if not match or not value:
+            continue
+        bound, name = match.groups()
+        try:
+            number = float(value.replace(',', '.'))
+        except ValueError:
+            raise ValidationError(f'Граница {key} должна быть числом')
+        low, high = ranges.get(name, (None, None))
+        ranges[name] = (number, high) if bound == 'min' else (low, number)
+    return ranges
+
+
+def filter_by_ranges(queryset, ranges):
+    """
+    Оставляет предложения, у которых числовые значения параметров
+    попадают в диапазоны (границы включаются).
+
+    Args:
+        queryset (QuerySet): Предложения
+        ranges (dict): Имя параметра -> (нижняя граница, верхняя граница)
+
+    Returns:
+        QuerySet: Отфильтрованные предложения
+    """
+    for name, (low, high) in ranges.items():
+        product_parameters = ProductParameter.objects.filter(
+            parameter_id__in=Parameter.objects.filter(name=name).values('id'),
+            numeric_value__isnull=False,
+        )
+        if low is not None:
+            product_parameters = product_parameters.filter(numeric_value__gte=low)
+        if high is not None:
+            product_parameters = product_parameters.filter(numeric_value__lte=high)
+        queryset = queryset.filter(id__in=product_parameters.values('product_info_id'))
+    return queryset
+
+
+def filter_by_params(queryset, filters):
+    """
+    Оставляет предложения, у которых каждый параметр из filters имеет
+    одно из указанных значений.
+
+    Args:
+        queryset (QuerySet): Предложения
+        filters (dict): Имя параметра -> список значений
+
+    Returns:
+        QuerySet: Отфильтрованные предложения
+    """
+    condition = Q()
+    for name, values in filters.items():
+        condition |= Q(parameter__name=name, value__in=values)
+
+    facet_ids = {}
+    for facet_id, name in FacetValue.objects.filter(condition).values_list('id', 'parameter__name'):
+        facet_ids.setdefault(name, []).append(facet_id)
+
+    for name in filters:
+        if name not in facet_ids:
+            return queryset.none()
+        queryset = queryset.filter(facets__overlap=facet_ids[name])
+    return queryset
+
+
+def _facets_as_dict(counts):
+    """
+    Преобразует пары (FacetValue.id, число) в {параметр: {значение: число}}.
+
+    Значения параметра упорядочены по убыванию числа предложений.
+    """
+    counts = dict(counts)
+    facets = {}
+    rows = FacetValue.objects.filter(id__in=counts).values_list('id', 'parameter__name', 'value')
+    for facet_id, name, value in sorted(rows, key=lambda row: (row[1], -counts[row[0]], row[2])):
+        facets.setdefault(name, {})[value] = counts[facet_id]
+    return facets
+
+
+def count_facets(queryset):
+    """
+    Считает значения параметров у отобранных предложений.
+
+    Returns:
+        dict: {параметр: {значение: число предложений}}
+    """
+    try:
+        sql, params = queryset.order_by().values('facets').query.sql_with_params()
+    except EmptyResultSet:
+        return {}
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'''
+            SELECT facet_value_id, count(*)
+            FROM ({sql}) offers, unnest(offers.facets) AS facet_value_id
+            GROUP BY facet_value_id
+        ''', params)
+        return _facets_as_dict(cursor.fetchall())
+
+
+def precomputed_facet_counts(category_id=None, shop_id=None):
+    """
+    Счетчики значений параметров у предложений в наличии по FacetCount.
+
+    Args:
+        category_id: Категория (None - все категории)
+        shop_id: Магазин (None - все магазины)
+
+    Returns:
+        dict: {параметр: {значение: число предложений}}
+    """
+    counts = FacetCount.objects.all()
+    if category_id:
+        counts = counts.filter(category_id=category_id)
+    if shop_id:
+        counts = counts.filter(shop_id=shop_id)
+    return _facets_as_dict(
+        counts.values('facet_value').annotate(total=Sum('count')).values_list('facet_value', 'total')
+    )
+
+
+def refresh_facets(product_info_ids, batch_size=FACET_BATCH_SIZE):
+    """
+    Пересчитывает массивы facets предложений.
+
+    Недостающие значения параметров добавляются в FacetValue.
+
+    Args:
+        product_info_ids: Предложения
+        batch_size (int): Размер пакета
+    """
+    facet_value_table = FacetValue._meta.db_table
+    product_parameter_table = ProductParameter._meta.db_table
+    product_info_table = ProductInfo._meta.db_table
+
+    product_info_ids = sorted(product_info_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(product_info_ids), batch_size):
+            ids = product_info_ids[start:start + batch_size]
+            cursor.execute(f'''
+                INSERT INTO {facet_value_table} (parameter_id, value)
+                SELECT DISTINCT pp.parameter_id, pp.value
+                FROM {product_parameter_table} pp
+                WHERE pp.product_info_id = ANY(%(ids)s)
+                ON CONFLICT (parameter_id, value) DO NOTHING
+            ''', {'ids': ids})
+            cursor.execute(f'''
+                UPDATE {product_info_table} pi SET facets = ARRAY(
+                    SELECT fv.id
+                    FROM {product_parameter_table} pp
+                    JOIN {facet_value_table} fv ON fv.parameter_id = pp.parameter_id AND fv.value = pp.value
+                    WHERE pp.product_info_id = pi.id
+                    ORDER BY fv.id
+                )
+                WHERE pi.id = ANY(%(ids)s)
+            ''', {'ids': ids})
+
+
+def refresh_facet_counts(shop_id, product_info_ids=None):
+    """
+    Пересчитывает счетчики FacetCount магазина.
+
+    При изменении остатков пересчитываются только категории измененных
+    предложений; если предложение удалено или могло сменить категорию,
+    пересчитывается весь магазин. Счетчики записываются одним запросом
+    (INSERT ... ON CONFLICT DO UPDATE и удаление исчезнувших) под
+    блокировкой магазина до конца транзакции, поэтому параллельные
+    обновления остатков одного магазина не пересекаются.
+
+    Args:
+        shop_id (int): Магазин
+        product_info_ids: Измененные предложения (None - весь магазин)
+    """
+    category_ids = None
+    if product_info_ids is not None:
+        product_info_ids = set(product_info_ids)
+        categories = dict(
+            ProductInfo.objects.filter(pk__in=product_info_ids).values_list('pk', 'product__category_id')
+        )
+        if len(categories) == len(product_info_ids):
+            category_ids = sorted(set(categories.values()))
+            if not category_ids:
+                return
+
+    params = {'shop_id': shop_id, 'category_ids': category_ids, 'lock_id': FACET_COUNTS_LOCK_ID}
+    counts_condition = stale_condition = ''
+    if category_ids is not None:
+        counts_condition = 'AND p.category_id = ANY(%(category_ids)s)'
+        stale_condition = 'AND fc.category_id = ANY(%(category_ids)s)'
+
+    facet_count_table = FacetCount._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%(lock_id)s, %(shop_id)s)', params)
+        cursor.execute(f'''
+            WITH counts AS (
+                SELECT p.category_id, facet_value_id, count(*) AS count
+                FROM {ProductInfo._meta.db_table} pi
+                JOIN {Product._meta.db_table} p ON p.id = pi.product_id,
+                unnest(pi.facets) AS facet_value_id
+                WHERE pi.shop_id = %(shop_id)s AND pi.quantity > 0 {counts_condition}
+                GROUP BY p.category_id, facet_value_id
+            ), stale AS (
+                DELETE FROM {facet_count_table} fc
+                WHERE fc.shop_id = %(shop_id)s {stale_condition}
+                  AND NOT EXISTS (
+                      SELECT 1 FROM counts c
+                      WHERE c.category_id = fc.category_id AND c.facet_value_id = fc.facet_value_id
+                  )
+            )
+            INSERT INTO {facet_count_table} AS fc (shop_id, category_id, facet_value_id, count)
+            SELECT %(shop_id)s, category_id, facet_value_id, count FROM counts
+            ON CONFLICT (shop_id, category_id, facet_value_id) DO UPDATE SET count = EXCLUDED.count
+            WHERE fc.count <> EXCLUDED.count
+        ''', params)
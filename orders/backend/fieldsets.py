@@ -0,0 +1,144 @@
+"""
+Разреженные наборы полей ответа (?fields=) и раскрытие связей (?expand=).
+
+?fields=id,price,product.name,product.thumbnail_url - в ответе остаются
+только перечисленные поля в обычном порядке; вложенные поля указываются
+через точку, имя вложенного объекта без точки оставляет его целиком.
+Без ?fields= ответ не меняется.
+
+?expand=shop,product.category - связи, которые по умолчанию
+представлены идентификатором, раскрываются в объекты.
+
+Запрос к базе сокращается вместе с ответом: список товаров читает из
+витрины только столбцы запрошенных полей (см. backend.serializers_fast),
+а представления с SparseFieldsetMixin не подгружают незапрошенные связи.
+"""
+
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+def parse_fieldset(value):
+    """
+    Разбирает список полей через запятую в дерево.
+
+    Args:
+        value (str): Значение ?fields=, например "id,product.name"
+
+    Returns:
+        dict: Имя поля -> дерево вложенных полей (None - поле целиком);
+            None, если поля не указаны
+    """
+    fieldset = {}
+    for path in (value or '').split(','):
+        names = [name.strip() for name in path.split('.')]
+        if not all(names):
+            continue
+        node = fieldset
+        for name in names[:-1]:
+            if name in node and node[name] is None:
+                # Объект уже запрошен целиком
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[names[-1]] = None
+    return fieldset or None
+
+
+def parse_expand(value):
+    """
+    Разбирает список раскрываемых связей через запятую.
+
+    Returns:
+        set: Пути связей, например {'shop', 'product.category'}
+    """
+    return {path.strip() for path in (value or '').split(',') if path.strip()}
+
+
+def validate_fieldset(fieldset, available, prefix=''):
+    """
+    Проверяет, что дерево полей содержит только доступные поля.
+
+    Args:
+        fieldset (dict): Дерево полей (см. parse_fieldset)
+        available (dict): Имя поля -> дерево доступных вложенных полей (None - поле без вложенных)
+        prefix (str): Путь родительского поля для сообщений об ошибке
+
+    Raises:
+        ValidationError: Неизвестное поле
+    """
+    for name, nested in fieldset.items():
+        if name not in available:
+            raise ValidationError(f'Неизвестное поле: {prefix}{name}. Доступные: {", ".join(prefix + field for field in available)}')
+        if nested is not None:
+            if available[name] is None:
+                raise ValidationError(f'Поле {prefix}{name} не содержит вложенных полей')
+            validate_fieldset(nested, available[name], f'{prefix}{name}.')
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Миксин сериализатора: оставляет только поля из fieldset.
+
+    Вложенным сериализаторам с этим миксином передается их часть дерева полей.
+    """
+
+    def __init__(self, *args, fieldset=None, **kwargs):
+        self.fieldset = fieldset
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def fields(self):
+        fields = super().fields
+        if self.fieldset is None:
+            return fields
+
+        # Вложенные поля проверяют вложенные сериализаторы
+        validate_fieldset(dict.fromkeys(self.fieldset), dict.fromkeys(fields))
+        for name in list(fields):
+            if name not in self.fieldset:
+                fields.pop(name)
+        for name, field in fields.items():
+            nested = self.fieldset[name]
+            child = getattr(field, 'child', field)
+            if isinstance(child, SparseFieldsetSerializerMixin):
+                child.fieldset = nested
+            elif nested is not None:
+                raise ValidationError(f'Поле {name} не содержит вложенных полей')
+        return fields
+
+
+class SparseFieldsetMixin:
+    """
+    Миксин представления с ?fields=.
+
+    Передает дерево полей сериализатору (SparseFieldsetSerializerMixin) и
+    подгружает связи из fieldset_prefetch только для запрошенных полей.
+    """
+
+    # Поле ответа -> связи для prefetch_related
+    fieldset_prefetch = {}
+
+    def get_fieldset(self):
+        return parse_fieldset(self.request.query_params.get(FIELDS_QUERY_PARAM))
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fieldset', self.get_fieldset())
+        return super().get_serializer(*args, **kwargs)
+
+    def prefetch_fieldset(self, queryset):
+        """
+        Добавляет prefetch_related связей запрошенных полей.
+        """
+        fieldset = self.get_fieldset()
+        lookups = [
+            lookup
+            for name, related in self.fieldset_prefetch.items()
+            if fieldset is None or name in fieldset
+            for lookup in related
+        ]
+        return queryset.prefetch_related(*lookups) if lookups else queryset
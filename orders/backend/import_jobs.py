@@ -0,0 +1,116 @@
+"""
+Состояние асинхронных задач импорта прайс-листов.
+
+Состояние задачи хранится в кэше (Redis) одним словарем по ключу
+import_job:<id>, поэтому опрос статуса не обращается к базе данных.
+"""
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_SUCCESS = 'success'
+JOB_FAILURE = 'failure'
+JOB_SKIPPED = 'skipped'
+
+# Причины пропуска импорта
+SKIP_NOT_MODIFIED = 'not_modified'
+SKIP_UNCHANGED = 'unchanged'
+
+DEFAULT_JOB_TTL = 60 * 60 * 24
+
+
+def _job_key(job_id):
+    return f'import_job:{job_id}'
+
+
+def _save_job(job):
+    timeout = getattr(settings, 'PRICE_LIST_IMPORT_JOB_TTL', DEFAULT_JOB_TTL)
+    cache.set(_job_key(job['id']), job, timeout)
+    return job
+
+
+def create_job(user_id, url):
+    """
+    Регистрирует новую задачу импорта в состоянии pending.
+
+    Args:
+        user_id (int): Пользователь, запустивший импорт
+        url (str): Адрес прайс-листа
+
+    Returns:
+        dict: Состояние задачи
+    """
+    return _save_job({
+        'id': uuid.uuid4().hex,
+        'user_id': user_id,
+        'url': url,
+        'state': JOB_PENDING,
+        'shop': None,
+        'rows': 0,
+        'rows_per_sec': 0.0,
+        'errors': [],
+        'stats': None,
+        'skip_reason': None,
+        'created_at': time.time(),
+        'started_at': None,
+        'finished_at': None,
+    })
+
+
+def get_job(job_id):
+    """
+    Возвращает состояние задачи или None, если задача не найдена.
+    """
+    return cache.get(_job_key(job_id))
+
+
+def update_job(job_id, error=None, **fields):
+    """
+    Обновляет поля задачи и при необходимости добавляет ошибку.
+
+    Returns:
+        dict: Обновленное состояние задачи или None
+    """
+    job = get_job(job_id)
+    if job is None:
+        return None
+
+    job.update(fields)
+    if error:
+        job['errors'].append(error)
+    return _save_job(job)
+
+
+def job_duration(job):
+    """
+    Длительность задачи в секундах: полная для завершенной,
+    текущая для выполняющейся, None для еще не начатой.
+    """
+    if not job.get('started_at'):
+        return None
+    finished_at = job.get('finished_at') or time.time()
+    return round(finished_at - job['started_at'], 3)
+
+
+def job_as_dict(job):
+    """
+    Представление задачи для API (без служебных полей).
+    """
+    return {
+        'id': job['id'],
+        'state': job['state'],
+        'url': job['url'],
+        'shop': job['shop'],
+        'rows': job['rows'],
+        'rows_per_sec': job['rows_per_sec'],
+        'errors': job['errors'],
+        'duration': job_duration(job),
+        'stats': job['stats'],
+        'skip_reason': job['skip_reason'],
+    }
@@ -0,0 +1,507 @@
+"""
+Движок импорта прайс-листов партнеров.
+
+Вместо построчных get_or_create/create загружает справочники (категории,
+продукты, параметры) один раз в словари, а предложения магазина и значения
+их параметров записывает пакетами через bulk_create/bulk_update внутри
+одной транзакции.
+
+Справочники общие для всех магазинов, поэтому создание и изменение их
+записей выполняется под блокировкой pg_advisory_xact_lock до конца
+транзакции импорта: параллельные импорты (import_pricelist --jobs) не
+создают одни и те же категории, продукты и параметры. Импорты, которым
+не нужны новые записи справочников, блокировку не берут.
+
+Импорт работает в режиме синхронизации по ключу (shop, external_id):
+существующие предложения сравниваются с прайс-листом, и в базу
+записываются только изменения. Предложения, пропавшие из прайс-листа,
+удаляются; если на них ссылаются позиции заказов, они не удаляются,
+а снимаются с продажи (quantity = 0).
+
+По итогам импорта возвращается статистика: сводка изменений, число
+SQL-запросов, длительность и скорость (строк в секунду).
+"""
+
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from .catalog_version import bump_catalog_version
+from .models import Shop, Category, Product, ProductInfo, Parameter, ProductParameter, OrderItem
+from .signals import offers_changed
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Поля предложения, сравниваемые при синхронизации
+OFFER_FIELDS = ('product_id', 'model', 'price', 'price_rrc', 'quantity')
+
+# Ключ рекомендательной блокировки записи справочников
+DICTIONARIES_LOCK_ID = 2_240_150_001
+
+# Доступные движки импорта
+IMPORT_ENGINES = {
+    'orm': 'backend.importer.PriceListImporter',
+    'copy': 'backend.importer_copy.CopyPriceListImporter',
+}
+
+
+def get_importer(engine=None, **kwargs):
+    """
+    Создает движок импорта по имени.
+
+    Args:
+        engine (str): Имя движка из IMPORT_ENGINES
+            (по умолчанию PRICE_LIST_IMPORT_ENGINE)
+        **kwargs: Параметры конструктора движка (batch_size, progress, dry_run)
+
+    Returns:
+        PriceListImporter: Экземпляр движка импорта
+
+    Raises:
+        ValueError: Неизвестный движок
+    """
+    engine = engine or getattr(settings, 'PRICE_LIST_IMPORT_ENGINE', 'orm')
+    if engine not in IMPORT_ENGINES:
+        raise ValueError(f'Неизвестный движок импорта: {engine}. Доступные: {", ".join(IMPORT_ENGINES)}')
+    return import_string(IMPORT_ENGINES[engine])(**kwargs)
+
+
+def chunked(iterable, size):
+    """
+    Разбивает итерируемый объект на списки длиной не более size.
+
+    Args:
+        iterable: Любой итерируемый объект (в т.ч. генератор)
+        size (int): Размер пакета
+
+    Yields:
+        list: Очередной пакет элементов
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class QueryCounter:
+    """
+    Счетчик SQL-запросов для connection.execute_wrapper.
+
+    Работает независимо от DEBUG и не хранит тексты запросов.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class ImportStats:
+    """
+    Статистика и сводка изменений одного импорта прайс-листа.
+    """
+
+    def __init__(self, shop=None):
+        self.shop = shop
+        self.categories = 0
+        self.products_created = 0
+        self.parameters_created = 0
+        self.product_infos = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.retired = 0
+        self.duplicates = 0
+        self.product_parameters_created = 0
+        self.product_parameters_updated = 0
+        self.product_parameters_deleted = 0
+        self.queries = 0
+        self.duration = 0.0
+
+    @property
+    def rows_per_sec(self):
+        """
+        Скорость импорта в предложениях (ProductInfo) в секунду.
+        """
+        if not self.duration:
+            return 0.0
+        return self.product_infos / self.duration
+
+    @property
+    def changes(self):
+        """
+        Сводка изменений предложений магазина.
+        """
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'deleted': self.deleted,
+            'retired': self.retired,
+        }
+
+    @property
+    def modified(self):
+        """
+        Изменились ли предложения магазина.
+        """
+        return any(value for key, value in self.changes.items() if key != 'unchanged')
+
+    def as_dict(self):
+        """
+        Возвращает статистику в виде словаря для JSON-ответа.
+        """
+        return {
+            'shop': self.shop,
+            'categories': self.categories,
+            'products_created': self.products_created,
+            'parameters_created': self.parameters_created,
+            'product_infos': self.product_infos,
+            'duplicates': self.duplicates,
+            'changes': self.changes,
+            'product_parameters': {
+                'created': self.product_parameters_created,
+                'updated': self.product_parameters_updated,
+                'deleted': self.product_parameters_deleted,
+            },
+            'queries': self.queries,
+            'duration': round(self.duration, 3),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+        }
+
+
+class PriceListImporter:
+    """
+    Пакетный импорт прайс-листа магазина.
+
+    Ожидает данные в формате shop1.yaml: словарь с ключами shop,
+    categories и goods. goods может быть любым итерируемым объектом,
+    товары обрабатываются пакетами по batch_size штук.
+
+    Если передан progress, он вызывается со статистикой после каждого пакета.
+    При dry_run импорт выполняется полностью, но транзакция откатывается:
+    статистика содержит сводку изменений, а база остается прежней.
+    """
+
+    def __init__(self, batch_size=None, progress=None, dry_run=False):
+        self.batch_size = batch_size or getattr(
+            settings, 'PRICE_LIST_IMPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE
+        )
+        self.progress = progress
+        self.dry_run = dry_run
+        self.products = {}
+        self.parameters = {}
+        self.offers = {}
+        self.seen = set()
+        self.category_ids = None
+        self.dictionaries_locked = False
+        self.changed_ids = set()
+
+    def run(self, data):
+        """
+        Синхронизирует предложения магазина с прайс-листом.
+
+        Args:
+            data (dict): Данные прайс-листа (shop, categories, goods)
+
+        Returns:
+            ImportStats: Статистика и сводка изменений
+        """
+        stats = ImportStats(shop=data['shop'])
+        counter = QueryCounter()
+        start = time.monotonic()
+
+        self.category_ids = None
+        self.dictionaries_locked = False
+        self.changed_ids = set()
+
+        with connection.execute_wrapper(counter), transaction.atomic():
+            shop, _ = Shop.objects.get_or_create(name=data['shop'])
+            category_ids = self._import_categories(shop, data['categories'], stats)
+            self._load_lookup_maps(shop, category_ids)
+
+            for goods in chunked(data['goods'], self.batch_size):
+                self._import_goods(shop, goods, stats)
+                if self.progress:
+                    stats.duration = time.monotonic() - start
+                    self.progress(stats)
+
+            self._remove_missing_offers(shop, stats)
+            if self.changed_ids and not self.dry_run:
+                # Один сигнал на импорт, а не на пакет: обработчики пересчитывают
+                # данные всего магазина (счетчики фасетов, статистику категорий).
+                # Пробный запуск откатывается, производные данные не пересчитываются
+                offers_changed.send(sender=self.__class__, shop_id=shop.id, product_info_ids=self.changed_ids)
+            if self.dry_run:
+                transaction.set_rollback(True)
+            elif stats.modified:
+                bump_catalog_version(shop.id)
+
+        stats.duration = time.monotonic() - start
+        stats.queries = counter.count
+        return stats
+
+    def _import_categories(self, shop, categories, stats):
+        """
+        Создает новые категории, переименовывает измененные
+        и привязывает их к магазину. Категории общие для всех магазинов,
+        поэтому их изменение меняет версии каталогов всех магазинов.
+
+        Returns:
+            list: Идентификаторы категорий прайс-листа
+        """
+        names = {int(category['id']): category['name'] for category in categories}
+        existing = Category.objects.in_bulk(list(names))
+        if any(category_id not in existing or existing[category_id].name != name
+               for category_id, name in names.items()):
+            self._lock_dictionaries()
+            existing = Category.objects.in_bulk(list(names))
+
+        to_create = [Category(id=category_id, name=name)
+                     for category_id, name in names.items() if category_id not in existing]
+        to_update = []
+        for category_id, category in existing.items():
+            if category.name != names[category_id]:
+                category.name = names[category_id]
+                to_update.append(category)
+
+        Category.objects.bulk_create(to_create, batch_size=self.batch_size)
+        Category.objects.bulk_update(to_update, ['name'], batch_size=self.batch_size)
+        shop.categories.add(*names)
+        if to_create or to_update:
+            # Категории общие: меняются справочник и каталоги всех магазинов
+            bump_catalog_version(*Shop.objects.values_list('id', flat=True))
+
+        stats.categories = len(names)
+        return list(names)
+
+    def _load_lookup_maps(self, shop, category_ids):
+        """
+        Загружает справочники продуктов, параметров и текущие
+        предложения магазина одним запросом на каждый.
+        """
+        self.category_ids = category_ids
+        self._load_dictionaries()
+        self.offers = {
+            row[0]: row[1:]
+            for row in ProductInfo.objects.filter(shop_id=shop.id).values_list(
+                'external_id', 'id', *OFFER_FIELDS
+            )
+        }
+        self.seen = set()
+
+    def _load_dictionaries(self):
+        """
+        Загружает справочники продуктов категорий прайс-листа и параметров.
+        """
+        self.products = {
+            (name, category_id): product_id
+            for product_id, name, category_id in Product.objects.filter(
+                category_id__in=self.category_ids
+            ).values_list('id', 'name', 'category_id').order_by('-id')
+        }
+        self.parameters = dict(Parameter.objects.values_list('name', 'id'))
+
+    def _lock_dictionaries(self):
+        """
+        Берет блокировку записи справочников до конца транзакции импорта.
+
+        Пока импорт ждал блокировку, другие импорты могли добавить записи
+        справочников, поэтому загруженные справочники перечитываются.
+        """
+        if self.dictionaries_locked:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [DICTIONARIES_LOCK_ID])
+        self.dictionaries_locked = True
+        if self.category_ids is not None:
+            self._load_dictionaries()
+
+    def _import_goods(self, shop, goods, stats):
+        """
+        Синхронизирует пакет товаров: создает недостающие продукты
+        и параметры, новые предложения, обновляет измененные.
+
+        Созданные и измененные предложения добавляются в changed_ids.
+        """
+        self._create_missing_products(goods, stats)
+        self._create_missing_parameters(goods, stats)
+
+        to_create = []
+        to_update = []
+        existing = []
+        for item in goods:
+            external_id = int(item['id'])
+            if external_id in self.seen:
+                stats.duplicates += 1
+                continue
+            self.seen.add(external_id)
+            stats.product_infos += 1
+
+            values = (
+                self.products[(item['name'], int(item['category']))],
+                item.get('model') or '',
+                int(item['price']),
+                int(item['price_rrc']),
+                int(item['quantity']),
+            )
+            current = self.offers.pop(external_id, None)
+            if current is None:
+                to_create.append((
+                    ProductInfo(shop_id=shop.id, external_id=external_id, **dict(zip(OFFER_FIELDS, values))),
+                    item,
+                ))
+                continue
+
+            product_info_id = current[0]
+            if current[1:] != values:
+                to_update.append(ProductInfo(id=product_info_id, **dict(zip(OFFER_FIELDS, values))))
+            existing.append((product_info_id, item))
+
+        created = ProductInfo.objects.bulk_create(
+            [product_info for product_info, _ in to_create], batch_size=self.batch_size
+        )
+        ProductInfo.objects.bulk_update(to_update, OFFER_FIELDS, batch_size=self.batch_size)
+
+        new_parameters = [
+            ProductParameter(product_info_id=product_info.id, parameter_id=parameter_id, value=value)
+            for product_info, (_, item) in zip(created, to_create)
+            for parameter_id, value in self._item_parameters(item).items()
+        ]
+        ProductParameter.objects.bulk_create(new_parameters, batch_size=self.batch_size)
+        stats.product_parameters_created += len(new_parameters)
+
+        changed_ids = {product_info.id for product_info in to_update}
+        changed_ids |= self._sync_parameters(existing, stats)
+
+        stats.created += len(created)
+        stats.updated += len(changed_ids)
+        stats.unchanged += len(existing) - len(changed_ids)
+
+        self.changed_ids |= changed_ids
+        self.changed_ids.update(product_info.id for product_info in created)
+
+    def _sync_parameters(self, existing, stats):
+        """
+        Сравнивает значения параметров существующих предложений
+        с прайс-листом и записывает только различия.
+
+        Returns:
+            set: Идентификаторы предложений с измененными параметрами
+        """
+        if not existing:
+            return set()
+
+        current = {}
+        for pp_id, product_info_id, parameter_id, value in ProductParameter.objects.filter(
+            product_info_id__in=[product_info_id for product_info_id, _ in existing]
+        ).values_list('id', 'product_info_id', 'parameter_id', 'value'):
+            current[(product_info_id, parameter_id)] = (pp_id, value)
+
+        to_create = []
+        to_update = []
+        changed_ids = set()
+        for product_info_id, item in existing:
+            for parameter_id, value in self._item_parameters(item).items():
+                old = current.pop((product_info_id, parameter_id), None)
+                if old is None:
+                    to_create.append(ProductParameter(
+                        product_info_id=product_info_id, parameter_id=parameter_id, value=value
+                    ))
+                elif old[1] != value:
+                    to_update.append(ProductParameter(id=old[0], value=value))
+                else:
+                    continue
+                changed_ids.add(product_info_id)
+
+        to_delete = [pp_id for pp_id, _ in current.values()]
+        changed_ids |= {product_info_id for product_info_id, _ in current}
+
+        ProductParameter.objects.bulk_create(to_create, batch_size=self.batch_size)
+        ProductParameter.objects.bulk_update(to_update, ['value'], batch_size=self.batch_size)
+        if to_delete:
+            ProductParameter.objects.filter(id__in=to_delete).delete()
+
+        stats.product_parameters_created += len(to_create)
+        stats.product_parameters_updated += len(to_update)
+        stats.product_parameters_deleted += len(to_delete)
+        return changed_ids
+
+    def _remove_missing_offers(self, shop, stats):
+        """
+        Удаляет предложения, которых больше нет в прайс-листе.
+
+        Предложения, на которые ссылаются позиции заказов, не удаляются
+        (удаление каскадно удалило бы позиции), а снимаются с продажи.
+        Удаленные и снятые с продажи предложения добавляются в changed_ids.
+        """
+        missing_ids = [offer[0] for offer in self.offers.values()]
+        for ids in chunked(missing_ids, self.batch_size):
+            ordered = set(OrderItem.objects.filter(
+                product_info_id__in=ids
+            ).values_list('product_info_id', flat=True))
+
+            removable = [product_info_id for product_info_id in ids if product_info_id not in ordered]
+            if removable:
+                _, deleted = ProductInfo.objects.filter(id__in=removable).delete()
+                stats.deleted += deleted.get(ProductInfo._meta.label, 0)
+                self.changed_ids.update(removable)
+            retired = set(ProductInfo.objects.filter(
+                id__in=ordered, quantity__gt=0
+            ).values_list('id', flat=True))
+            if retired:
+                stats.retired += ProductInfo.objects.filter(id__in=retired).update(quantity=0)
+                self.changed_ids |= retired
+        self.offers = {}
+
+    def _item_parameters(self, item):
+        """
+        Возвращает параметры товара в виде {parameter_id: value}.
+        """
+        return {
+            self.parameters[name]: str(value)
+            for name, value in (item.get('parameters') or {}).items()
+        }
+
+    def _create_missing_products(self, goods, stats):
+        keys = {(item['name'], int(item['category'])) for item in goods}
+        missing = [key for key in keys if key not in self.products]
+        if missing:
+            self._lock_dictionaries()
+            missing = [key for key in missing if key not in self.products]
+        if not missing:
+            return
+
+        created = Product.objects.bulk_create(
+            [Product(name=name, category_id=category_id) for name, category_id in missing],
+            batch_size=self.batch_size,
+        )
+        for product in created:
+            self.products[(product.name, product.category_id)] = product.id
+        stats.products_created += len(created)
+
+    def _create_missing_parameters(self, goods, stats):
+        names = {name for item in goods for name in (item.get('parameters') or {})}
+        missing = [name for name in names if name not in self.parameters]
+        if missing:
+            self._lock_dictionaries()
+            missing = [name for name in missing if name not in self.parameters]
+        if not missing:
+            return
+
+        created = Parameter.objects.bulk_create(
+            [Parameter(name=name) for name in missing],
+            batch_size=self.batch_size,
+        )
+        for parameter in created:
+            self.parameters[parameter.name] = parameter.id
+        stats.parameters_created += len(created)
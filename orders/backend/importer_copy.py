@@ -0,0 +1,316 @@
+"""
+Импорт прайс-листов через PostgreSQL COPY.
+
+Вариант движка импорта для очень больших прайс-листов: товары и их
+параметры потоково загружаются командой COPY FROM STDIN (psycopg2)
+во временные промежуточные таблицы, а затем сливаются в
+backend_product, backend_productinfo и backend_productparameter
+несколькими множественными INSERT ... ON CONFLICT / UPDATE / DELETE.
+
+Семантика совпадает с PriceListImporter: синхронизация по ключу
+(shop, external_id), сводка изменений и снятие с продажи заказанных
+предложений вместо удаления. Работает только с PostgreSQL.
+"""
+
+import csv
+import io
+import time
+
+from django.db import connection, transaction
+
+from .catalog_version import bump_catalog_version
+from .importer import ImportStats, PriceListImporter, QueryCounter, chunked
+from .models import Shop, Product, ProductInfo, Parameter, ProductParameter, OrderItem
+from .signals import offers_changed
+
+
+STAGING_OFFERS = 'import_staging_offers'
+STAGING_PARAMETERS = 'import_staging_parameters'
+
+
+class CopyPriceListImporter(PriceListImporter):
+    """
+    Импорт прайс-листа через COPY в промежуточные таблицы и слияние SQL.
+
+    Промежуточные таблицы создаются как TEMP ... ON COMMIT DROP: они
+    не пишутся в WAL (как UNLOGGED), видны только текущему соединению
+    и удаляются по завершении транзакции импорта.
+    """
+
+    def run(self, data):
+        """
+        Синхронизирует предложения магазина с прайс-листом.
+
+        Args:
+            data (dict): Данные прайс-листа (shop, categories, goods)
+
+        Returns:
+            ImportStats: Статистика и сводка изменений
+        """
+        if connection.vendor != 'postgresql':
+            raise RuntimeError('Движок импорта copy работает только с PostgreSQL')
+
+        stats = ImportStats(shop=data['shop'])
+        counter = QueryCounter()
+        start = time.monotonic()
+
+        self.category_ids = None
+        self.dictionaries_locked = False
+
+        with connection.execute_wrapper(counter), transaction.atomic():
+            shop, _ = Shop.objects.get_or_create(name=data['shop'])
+            self._import_categories(shop, data['categories'], stats)
+
+            with connection.cursor() as cursor:
+                self._create_staging_tables(cursor)
+
+                for goods in chunked(data['goods'], self.batch_size):
+                    self._copy_goods(cursor, goods, stats)
+                    stats.queries += 2
+                    if self.progress:
+                        stats.duration = time.monotonic() - start
+                        self.progress(stats)
+
+                self._merge(cursor, shop, stats)
+                self._drop_staging_tables(cursor)
+
+            if self.dry_run:
+                transaction.set_rollback(True)
+            elif stats.modified:
+                bump_catalog_version(shop.id)
+
+        stats.duration = time.monotonic() - start
+        stats.queries += counter.count
+        return stats
+
+    def _drop_staging_tables(self, cursor):
+        # ON COMMIT DROP не срабатывает, если импорт выполняется внутри
+        # внешней транзакции, поэтому таблицы удаляются и явно
+        cursor.execute(f'DROP TABLE IF EXISTS {STAGING_OFFERS}, {STAGING_PARAMETERS}')
+
+    def _create_staging_tables(self, cursor):
+        self._drop_staging_tables(cursor)
+        cursor.execute(f'''
+            CREATE TEMP TABLE {STAGING_OFFERS} (
+                seq bigint NOT NULL,
+                external_id bigint NOT NULL,
+                category_id bigint NOT NULL,
+                name varchar(80) NOT NULL,
+                model varchar(80) NOT NULL,
+                price integer NOT NULL,
+                price_rrc integer NOT NULL,
+                quantity integer NOT NULL
+            ) ON COMMIT DROP
+        ''')
+        cursor.execute(f'''
+            CREATE TEMP TABLE {STAGING_PARAMETERS} (
+                seq bigint NOT NULL,
+                name varchar(40) NOT NULL,
+                value varchar(100) NOT NULL
+            ) ON COMMIT DROP
+        ''')
+
+    def _copy_goods(self, cursor, goods, stats):
+        """
+        Загружает пакет товаров в промежуточные таблицы через COPY.
+        """
+        offers = io.StringIO()
+        parameters = io.StringIO()
+        offers_writer = csv.writer(offers)
+        parameters_writer = csv.writer(parameters)
+
+        for item in goods:
+            seq = stats.product_infos
+            stats.product_infos += 1
+            offers_writer.writerow((
+                seq, item['id'], item['category'], item['name'], item.get('model') or '',
+                item['price'], item['price_rrc'], item['quantity'],
+            ))
+            for name, value in (item.get('parameters') or {}).items():
+                parameters_writer.writerow((seq, name, str(value)))
+
+        offers.seek(0)
+        parameters.seek(0)
+        cursor.copy_expert(
+            f'COPY {STAGING_OFFERS} FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (name, model))',
+            offers,
+        )
+        cursor.copy_expert(
+            f'COPY {STAGING_PARAMETERS} FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (name, value))',
+            parameters,
+        )
+
+    def _merge(self, cursor, shop, stats):
+        """
+        Сливает промежуточные таблицы с рабочими множественными запросами.
+        """
+        product_table = Product._meta.db_table
+        product_info_table = ProductInfo._meta.db_table
+        parameter_table = Parameter._meta.db_table
+        product_parameter_table = ProductParameter._meta.db_table
+        order_item_table = OrderItem._meta.db_table
+
+        # Повторы external_id в прайс-листе: учитывается первое вхождение
+        cursor.execute(f'''
+            DELETE FROM {STAGING_OFFERS} s
+            USING {STAGING_OFFERS} d
+            WHERE s.external_id = d.external_id AND s.seq > d.seq
+        ''')
+        stats.duplicates = cursor.rowcount
+        stats.product_infos -= cursor.rowcount
+        cursor.execute(f'CREATE INDEX ON {STAGING_OFFERS} (external_id)')
+        cursor.execute(f'CREATE INDEX ON {STAGING_PARAMETERS} (seq)')
+        cursor.execute(f'ANALYZE {STAGING_OFFERS}')
+        cursor.execute(f'ANALYZE {STAGING_PARAMETERS}')
+
+        # У Product и Parameter нет уникальных ограничений, поэтому
+        # вместо ON CONFLICT используется NOT EXISTS под блокировкой
+        # записи справочников (если есть что создавать)
+        cursor.execute(f'''
+            SELECT EXISTS (
+                SELECT 1 FROM {STAGING_OFFERS} s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {product_table} p
+                    WHERE p.name = s.name AND p.category_id = s.category_id
+                )
+            ) OR EXISTS (
+                SELECT 1 FROM {STAGING_PARAMETERS} s
+                WHERE NOT EXISTS (SELECT 1 FROM {parameter_table} p WHERE p.name = s.name)
+            )
+        ''')
+        if cursor.fetchone()[0]:
+            self._lock_dictionaries()
+
+        cursor.execute(f'''
+            INSERT INTO {product_table} (name, category_id)
+            SELECT DISTINCT s.name, s.category_id
+            FROM {STAGING_OFFERS} s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {product_table} p
+                WHERE p.name = s.name AND p.category_id = s.category_id
+            )
+        ''')
+        stats.products_created = cursor.rowcount
+
+        cursor.execute(f'''
+            INSERT INTO {parameter_table} (name)
+            SELECT DISTINCT s.name
+            FROM {STAGING_PARAMETERS} s
+            WHERE NOT EXISTS (SELECT 1 FROM {parameter_table} p WHERE p.name = s.name)
+        ''')
+        stats.parameters_created = cursor.rowcount
+
+        cursor.execute(f'''
+            INSERT INTO {product_info_table}
+                (shop_id, external_id, product_id, model, price, price_rrc, quantity)
+            SELECT %s, s.external_id, p.id, s.model, s.price, s.price_rrc, s.quantity
+            FROM {STAGING_OFFERS} s
+            JOIN (
+                SELECT name, category_id, MIN(id) AS id
+                FROM {product_table}
+                WHERE category_id IN (SELECT DISTINCT category_id FROM {STAGING_OFFERS})
+                GROUP BY name, category_id
+            ) p ON p.name = s.name AND p.category_id = s.category_id
+            ON CONFLICT (shop_id, external_id) DO UPDATE SET
+                product_id = EXCLUDED.product_id,
+                model = EXCLUDED.model,
+                price = EXCLUDED.price,
+                price_rrc = EXCLUDED.price_rrc,
+                quantity = EXCLUDED.quantity
+            WHERE ({product_info_table}.product_id, {product_info_table}.model,
+                   {product_info_table}.price, {product_info_table}.price_rrc,
+                   {product_info_table}.quantity)
+                IS DISTINCT FROM
+                  (EXCLUDED.product_id, EXCLUDED.model, EXCLUDED.price,
+                   EXCLUDED.price_rrc, EXCLUDED.quantity)
+            RETURNING id, (xmax = 0) AS inserted
+        ''', [shop.id])
+        created_ids = set()
+        changed_ids = set()
+        for product_info_id, inserted in cursor.fetchall():
+            (created_ids if inserted else changed_ids).add(product_info_id)
+
+        staged_parameters = f'''
+            SELECT pi.id AS product_info_id, p.id AS parameter_id, sp.value
+            FROM {STAGING_PARAMETERS} sp
+            JOIN {STAGING_OFFERS} s ON s.seq = sp.seq
+            JOIN {product_info_table} pi ON pi.shop_id = %s AND pi.external_id = s.external_id
+            JOIN (SELECT name, MIN(id) AS id FROM {parameter_table} GROUP BY name) p ON p.name = sp.name
+        '''
+        cursor.execute(f'''
+            INSERT INTO {product_parameter_table} (product_info_id, parameter_id, value)
+            {staged_parameters}
+            ON CONFLICT (product_info_id, parameter_id) DO UPDATE SET value = EXCLUDED.value
+            WHERE {product_parameter_table}.value IS DISTINCT FROM EXCLUDED.value
+            RETURNING product_info_id, (xmax = 0) AS inserted
+        ''', [shop.id])
+        for product_info_id, inserted in cursor.fetchall():
+            if inserted:
+                stats.product_parameters_created += 1
+            else:
+                stats.product_parameters_updated += 1
+            changed_ids.add(product_info_id)
+
+        cursor.execute(f'''
+            DELETE FROM {product_parameter_table} pp
+            USING {product_info_table} pi, {STAGING_OFFERS} s
+            WHERE pp.product_info_id = pi.id
+              AND pi.shop_id = %s AND pi.external_id = s.external_id
+              AND NOT EXISTS (
+                  SELECT 1 FROM {STAGING_PARAMETERS} sp
+                  JOIN {parameter_table} p ON p.name = sp.name
+                  WHERE sp.seq = s.seq AND p.id = pp.parameter_id
+              )
+            RETURNING pp.product_info_id
+        ''', [shop.id])
+        deleted_parameters = cursor.fetchall()
+        stats.product_parameters_deleted = len(deleted_parameters)
+        changed_ids.update(product_info_id for product_info_id, in deleted_parameters)
+
+        changed_ids -= created_ids
+        stats.created = len(created_ids)
+        stats.updated = len(changed_ids)
+        stats.unchanged = stats.product_infos - stats.created - stats.updated
+
+        missing = f'''
+            {product_info_table}.shop_id = %s
+            AND NOT EXISTS (
+                SELECT 1 FROM {STAGING_OFFERS} s
+                WHERE s.external_id = {product_info_table}.external_id
+            )
+        '''
+        ordered = f'''
+            EXISTS (
+                SELECT 1 FROM {order_item_table} oi
+                WHERE oi.product_info_id = {product_info_table}.id
+            )
+        '''
+        cursor.execute(f'''
+            UPDATE {product_info_table} SET quantity = 0
+            WHERE {missing} AND {ordered} AND quantity > 0
+            RETURNING id
+        ''', [shop.id])
+        retired_ids = {product_info_id for product_info_id, in cursor.fetchall()}
+        stats.retired = len(retired_ids)
+
+        cursor.execute(f'''
+            DELETE FROM {product_parameter_table}
+            WHERE product_info_id IN (
+                SELECT id FROM {product_info_table}
+                WHERE {missing} AND NOT {ordered}
+            )
+        ''', [shop.id])
+        cursor.execute(f'''
+            DELETE FROM {product_info_table}
+            WHERE {missing} AND NOT {ordered}
+            RETURNING id
+        ''', [shop.id])
+        deleted_ids = {product_info_id for product_info_id, in cursor.fetchall()}
+        stats.deleted = len(deleted_ids)
+
+        # Один сигнал на созданные, измененные, снятые с продажи и удаленные
+        # предложения: обработчики пересчитывают данные всего магазина один раз.
+        # Пробный запуск откатывается, производные данные не пересчитываются
+        product_info_ids = created_ids | changed_ids | retired_ids | deleted_ids
+        if product_info_ids and not self.dry_run:
+            offers_changed.send(sender=self.__class__, shop_id=shop.id, product_info_ids=product_info_ids)
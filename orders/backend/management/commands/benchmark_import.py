@@ -0,0 +1,154 @@
+"""
+Нагрузочное тестирование движков импорта на синтетическом каталоге.
+
+Для каждого движка выполняются два прогона: первичный импорт в пустой
+каталог (initial) и повторный импорт тех же прайс-листов (reimport).
+Результаты записываются в JSON для сравнения между запусками.
+
+Команда пишет в настроенную базу данных: синтетические магазины,
+категории и параметры удаляются до и после каждого движка.
+"""
+
+import json
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from backend.catalog_generator import CATEGORY_ID_BASE, PARAMETER_NAME_PREFIX, SHOP_NAME_PREFIX, write_price_lists
+from backend.importer import IMPORT_ENGINES, get_importer
+from backend.models import Category, Parameter, Shop
+from backend.price_list import read_price_list
+
+
+def clear_synthetic_catalog():
+    """
+    Удаляет данные, созданные импортом синтетических прайс-листов.
+    """
+    Shop.objects.filter(name__startswith=SHOP_NAME_PREFIX).delete()
+    Category.objects.filter(id__gte=CATEGORY_ID_BASE).delete()
+    Parameter.objects.filter(name__startswith=PARAMETER_NAME_PREFIX).delete()
+
+
+def run_import(engine, paths, batch_size=None, trace_memory=True):
+    """
+    Импортирует прайс-листы одним движком и замеряет ресурсы.
+
+    Пиковая память Python считается через tracemalloc, который заметно
+    замедляет импорт; при trace_memory=False она не измеряется (None).
+
+    Returns:
+        dict: Время, скорость, пиковая память, число запросов и сводка изменений
+    """
+    rows = queries = 0
+    changes = {}
+    if trace_memory:
+        tracemalloc.start()
+    start = time.monotonic()
+    try:
+        for path in paths:
+            with open(path, 'rb') as file:
+                stats = get_importer(engine, batch_size=batch_size).run(read_price_list(file))
+            rows += stats.product_infos
+            queries += stats.queries
+            for key, value in stats.changes.items():
+                changes[key] = changes.get(key, 0) + value
+        wall_time = time.monotonic() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'wall_time': round(wall_time, 3),
+        'rows': rows,
+        'rows_per_sec': round(rows / wall_time, 1) if wall_time else 0.0,
+        'peak_memory': peak_memory,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'queries': queries,
+        'changes': changes,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Нагрузочное тестирование движков импорта прайс-листов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shops', type=int, default=2, help='Число магазинов')
+        parser.add_argument('--categories', type=int, default=20, help='Число категорий')
+        parser.add_argument('--goods', type=int, default=10000, help='Число товаров в прайс-листе')
+        parser.add_argument('--parameters', type=int, default=5, help='Число параметров у товара')
+        parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора')
+        parser.add_argument(
+            '--engine',
+            action='append',
+            choices=list(IMPORT_ENGINES),
+            dest='engines',
+            help='Движок импорта (можно указать несколько раз, по умолчанию - все доступные)'
+        )
+        parser.add_argument('--batch-size', type=int, default=None, help='Размер пакета импорта')
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Файл для результатов (по умолчанию import_benchmark_<дата>.json)'
+        )
+        parser.add_argument(
+            '--no-trace-memory',
+            action='store_true',
+            help='Не измерять пиковую память (tracemalloc искажает время импорта)'
+        )
+        parser.add_argument('--keep', action='store_true', help='Не удалять синтетический каталог после замеров')
+
+    def handle(self, *args, **options):
+        engines = options['engines'] or [
+            engine for engine in IMPORT_ENGINES
+            if engine != 'copy' or connection.vendor == 'postgresql'
+        ]
+        if 'copy' in engines and connection.vendor != 'postgresql':
+            raise CommandError('Движок copy требует PostgreSQL')
+
+        params = {
+            key: options[key] for key in ('shops', 'categories', 'goods', 'parameters', 'seed', 'batch_size')
+        }
+        report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'database': connection.vendor,
+            'params': params,
+            'trace_memory': not options['no_trace_memory'],
+            'results': [],
+        }
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            self.stdout.write('Генерация прайс-листов...')
+            paths = write_price_lists(
+                output_dir,
+                shops=options['shops'],
+                categories=options['categories'],
+                goods=options['goods'],
+                parameters=options['parameters'],
+                seed=options['seed'],
+            )
+
+            for engine in engines:
+                clear_synthetic_catalog()
+                for run in ('initial', 'reimport'):
+                    result = {'engine': engine, 'run': run, **run_import(
+                        engine, paths, options['batch_size'], trace_memory=not options['no_trace_memory'],
+                    )}
+                    report['results'].append(result)
+                    memory = result['peak_memory']
+                    self.stdout.write(
+                        f"{engine:>6} {run:<9} {result['wall_time']:>9.3f}s "
+                        f"{result['rows_per_sec']:>11.1f} строк/с "
+                        f"{memory / 2 ** 20 if memory is not None else 0:>8.1f} МБ "
+                        f"{result['queries']:>7} запросов"
+                    )
+                if not options['keep']:
+                    clear_synthetic_catalog()
+
+        output = options['output'] or f"import_benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Результаты записаны в {output}'))
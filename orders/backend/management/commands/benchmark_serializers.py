@@ -0,0 +1,89 @@
+"""
+Сравнение скорости сериализации списка товаров.
+
+Каждый способ сериализует одни и те же предложения (первые --rows по id)
+и рендерит JSON; время включает запросы к базе. Кэш запросов cachalot
+на время замеров отключается. Для каждого способа выводится лучшее время
+из --repeat прогонов в пересчете на строку и признак совпадения JSON с
+ProductInfoSerializer байт в байт.
+"""
+
+import json
+import time
+
+from cachalot.api import cachalot_disabled
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from backend.models import CatalogEntry, ProductInfo, ProductParameter
+from backend.serializers import CatalogEntrySerializer, ProductInfoSerializer
+from backend.serializers_fast import CATALOG_ENTRY_VALUES, catalog_entry_rows, product_info_rows
+
+
+def serialize_product_infos(ids):
+    offers = ProductInfo.objects.filter(id__in=ids).order_by('id').select_related('product').prefetch_related(
+        Prefetch('product_parameters', queryset=ProductParameter.objects.select_related('parameter').order_by('id')),
+        'product__additional_images',
+    )
+    return ProductInfoSerializer(offers, many=True).data
+
+
+def serialize_catalog_entries(ids):
+    return CatalogEntrySerializer(CatalogEntry.objects.filter(pk__in=ids).order_by('pk'), many=True).data
+
+
+# Способ сериализации -> функция (идентификаторы предложений) -> данные
+SERIALIZERS = {
+    'ProductInfoSerializer': serialize_product_infos,
+    'product_info_rows': lambda ids: product_info_rows(ProductInfo.objects.filter(id__in=ids).order_by('id')),
+    'CatalogEntrySerializer': serialize_catalog_entries,
+    'catalog_entry_rows': lambda ids: catalog_entry_rows(
+        CatalogEntry.objects.filter(pk__in=ids).order_by('pk').values(*CATALOG_ENTRY_VALUES)
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = 'Сравнение скорости сериализаторов списка товаров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Число предложений')
+        parser.add_argument('--repeat', type=int, default=5, help='Число прогонов каждого способа')
+        parser.add_argument('--output', default=None, help='Файл для результатов в JSON')
+
+    def handle(self, *args, **options):
+        ids = list(ProductInfo.objects.order_by('id').values_list('id', flat=True)[:options['rows']])
+        if not ids:
+            raise CommandError('Каталог пуст')
+
+        renderer = JSONRenderer()
+        results = []
+        expected = None
+        with cachalot_disabled():
+            for name, serialize in SERIALIZERS.items():
+                best = None
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    content = renderer.render(serialize(ids))
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                if expected is None:
+                    expected = content
+                result = {
+                    'serializer': name,
+                    'rows': len(ids),
+                    'wall_time': round(best, 4),
+                    'us_per_row': round(best / len(ids) * 1e6, 1),
+                    'identical': content == expected,
+                }
+                results.append(result)
+                self.stdout.write(
+                    f"{name:<24} {result['wall_time']:>8.4f}s {result['us_per_row']:>9.1f} мкс/строка "
+                    f"{'JSON совпадает' if result['identical'] else 'JSON ОТЛИЧАЕТСЯ'}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({'rows': len(ids), 'repeat': options['repeat'], 'results': results}, file, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Результаты записаны в {options['output']}"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.catalog_generator import write_price_lists
+
+
+class Command(BaseCommand):
+    help = 'Генерация синтетических прайс-листов в формате shop1.yaml'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help='Каталог для прайс-листов')
+        parser.add_argument('--shops', type=int, default=1, help='Число магазинов (по прайс-листу на магазин)')
+        parser.add_argument('--categories', type=int, default=10, help='Число категорий')
+        parser.add_argument('--goods', type=int, default=1000, help='Число товаров в прайс-листе')
+        parser.add_argument('--parameters', type=int, default=5, help='Число параметров у товара')
+        parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора')
+
+    def handle(self, *args, **options):
+        if min(options['shops'], options['categories']) < 1 or min(options['goods'], options['parameters']) < 0:
+            raise CommandError('Число магазинов и категорий должно быть положительным, товаров и параметров - неотрицательным')
+
+        paths = write_price_lists(
+            options['output_dir'],
+            shops=options['shops'],
+            categories=options['categories'],
+            goods=options['goods'],
+            parameters=options['parameters'],
+            seed=options['seed'],
+        )
+        for path in paths:
+            self.stdout.write(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано прайс-листов: {len(paths)}, товаров: {len(paths) * options['goods']}"
+        ))
@@ -0,0 +1,146 @@
+"""
+Массовый импорт прайс-листов из файлов и по URL.
+
+Пример ночной перезагрузки каталога в 4 процесса:
+
+    python manage.py import_pricelist /data/*.yaml https://partner.example.com/price.yaml --jobs 4
+
+Процессы импортируют разные прайс-листы параллельно; новые записи общих
+справочников (категорий, продуктов, параметров) создаются по очереди
+(см. backend.importer).
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from backend.importer import IMPORT_ENGINES, get_importer
+from backend.price_list import download_price_list, read_price_list
+
+
+def _init_worker():
+    """
+    Инициализирует процесс-исполнитель: соединения с базой,
+    унаследованные от родителя, не должны использоваться совместно.
+    """
+    django.setup()
+    connections.close_all()
+
+
+def import_source(source, engine=None, batch_size=None, dry_run=False):
+    """
+    Импортирует один прайс-лист из файла или по URL.
+
+    Args:
+        source (str): Путь к файлу или URL (http/https)
+        engine (str): Движок импорта
+        batch_size (int): Размер пакета
+        dry_run (bool): Посчитать изменения без записи в базу
+
+    Returns:
+        dict: source и статистика импорта (stats) или ошибка (error)
+    """
+    importer = get_importer(engine, batch_size=batch_size, dry_run=dry_run)
+    try:
+        if source.startswith(('http://', 'https://')):
+            with download_price_list(source, timeout=settings.PRICE_LIST_DOWNLOAD_TIMEOUT) as download:
+                stats = importer.run(read_price_list(download.file))
+        else:
+            with open(source, 'rb') as file:
+                stats = importer.run(read_price_list(file))
+    except Exception as e:
+        return {'source': source, 'error': str(e)}
+    return {'source': source, 'stats': stats.as_dict()}
+
+
+class Command(BaseCommand):
+    help = 'Импорт прайс-листов из файлов и по URL (пакетно, в несколько процессов)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sources',
+            nargs='+',
+            help='Пути к YAML файлам или URL прайс-листов'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Размер пакета для bulk_create (по умолчанию PRICE_LIST_IMPORT_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--engine',
+            choices=list(IMPORT_ENGINES),
+            default=None,
+            help='Движок импорта (по умолчанию PRICE_LIST_IMPORT_ENGINE)'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Число параллельных процессов импорта (по одному прайс-листу на процесс)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Посчитать изменения без записи в базу'
+        )
+
+    def handle(self, *args, **options):
+        if options['jobs'] < 1:
+            raise CommandError('--jobs должен быть не меньше 1')
+
+        sources = options['sources']
+        kwargs = {
+            'engine': options['engine'],
+            'batch_size': options['batch_size'],
+            'dry_run': options['dry_run'],
+        }
+        jobs = min(options['jobs'], len(sources))
+
+        start = time.monotonic()
+        if jobs == 1:
+            results = [import_source(source, **kwargs) for source in sources]
+        else:
+            # Соединения родителя закрываются до fork, чтобы процессы не делили сокет
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as executor:
+                futures = [executor.submit(import_source, source, **kwargs) for source in sources]
+                results = [future.result() for future in futures]
+        wall_time = time.monotonic() - start
+
+        self._write_summary(results, wall_time, options['dry_run'])
+
+        failed = [result for result in results if 'error' in result]
+        if failed:
+            raise CommandError(f'Не удалось импортировать {len(failed)} из {len(results)} прайс-листов')
+
+    def _write_summary(self, results, wall_time, dry_run):
+        """
+        Выводит сводную статистику по всем прайс-листам.
+        """
+        imported = [result['stats'] for result in results if 'stats' in result]
+        rows = sum(stats['product_infos'] for stats in imported)
+        changes = {}
+        for stats in imported:
+            for key, value in stats['changes'].items():
+                changes[key] = changes.get(key, 0) + value
+
+        if dry_run:
+            self.stdout.write('=== Пробный запуск: изменения не записаны ===')
+        self.stdout.write(f'Прайс-листов: {len(results)}, успешно: {len(imported)}, '
+                          f'с ошибками: {len(results) - len(imported)}')
+        self.stdout.write(f'Магазинов: {len({stats["shop"] for stats in imported})}')
+        self.stdout.write(f'Предложений: {rows}')
+        self.stdout.write('Изменения: ' + ', '.join(f'{key}={value}' for key, value in changes.items()))
+        self.stdout.write(f'SQL-запросов: {sum(stats["queries"] for stats in imported)}')
+        self.stdout.write(f'Время: {wall_time:.3f}s')
+        self.stdout.write(f'Скорость: {rows / wall_time if wall_time else 0.0:.1f} строк/с')
+
+        for result in results:
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"Ошибка импорта {result['source']}: {result['error']}"))
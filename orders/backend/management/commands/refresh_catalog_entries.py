@@ -0,0 +1,30 @@
+"""
+Пересборка витрины каталога (CatalogEntry).
+
+Витрина обновляется по сигналам изменений предложений (см.
+backend.signals); команда пересобирает ее целиком, например после
+миграции 0011, которая не может вычислить URL изображений товаров:
+
+    python manage.py refresh_catalog_entries
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from backend.catalog_entries import CATALOG_ENTRY_BATCH_SIZE, refresh_catalog_entries
+from backend.catalog_version import bump_catalog_version
+from backend.models import ProductInfo, Shop
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает витрину каталога по предложениям'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=CATALOG_ENTRY_BATCH_SIZE, help='Размер пакета')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            product_info_ids = list(ProductInfo.objects.values_list('id', flat=True))
+            refresh_catalog_entries(product_info_ids, batch_size=options['batch_size'])
+            bump_catalog_version(*Shop.objects.values_list('id', flat=True))
+        self.stdout.write(f'Обновлено строк витрины: {len(product_info_ids)}')
@@ -5,9 +5,12 @@ Middleware для измерения времени запросов и кэши
 import time
 from django.core.cache import cache
 from django.db import connection
+from django.utils.cache import get_conditional_response
 import json
 import hashlib
 
+from .catalog_version import get_catalog_version
+
 class CacheMetricsMiddleware:
     """
     Middleware для сбора метрик по кэшированию.
@@ -82,6 +85,9 @@ class QueryCacheMiddleware:
 
             cached_response = cache.get(cache_key)
             if cached_response is not None:
+                if cached_response.has_header('ETag'):
+                    # 304, если ETag закэшированного ответа совпадает с If-None-Match
+                    return get_conditional_response(request, etag=cached_response['ETag'], response=cached_response)
                 return cached_response
             response = self.get_response(request)
 
@@ -102,6 +108,9 @@ class QueryCacheMiddleware:
             'query': dict(request.GET),
             'user_id': str(request.user.id) if request.user.is_authenticated else 'annonymous',
         }
+        if request.path.startswith('/api/products'):
+            # Изменение каталога делает закэшированные ответы неактуальными
+            key_data['catalog_version'] = get_catalog_version()
         key_string = json.dumps(key_data, sort_keys=True)
         return f'api_cache:{hashlib.sha256(key_string.encode()).hexdigest()}'
     
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:36
+
+from django.db import migrations, models
+
+
+def merge_duplicate_offers(apps, schema_editor):
+    # До ключа синхронизации повторный импорт создавал дубликаты предложений
+    # магазина с тем же external_id. Остается предложение, на которое ссылаются
+    # позиции заказов (иначе - последнее созданное); позиции заказов дубликатов
+    # переносятся на него, дубликаты удаляются вместе с параметрами.
+    schema_editor.execute("""
+        CREATE TEMPORARY TABLE productinfo_duplicates AS
+        SELECT id, keep_id FROM (
+            SELECT pi.id, first_value(pi.id) OVER (
+                PARTITION BY pi.shop_id, pi.external_id
+                ORDER BY EXISTS (
+                    SELECT 1 FROM backend_orderitem oi WHERE oi.product_info_id = pi.id
+                ) DESC, pi.id DESC
+            ) AS keep_id
+            FROM backend_productinfo pi
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    schema_editor.execute("""
+        UPDATE backend_orderitem oi SET product_info_id = d.keep_id
+        FROM productinfo_duplicates d WHERE oi.product_info_id = d.id
+    """)
+    schema_editor.execute("""
+        DELETE FROM backend_productparameter pp
+        USING productinfo_duplicates d WHERE pp.product_info_id = d.id
+    """)
+    schema_editor.execute("""
+        DELETE FROM backend_productinfo pi
+        USING productinfo_duplicates d WHERE pi.id = d.id
+    """)
+    schema_editor.execute('DROP TABLE productinfo_duplicates')
+    # Отложенные проверки внешних ключей - до изменения таблицы в той же транзакции
+    schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_product_image_productimage'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_offers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='productinfo',
+            constraint=models.UniqueConstraint(fields=('shop_id', 'external_id'), name='unique_shop_external_id'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_productinfo_unique_shop_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceListSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True, verbose_name='Ссылка')),
+                ('etag', models.CharField(blank=True, max_length=255, verbose_name='ETag')),
+                ('last_modified', models.CharField(blank=True, max_length=64, verbose_name='Last-Modified')),
+                ('content_hash', models.CharField(blank=True, max_length=64, verbose_name='Хэш содержимого')),
+                ('imported_at', models.DateTimeField(auto_now=True, verbose_name='Время импорта')),
+                ('shop', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_list_sources', to='backend.shop', verbose_name='Магазин')),
+            ],
+            options={
+                'verbose_name': 'Источник прайс-листа',
+                'verbose_name_plural': 'Список источников прайс-листов',
+                'ordering': ('-imported_at',),
+            },
+        ),
+    ]
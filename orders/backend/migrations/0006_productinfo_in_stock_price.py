@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_pricelistsource'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productinfo',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['price', 'id'], name='productinfo_in_stock_price'),
+        ),
+    ]
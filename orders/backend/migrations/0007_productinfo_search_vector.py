@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+def fill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Та же конфигурация, что и при пересчете векторов (backend.search)
+    config = getattr(settings, 'SEARCH_CONFIG', 'russian')
+    schema_editor.execute("""
+        UPDATE backend_productinfo pi SET search_vector =
+            setweight(to_tsvector(%(config)s::regconfig, p.name), 'A')
+            || setweight(to_tsvector(%(config)s::regconfig, translate(pi.model, '/', ' ')), 'B')
+            || setweight(to_tsvector(%(config)s::regconfig, coalesce((
+                SELECT string_agg(pp.value, ' ')
+                FROM backend_productparameter pp
+                WHERE pp.product_info_id = pi.id
+            ), '')), 'C')
+        FROM backend_product p
+        WHERE p.id = pi.product_id
+    """, {'config': config})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_productinfo_in_stock_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productinfo',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='productinfo',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='productinfo_search_vector'),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
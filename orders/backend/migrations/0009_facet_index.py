@@ -0,0 +1,106 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:12
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_facets(apps, schema_editor):
+    schema_editor.execute("""
+        INSERT INTO backend_facetvalue (parameter_id, value)
+        SELECT DISTINCT parameter_id, value FROM backend_productparameter
+        ON CONFLICT (parameter_id, value) DO NOTHING
+    """)
+    schema_editor.execute("""
+        UPDATE backend_productinfo pi SET facets = ARRAY(
+            SELECT fv.id
+            FROM backend_productparameter pp
+            JOIN backend_facetvalue fv ON fv.parameter_id = pp.parameter_id AND fv.value = pp.value
+            WHERE pp.product_info_id = pi.id
+            ORDER BY fv.id
+        )
+    """)
+    schema_editor.execute("""
+        INSERT INTO backend_facetcount (shop_id, category_id, facet_value_id, count)
+        SELECT pi.shop_id, p.category_id, facet_value_id, count(*)
+        FROM backend_productinfo pi
+        JOIN backend_product p ON p.id = pi.product_id,
+        unnest(pi.facets) AS facet_value_id
+        WHERE pi.quantity > 0
+        GROUP BY pi.shop_id, p.category_id, facet_value_id
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(verbose_name='Количество предложений')),
+            ],
+            options={
+                'verbose_name': 'Счетчик фасета',
+                'verbose_name_plural': 'Счетчики фасетов',
+            },
+        ),
+        migrations.CreateModel(
+            name='FacetValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=100, verbose_name='Значение')),
+            ],
+            options={
+                'verbose_name': 'Значение фасета',
+                'verbose_name_plural': 'Список значений фасетов',
+            },
+        ),
+        migrations.AddField(
+            model_name='productinfo',
+            name='facets',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, db_default=[], editable=False, size=None, verbose_name='Значения фасетов'),
+        ),
+        migrations.AddIndex(
+            model_name='productinfo',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['facets'], name='productinfo_facets'),
+        ),
+        migrations.AddField(
+            model_name='facetcount',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facet_counts', to='backend.category', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='facetcount',
+            name='shop',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facet_counts', to='backend.shop', verbose_name='Магазин'),
+        ),
+        migrations.AddField(
+            model_name='facetvalue',
+            name='parameter',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facet_values', to='backend.parameter', verbose_name='Параметр'),
+        ),
+        migrations.AddField(
+            model_name='facetcount',
+            name='facet_value',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counts', to='backend.facetvalue', verbose_name='Значение фасета'),
+        ),
+        migrations.AddConstraint(
+            model_name='facetvalue',
+            constraint=models.UniqueConstraint(fields=('parameter', 'value'), name='unique_facet_value'),
+        ),
+        migrations.AddIndex(
+            model_name='facetcount',
+            index=models.Index(fields=['category', 'facet_value'], name='facetcount_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('shop', 'category', 'facet_value'), name='unique_facet_count'),
+        ),
+        migrations.RunPython(fill_facets, migrations.RunPython.noop),
+    ]
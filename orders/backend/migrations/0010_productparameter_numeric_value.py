@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:14
+
+from django.db import migrations, models
+
+
+def fill_numeric_values(apps, schema_editor):
+    from backend.parameter_values import parse_numeric_value
+
+    ProductParameter = apps.get_model('backend', 'ProductParameter')
+    changed = []
+    for product_parameter in ProductParameter.objects.select_related('parameter').iterator(chunk_size=2000):
+        product_parameter.numeric_value, product_parameter.unit = parse_numeric_value(
+            product_parameter.parameter.name, product_parameter.value
+        )
+        if product_parameter.numeric_value is not None:
+            changed.append(product_parameter)
+        if len(changed) >= 2000:
+            ProductParameter.objects.bulk_update(changed, ['numeric_value', 'unit'])
+            changed = []
+    ProductParameter.objects.bulk_update(changed, ['numeric_value', 'unit'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_facet_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productparameter',
+            name='numeric_value',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Числовое значение'),
+        ),
+        migrations.AddField(
+            model_name='productparameter',
+            name='unit',
+            field=models.CharField(blank=True, db_default='', editable=False, max_length=10, verbose_name='Единица измерения'),
+        ),
+        migrations.AddIndex(
+            model_name='productparameter',
+            index=models.Index(condition=models.Q(('numeric_value__isnull', False)), fields=['parameter', 'numeric_value'], name='productparameter_numeric'),
+        ),
+        migrations.RunPython(fill_numeric_values, migrations.RunPython.noop),
+    ]
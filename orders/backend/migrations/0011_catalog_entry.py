@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_catalog_entries(apps, schema_editor):
+    # URL изображений и миниатюр вычисляются кодом моделей (imagekit), поэтому
+    # строки заполняются URL по умолчанию; изображения товаров записывает
+    # команда refresh_catalog_entries
+    schema_editor.execute("""
+        INSERT INTO backend_catalogentry (
+            product_info_id, product_id, category_id, shop_id, product_name, model, external_id,
+            quantity, price, price_rrc, parameters, image, image_url, thumbnail_url, additional_images
+        )
+        SELECT pi.id, p.id, p.category_id, pi.shop_id, p.name, pi.model, pi.external_id,
+               pi.quantity, pi.price, pi.price_rrc,
+               coalesce((
+                   SELECT jsonb_agg(jsonb_build_array(par.name, pp.value) ORDER BY pp.id)
+                   FROM backend_productparameter pp
+                   JOIN backend_parameter par ON par.id = pp.parameter_id
+                   WHERE pp.product_info_id = pi.id
+               ), '[]'::jsonb),
+               NULL, '/static/default_product.png', '/static/default_product_thumb.png', '[]'::jsonb
+        FROM backend_productinfo pi
+        JOIN backend_product p ON p.id = pi.product_id
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_productparameter_numeric_value'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('product_info', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_entry', serialize=False, to='backend.productinfo', verbose_name='Предложение')),
+                ('product_id', models.BigIntegerField(db_index=True, verbose_name='Товар')),
+                ('category_id', models.BigIntegerField(verbose_name='Категория')),
+                ('shop_id', models.BigIntegerField(verbose_name='Магазин')),
+                ('product_name', models.CharField(max_length=80, verbose_name='Название')),
+                ('model', models.CharField(blank=True, max_length=80, verbose_name='Модель')),
+                ('external_id', models.PositiveIntegerField(verbose_name='Внешний ИД')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Количество')),
+                ('price', models.PositiveIntegerField(verbose_name='Цена')),
+                ('price_rrc', models.PositiveIntegerField(verbose_name='Рекомедуемая розничная цена')),
+                ('image', models.CharField(max_length=255, null=True, verbose_name='Изображение')),
+                ('image_url', models.CharField(max_length=255, verbose_name='URL изображения')),
+                ('thumbnail_url', models.CharField(max_length=255, verbose_name='URL миниатюры')),
+                ('additional_images', models.JSONField(default=list, verbose_name='Дополнительные изображения')),
+                ('parameters', models.JSONField(default=list, verbose_name='Параметры')),
+            ],
+            options={
+                'verbose_name': 'Строка витрины каталога',
+                'verbose_name_plural': 'Витрина каталога',
+                'indexes': [models.Index(condition=models.Q(('quantity__gt', 0)), fields=['price', 'product_info'], name='catalogentry_price'), models.Index(condition=models.Q(('quantity__gt', 0)), fields=['category_id', 'price', 'product_info'], name='catalogentry_category_price'), models.Index(condition=models.Q(('quantity__gt', 0)), fields=['shop_id', 'price', 'product_info'], name='catalogentry_shop_price')],
+            },
+        ),
+        migrations.RunPython(fill_catalog_entries, migrations.RunPython.noop),
+    ]
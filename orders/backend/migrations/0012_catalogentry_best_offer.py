@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0011_catalog_entry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['product_id', 'price', 'product_info'], name='catalogentry_best_offer'),
+        ),
+    ]
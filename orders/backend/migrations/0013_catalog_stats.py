@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_catalog_stats(apps, schema_editor):
+    schema_editor.execute("""
+        INSERT INTO backend_catalogstats (shop_id, category_id, offers, min_price, max_price)
+        SELECT shop_id, category_id, count(*), min(price), max(price)
+        FROM backend_catalogentry
+        WHERE quantity > 0
+        GROUP BY shop_id, category_id
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0012_catalogentry_best_offer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offers', models.PositiveIntegerField(verbose_name='Предложений в наличии')),
+                ('min_price', models.PositiveIntegerField(verbose_name='Минимальная цена')),
+                ('max_price', models.PositiveIntegerField(verbose_name='Максимальная цена')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='catalog_stats', to='backend.category', verbose_name='Категория')),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='catalog_stats', to='backend.shop', verbose_name='Магазин')),
+            ],
+            options={
+                'verbose_name': 'Статистика категории магазина',
+                'verbose_name_plural': 'Статистика каталога',
+                'constraints': [models.UniqueConstraint(fields=('shop', 'category'), name='unique_catalog_stats')],
+            },
+        ),
+        migrations.RunPython(fill_catalog_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_catalog_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pricelistsource',
+            name='url',
+            field=models.URLField(max_length=500, verbose_name='Ссылка'),
+        ),
+        migrations.AddConstraint(
+            model_name='pricelistsource',
+            constraint=models.UniqueConstraint(fields=('shop', 'url'), name='unique_price_list_source'),
+        ),
+    ]
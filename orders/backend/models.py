@@ -8,6 +8,9 @@
 - ProductInfo: Конкретные предложения товаров в магазинах
 - Parameter: Характеристики товаров
 - ProductParameter: Значения характеристик для конкретных товаров
+- FacetValue, FacetCount: Индекс фасетов (значения характеристик и их счетчики)
+- CatalogEntry: Витрина каталога (денормализованные строки списка товаров)
+- PriceListSource: Источники прайс-листов партнеров
 - Contact: Контактная информация пользователей
 - Order: Заказы пользователей
 - OrderItem: Позиции в заказах
@@ -16,6 +19,9 @@
 и реализуют метод __str__ для удобного отображения.
 """
 
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from users.models import User
 
@@ -114,6 +120,10 @@ class Product(models.Model):
         verbose_name = 'Продукт'
         verbose_name_plural = 'Список продуктов'
         ordering = ('-name',)
+        indexes = [
+            # Нечеткий поиск по названию (pg_trgm, см. backend.search)
+            GinIndex(fields=['name'], name='product_name_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.name
@@ -229,9 +239,20 @@ class ProductInfo(models.Model):
         quantity (PositiveIntegerField): Количество на складе
         price (PositiveIntegerField): Цена в магазине
         price_rrc (PositiveIntegerField): Рекомендуемая розничная цена
+        search_vector (SearchVectorField): Поисковый вектор названия, модели
+            и значений параметров (обновляется при импорте)
+        facets (ArrayField): Идентификаторы FacetValue значений параметров
+            предложения (обновляется при импорте)
         
     Constraints:
         Уникальная комбинация product, shop и external_id
+        Уникальная комбинация shop и external_id (ключ синхронизации прайс-листа)
+
+    Indexes:
+        (price, id) для товаров в наличии - сортировка и пагинация по цене
+        GIN по search_vector - полнотекстовый поиск
+        GIN (pg_trgm) по model - нечеткий поиск по модели
+        GIN по facets - фильтрация по значениям параметров
     """
     model = models.CharField(max_length=80, verbose_name='Модель', blank=True)
     external_id = models.PositiveIntegerField(verbose_name='Внешний ИД')
@@ -240,12 +261,25 @@ class ProductInfo(models.Model):
     quantity = models.PositiveIntegerField(verbose_name='Количество')
     price = models.PositiveIntegerField(verbose_name='Цена')
     price_rrc = models.PositiveIntegerField(verbose_name='Рекомедуемая розничная цена')
+    search_vector = SearchVectorField(verbose_name='Поисковый вектор', null=True, editable=False)
+    facets = ArrayField(models.BigIntegerField(), verbose_name='Значения фасетов', db_default=[], blank=True, editable=False)
 
     class Meta:
         verbose_name = 'Информация о продукте'
         verbose_name_plural = 'Информационный список о продуктах'
         constraints = [
             models.UniqueConstraint(fields=['product_id', 'shop_id', 'external_id'], name='unique_product_info'),
+            models.UniqueConstraint(fields=['shop_id', 'external_id'], name='unique_shop_external_id'),
+        ]
+        indexes = [
+            # Постраничная выдача товаров в наличии по цене (keyset pagination)
+            models.Index(fields=['price', 'id'], name='productinfo_in_stock_price', condition=models.Q(quantity__gt=0)),
+            # Полнотекстовый поиск (см. backend.search)
+            GinIndex(fields=['search_vector'], name='productinfo_search_vector'),
+            # Нечеткий поиск по модели (pg_trgm)
+            GinIndex(fields=['model'], name='productinfo_model_trgm', opclasses=['gin_trgm_ops']),
+            # Фильтрация по значениям параметров (см. backend.facets)
+            GinIndex(fields=['facets'], name='productinfo_facets'),
         ]
 
     def __str__(self):
@@ -270,13 +304,21 @@ class ProductParameter(models.Model):
         product_info (ForeignKey): Информация о товаре в магазине
         parameter (ForeignKey): Параметр/характеристика
         value (CharField): Значение параметра (макс. 100 символов)
+        numeric_value (FloatField): Числовое значение в единице unit
+            (None, если значение не числовое; заполняется при импорте)
+        unit (CharField): Нормализованная единица измерения (in, GB, g, ...)
         
     Constraints:
         Уникальная комбинация product_info и parameter
+
+    Indexes:
+        (parameter, numeric_value) для числовых значений - диапазонные фильтры
     """
     product_info = models.ForeignKey(ProductInfo, verbose_name='Информация о продукте', related_name='product_parameters', on_delete=models.CASCADE)
     parameter = models.ForeignKey(Parameter, verbose_name='Параметер', related_name='product_parameters', on_delete=models.CASCADE)
     value = models.CharField(verbose_name='Значение', max_length=100)
+    numeric_value = models.FloatField(verbose_name='Числовое значение', null=True, blank=True, editable=False)
+    unit = models.CharField(verbose_name='Единица измерения', max_length=10, blank=True, db_default='', editable=False)
 
     class Meta:
         verbose_name = 'Параметр'
@@ -284,10 +326,203 @@ class ProductParameter(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['product_info_id', 'parameter_id'], name='unique_product_parameter'),
         ]
+        indexes = [
+            # Диапазонные фильтры по числовым значениям (см. backend.facets)
+            models.Index(
+                fields=['parameter', 'numeric_value'],
+                name='productparameter_numeric',
+                condition=models.Q(numeric_value__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return f'{self.product_info} - {self.parameter.name}'
 
+class FacetValue(models.Model):
+    """
+    Значение параметра, по которому фильтруется каталог.
+
+    Attributes:
+        parameter (ForeignKey): Параметр/характеристика
+        value (CharField): Значение параметра
+
+    Constraints:
+        Уникальная комбинация parameter и value
+    """
+    parameter = models.ForeignKey(Parameter, verbose_name='Параметр', related_name='facet_values', on_delete=models.CASCADE)
+    value = models.CharField(verbose_name='Значение', max_length=100)
+
+    class Meta:
+        verbose_name = 'Значение фасета'
+        verbose_name_plural = 'Список значений фасетов'
+        constraints = [
+            models.UniqueConstraint(fields=['parameter', 'value'], name='unique_facet_value'),
+        ]
+
+    def __str__(self):
+        return f'{self.parameter.name}: {self.value}'
+
+class FacetCount(models.Model):
+    """
+    Число предложений в наличии со значением параметра в категории магазина.
+
+    Пересчитывается при импорте и обновлении остатков (см. backend.facets).
+
+    Attributes:
+        shop (ForeignKey): Магазин
+        category (ForeignKey): Категория
+        facet_value (ForeignKey): Значение параметра
+        count (PositiveIntegerField): Число предложений в наличии
+    """
+    shop = models.ForeignKey(Shop, verbose_name='Магазин', related_name='facet_counts', on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, verbose_name='Категория', related_name='facet_counts', on_delete=models.CASCADE)
+    facet_value = models.ForeignKey(FacetValue, verbose_name='Значение фасета', related_name='counts', on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(verbose_name='Количество предложений')
+
+    class Meta:
+        verbose_name = 'Счетчик фасета'
+        verbose_name_plural = 'Счетчики фасетов'
+        constraints = [
+            models.UniqueConstraint(fields=['shop', 'category', 'facet_value'], name='unique_facet_count'),
+        ]
+        indexes = [
+            models.Index(fields=['category', 'facet_value'], name='facetcount_category'),
+        ]
+
+    def __str__(self):
+        return f'{self.facet_value} - {self.count}'
+
+class CatalogStats(models.Model):
+    """
+    Предложения в наличии и диапазон цен в категории магазина.
+
+    Пересчитывается при импорте, обновлении остатков и изменении товаров
+    (см. backend.catalog_stats); справочники категорий и магазинов
+    суммируют эти строки вместо подсчета предложений.
+
+    Attributes:
+        shop (ForeignKey): Магазин
+        category (ForeignKey): Категория
+        offers (PositiveIntegerField): Число предложений в наличии
+        min_price, max_price (PositiveIntegerField): Минимальная и максимальная цена
+    """
+    shop = models.ForeignKey(Shop, verbose_name='Магазин', related_name='catalog_stats', on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, verbose_name='Категория', related_name='catalog_stats', on_delete=models.CASCADE)
+    offers = models.PositiveIntegerField(verbose_name='Предложений в наличии')
+    min_price = models.PositiveIntegerField(verbose_name='Минимальная цена')
+    max_price = models.PositiveIntegerField(verbose_name='Максимальная цена')
+
+    class Meta:
+        verbose_name = 'Статистика категории магазина'
+        verbose_name_plural = 'Статистика каталога'
+        constraints = [
+            models.UniqueConstraint(fields=['shop', 'category'], name='unique_catalog_stats'),
+        ]
+
+    def __str__(self):
+        return f'{self.shop_id}/{self.category_id} - {self.offers}'
+
+class CatalogEntry(models.Model):
+    """
+    Строка витрины каталога - предложение со всеми данными списка товаров.
+
+    Денормализованная копия ProductInfo, Product, ProductParameter и
+    ProductImage, из которой список товаров читается одним запросом без
+    соединений. Обновляется при импорте, изменении остатков и
+    редактировании товаров (см. backend.catalog_entries).
+
+    Attributes:
+        product_info (OneToOneField): Предложение (первичный ключ)
+        product_id, category_id, shop_id: Товар, категория и магазин
+        product_name (CharField): Название товара
+        model, external_id, quantity, price, price_rrc: Поля предложения
+        image (CharField): URL основного изображения (None - нет изображения)
+        image_url, thumbnail_url (CharField): URL изображения и миниатюры
+            (с изображениями по умолчанию)
+        additional_images (JSONField): Дополнительные изображения в формате
+            ProductImageSerializer
+        parameters (JSONField): Параметры [[название, значение], ...]
+
+    Indexes:
+        (price, id), (category_id, price, id), (shop_id, price, id) для
+        предложений в наличии - фильтры и сортировка списка товаров
+        (product_id, price, id) для предложений в наличии - лучшие
+        предложения товаров
+    """
+    product_info = models.OneToOneField(
+        ProductInfo, verbose_name='Предложение', primary_key=True,
+        related_name='catalog_entry', on_delete=models.CASCADE,
+    )
+    product_id = models.BigIntegerField(verbose_name='Товар', db_index=True)
+    category_id = models.BigIntegerField(verbose_name='Категория')
+    shop_id = models.BigIntegerField(verbose_name='Магазин')
+    product_name = models.CharField(max_length=80, verbose_name='Название')
+    model = models.CharField(max_length=80, verbose_name='Модель', blank=True)
+    external_id = models.PositiveIntegerField(verbose_name='Внешний ИД')
+    quantity = models.PositiveIntegerField(verbose_name='Количество')
+    price = models.PositiveIntegerField(verbose_name='Цена')
+    price_rrc = models.PositiveIntegerField(verbose_name='Рекомедуемая розничная цена')
+    image = models.CharField(max_length=255, verbose_name='Изображение', null=True)
+    image_url = models.CharField(max_length=255, verbose_name='URL изображения')
+    thumbnail_url = models.CharField(max_length=255, verbose_name='URL миниатюры')
+    additional_images = models.JSONField(verbose_name='Дополнительные изображения', default=list)
+    parameters = models.JSONField(verbose_name='Параметры', default=list)
+
+    class Meta:
+        verbose_name = 'Строка витрины каталога'
+        verbose_name_plural = 'Витрина каталога'
+        indexes = [
+            models.Index(fields=['price', 'product_info'], name='catalogentry_price', condition=models.Q(quantity__gt=0)),
+            models.Index(fields=['category_id', 'price', 'product_info'], name='catalogentry_category_price', condition=models.Q(quantity__gt=0)),
+            models.Index(fields=['shop_id', 'price', 'product_info'], name='catalogentry_shop_price', condition=models.Q(quantity__gt=0)),
+            # Лучшее предложение товара (см. backend.best_offers)
+            models.Index(fields=['product_id', 'price', 'product_info'], name='catalogentry_best_offer', condition=models.Q(quantity__gt=0)),
+        ]
+
+    def __str__(self):
+        return self.product_name
+
+class PriceListSource(models.Model):
+    """
+    Модель источника прайс-листа партнера и состояния его последнего импорта.
+
+    Используется для условных запросов (If-None-Match / If-Modified-Since)
+    и сравнения хэша содержимого, чтобы не импортировать неизмененный прайс-лист.
+
+    Attributes:
+        url (URLField): Адрес прайс-листа
+        shop (ForeignKey): Магазин, загруженный из прайс-листа
+        etag (CharField): Заголовок ETag последнего ответа
+        last_modified (CharField): Заголовок Last-Modified последнего ответа
+        content_hash (CharField): SHA-256 содержимого последнего импорта
+        imported_at (DateTimeField): Время последнего импорта
+    """
+    url = models.URLField(max_length=500, verbose_name='Ссылка')
+    shop = models.ForeignKey(
+        Shop,
+        verbose_name='Магазин',
+        related_name='price_list_sources',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+    etag = models.CharField(max_length=255, verbose_name='ETag', blank=True)
+    last_modified = models.CharField(max_length=64, verbose_name='Last-Modified', blank=True)
+    content_hash = models.CharField(max_length=64, verbose_name='Хэш содержимого', blank=True)
+    imported_at = models.DateTimeField(verbose_name='Время импорта', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Источник прайс-листа'
+        verbose_name_plural = 'Список источников прайс-листов'
+        ordering = ('-imported_at',)
+        constraints = [
+            # По одному адресу могут загружаться прайс-листы разных магазинов
+            models.UniqueConstraint(fields=['shop', 'url'], name='unique_price_list_source'),
+        ]
+
+    def __str__(self):
+        return self.url
+
 # Константы для статусов заказов    
 STATE_CHOICES = (
     ('basket', 'Статус корзины'),
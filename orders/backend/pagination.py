@@ -0,0 +1,200 @@
+"""
+Постраничная навигация по ключу (keyset/cursor pagination).
+
+Вместо OFFSET следующая страница выбирается условием по ключу
+сортировки последней строки предыдущей страницы, например
+(price, id) > (110000, 42). Запрос любой страницы читает из индекса
+только page_size + 1 строк, поэтому глубокие страницы стоят столько же,
+сколько первая.
+"""
+
+import base64
+import json
+import math
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по уникальному ключу сортировки.
+
+    Параметры запроса:
+        ordering: Ключ сортировки из orderings (по умолчанию default_ordering)
+        cursor: Курсор из next/previous предыдущего ответа
+        page_size: Размер страницы (по умолчанию PRODUCT_LIST_PAGE_SIZE,
+            не больше PRODUCT_LIST_MAX_PAGE_SIZE)
+
+    Ответ: {'next': url, 'previous': url, 'results': [...]}.
+    """
+
+    # Имя сортировки -> поля ключа; последнее поле должно быть уникальным
+    orderings = {
+        'id': ('id',),
+        '-id': ('-id',),
+        'price': ('price', 'id'),
+        '-price': ('-price', '-id'),
+    }
+    default_ordering = 'id'
+    # Поле ключа -> тип значения в курсоре (по умолчанию int)
+    cursor_types = {'rank': float}
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, 'PRODUCT_LIST_PAGE_SIZE', 50)
+        max_page_size = getattr(settings, 'PRODUCT_LIST_MAX_PAGE_SIZE', 200)
+        value = request.query_params.get(self.page_size_query_param)
+        if value and value.isdigit() and int(value) > 0:
+            page_size = int(value)
+        return min(page_size, max_page_size)
+
+    def get_ordering(self, request, view=None):
+        """
+        Возвращает поля ключа сортировки.
+
+        Представление может добавить сортировки по аннотациям запроса
+        через атрибуты keyset_orderings и keyset_default_ordering.
+        """
+        orderings = dict(self.orderings, **getattr(view, 'keyset_orderings', {}))
+        default = getattr(view, 'keyset_default_ordering', self.default_ordering)
+        ordering = request.query_params.get(self.ordering_query_param, default)
+        if ordering not in orderings:
+            raise ValidationError(f'Неизвестная сортировка: {ordering}. Доступные: {", ".join(orderings)}')
+        return orderings[ordering]
+
+    def decode_cursor(self, request, fields):
+        """
+        Возвращает (значения ключа, направление) из курсора или (None, None).
+
+        Значения приводятся к типам полей ключа (см. cursor_types), чтобы
+        подделанный курсор не доходил до запроса.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            values, direction = data['k'], data['d']
+            if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            values = [self.coerce_cursor_value(field, value) for field, value in zip(fields, values)]
+        except (TypeError, ValueError, KeyError, OverflowError):
+            raise NotFound('Неверный курсор')
+        return values, direction
+
+    def coerce_cursor_value(self, field, value):
+        """
+        Приводит значение курсора к типу поля ключа.
+
+        Raises:
+            TypeError, ValueError: Значение не приводится к типу поля
+        """
+        value_type = self.cursor_types.get(field.lstrip('-'), int)
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise TypeError
+        value = value_type(value)
+        if value_type is int and not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError
+        if value_type is float and not math.isfinite(value):
+            raise ValueError
+        return value
+
+    def encode_cursor(self, values, direction):
+        data = json.dumps({'k': values, 'd': direction}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @staticmethod
+    def keyset_filter(fields, values, after):
+        """
+        Строит условие «ключ строки после (или до) values» в порядке fields.
+
+        Для ключа (price, id) и after=True: price >= p AND (price > p OR
+        (price = p AND id > i)). Первое условие позволяет PostgreSQL
+        использовать диапазонное сканирование индекса (price, id).
+        """
+        def lookup(field):
+            # После строки в порядке убывания (или до нее в порядке возрастания) - меньше
+            return 'lt' if field.startswith('-') == after else 'gt'
+
+        condition = Q()
+        equal = Q()
+        for field, value in zip(fields, values):
+            name = field.lstrip('-')
+            condition |= equal & Q(**{f'{name}__{lookup(field)}': value})
+            equal &= Q(**{name: value})
+
+        first = fields[0]
+        return Q(**{f'{first.lstrip("-")}__{lookup(first)}e': values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        def fetch(fields, values, direction, limit):
+            if direction == 'prev':
+                reverse_fields = [field[1:] if field.startswith('-') else f'-{field}' for field in fields]
+                rows = queryset.filter(self.keyset_filter(fields, values, after=False)).order_by(*reverse_fields)
+            elif direction == 'next':
+                rows = queryset.filter(self.keyset_filter(fields, values, after=True)).order_by(*fields)
+            else:
+                rows = queryset.order_by(*fields)
+            return list(rows[:limit])
+
+        return self.paginate(fetch, request, view)
+
+    def paginate(self, fetch, request, view=None):
+        """
+        Выбирает страницу функцией fetch(fields, values, direction, limit).
+
+        fetch возвращает до limit строк после ключа values (для direction='prev' -
+        до ключа, в обратном порядке); без курсора values и direction - None.
+        Так страницу можно выбрать не только из QuerySet (см. backend.catalog_index).
+        """
+        self.request = request
+        self.fields = self.get_ordering(request, view)
+        page_size = self.get_page_size(request)
+        values, direction = self.decode_cursor(request, self.fields)
+
+        rows = fetch(self.fields, values, direction, page_size + 1)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if direction == 'prev':
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = direction == 'next', has_more
+
+        self.page = rows
+        return rows
+
+    def _key(self, row):
+        # Строки страницы - объекты модели или словари .values()
+        if isinstance(row, dict):
+            return [row[field.lstrip('-')] for field in self.fields]
+        return [getattr(row, field.lstrip('-')) for field in self.fields]
+
+    def _link(self, cursor):
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = cursor
+        return self.request.build_absolute_uri(self.request.path) + '?' + params.urlencode()
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.encode_cursor(self._key(self.page[-1]), 'next'))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.encode_cursor(self._key(self.page[0]), 'prev'))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
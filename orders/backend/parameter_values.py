@@ -0,0 +1,103 @@
+"""
+Числовые значения параметров товаров.
+
+Значения параметров хранятся строками (ProductParameter.value). Для
+диапазонных фильтров при импорте числовые значения дополнительно
+записываются в ProductParameter.numeric_value в нормализованной единице
+измерения (ProductParameter.unit), например "1 ТБ" и "Встроенная
+память (Гб)": 1024 сохраняются как 1024 GB.
+
+Единица измерения берется из значения ("512 ГБ"), а если ее там нет -
+из скобок в названии параметра ("Встроенная память (Гб)").
+"""
+
+import re
+
+from .models import ProductParameter
+
+
+NUMERIC_BATCH_SIZE = 1000
+
+# Единица измерения (в нижнем регистре) -> (нормализованная единица, множитель)
+UNITS = {
+    'дюйм': ('in', 1), 'дюйма': ('in', 1), 'дюймов': ('in', 1), '"': ('in', 1),
+    'in': ('in', 1), 'inch': ('in', 1), 'inches': ('in', 1),
+    'мм': ('mm', 1), 'см': ('mm', 10), 'м': ('mm', 1000),
+    'mm': ('mm', 1), 'cm': ('mm', 10), 'm': ('mm', 1000),
+    'мб': ('GB', 1 / 1024), 'гб': ('GB', 1), 'тб': ('GB', 1024),
+    'mb': ('GB', 1 / 1024), 'gb': ('GB', 1), 'tb': ('GB', 1024),
+    'г': ('g', 1), 'гр': ('g', 1), 'кг': ('g', 1000),
+    'g': ('g', 1), 'kg': ('g', 1000),
+    'мгц': ('GHz', 1 / 1000), 'ггц': ('GHz', 1),
+    'mhz': ('GHz', 1 / 1000), 'ghz': ('GHz', 1),
+    'гц': ('Hz', 1), 'hz': ('Hz', 1),
+    'мач': ('mAh', 1), 'mah': ('mAh', 1),
+    'вт': ('W', 1), 'w': ('W', 1),
+    'мп': ('MP', 1), 'mp': ('MP', 1),
+    'шт': ('pcs', 1), 'pcs': ('pcs', 1),
+}
+
+NUMBER = re.compile(r'^\s*([-+]?\d+(?:[.,]\d+)?)\s*(.*?)\s*$')
+NAME_UNIT = re.compile(r'\(([^()]+)\)\s*$')
+
+
+def parse_numeric_value(name, value):
+    """
+    Извлекает число и нормализованную единицу измерения из значения параметра.
+
+    Args:
+        name (str): Название параметра
+        value (str): Значение параметра
+
+    Returns:
+        tuple: (число, единица) или (None, ''), если значение не числовое
+    """
+    match = NUMBER.match(str(value))
+    if not match:
+        return None, ''
+    number = float(match.group(1).replace(',', '.'))
+
+    unit = match.group(2).lower()
+    if not unit:
+        name_unit = NAME_UNIT.search(name)
+        unit = name_unit.group(1).strip().lower() if name_unit else ''
+        if unit not in UNITS:
+            # Единица из названия необязательна: "Количество ядер": 8
+            return number, ''
+
+    if unit not in UNITS:
+        return None, ''
+    normalized, factor = UNITS[unit]
+    return round(number * factor, 6), normalized
+
+
+def refresh_numeric_values(product_info_ids, batch_size=NUMERIC_BATCH_SIZE):
+    """
+    Пересчитывает числовые значения параметров предложений.
+
+    Args:
+        product_info_ids: Предложения
+        batch_size (int): Размер пакета
+
+    Returns:
+        int: Число обновленных значений параметров
+    """
+    updated = 0
+    product_info_ids = sorted(product_info_ids)
+    for start in range(0, len(product_info_ids), batch_size):
+        changed = []
+        product_parameters = (
+            ProductParameter.objects
+            .filter(product_info_id__in=product_info_ids[start:start + batch_size])
+            .select_related('parameter')
+            .only('id', 'value', 'numeric_value', 'unit', 'parameter__name')
+        )
+        for product_parameter in product_parameters:
+            numeric_value, unit = parse_numeric_value(product_parameter.parameter.name, product_parameter.value)
+            if (product_parameter.numeric_value, product_parameter.unit) != (numeric_value, unit):
+                product_parameter.numeric_value, product_parameter.unit = numeric_value, unit
+                changed.append(product_parameter)
+        if changed:
+            ProductParameter.objects.bulk_update(changed, ['numeric_value', 'unit'], batch_size=batch_size)
+            updated += len(changed)
+    return updated
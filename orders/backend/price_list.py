@@ -0,0 +1,275 @@
+"""
+Потоковое чтение прайс-листов партнеров в формате shop1.yaml.
+
+Документ разбирается по событиям YAML (yaml.parse), а не загружается
+целиком: поля shop и categories читаются сразу, а товары из goods
+отдаются генератором по одному. Потребление памяти не зависит от
+размера файла и определяется только размером одного товара.
+
+Запись выполняется так же потоково: заголовок и затем товары по одному.
+
+Загрузка по URL выполняется условным запросом (If-None-Match /
+If-Modified-Since) во временный файл с подсчетом SHA-256 содержимого,
+чтобы неизмененный прайс-лист можно было пропустить без разбора.
+"""
+
+import hashlib
+import tempfile
+
+import yaml
+from requests import get
+from yaml.events import (
+    AliasEvent, MappingEndEvent, MappingStartEvent, ScalarEvent,
+    SequenceEndEvent, SequenceStartEvent,
+)
+from yaml.nodes import ScalarNode
+
+
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class PriceListFormatError(ValueError):
+    """
+    Ошибка структуры прайс-листа, обнаруженная при потоковом чтении.
+    """
+
+
+class _EventReader:
+    """
+    Собирает Python-объекты из последовательности событий YAML.
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.resolver = yaml.resolver.Resolver()
+        self.constructor = yaml.constructor.SafeConstructor()
+
+    def next(self):
+        return next(self.events)
+
+    def expect(self, event_class):
+        event = self.next()
+        if not isinstance(event, event_class):
+            raise PriceListFormatError(f'Ожидалось {event_class.__name__}, получено {event}')
+        return event
+
+    def construct(self, event):
+        """
+        Строит объект (скаляр, список или словарь), начинающийся с event.
+        """
+        if isinstance(event, ScalarEvent):
+            return self.scalar(event)
+
+        if isinstance(event, SequenceStartEvent):
+            items = []
+            while True:
+                event = self.next()
+                if isinstance(event, SequenceEndEvent):
+                    return items
+                items.append(self.construct(event))
+
+        if isinstance(event, MappingStartEvent):
+            mapping = {}
+            while True:
+                event = self.next()
+                if isinstance(event, MappingEndEvent):
+                    return mapping
+                key = self.construct(event)
+                mapping[key] = self.construct(self.next())
+
+        if isinstance(event, AliasEvent):
+            raise PriceListFormatError('Якоря и ссылки YAML не поддерживаются в прайс-листе')
+
+        raise PriceListFormatError(f'Неожиданное событие YAML: {event}')
+
+    def scalar(self, event):
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = self.resolver.resolve(ScalarNode, event.value, event.implicit)
+        node = ScalarNode(tag, event.value, style=event.style)
+        return self.constructor.construct_document(node)
+
+    def skip(self, event):
+        """
+        Пропускает значение, начинающееся с event, не строя объектов.
+        """
+        depth = 0
+        while True:
+            if isinstance(event, (SequenceStartEvent, MappingStartEvent)):
+                depth += 1
+            elif isinstance(event, (SequenceEndEvent, MappingEndEvent)):
+                depth -= 1
+            if depth == 0:
+                return
+            event = self.next()
+
+
+def read_price_list(stream):
+    """
+    Открывает прайс-лист для потокового чтения.
+
+    Поля shop и categories должны идти в документе раньше goods:
+    они читаются сразу, товары же читаются лениво по мере обхода goods.
+    Поле categories после goods обнаруживается только по окончании
+    товаров - генератор goods тогда завершается PriceListFormatError.
+
+    Args:
+        stream: Файлоподобный объект (бинарный или текстовый) или строка
+
+    Returns:
+        dict: shop (str), categories (list) и goods (генератор словарей)
+
+    Raises:
+        PriceListFormatError: Нарушена структура документа
+    """
+    reader = _EventReader(yaml.parse(stream, Loader=Loader))
+    reader.next()  # StreamStartEvent
+    reader.next()  # DocumentStartEvent
+    reader.expect(MappingStartEvent)
+
+    data = {'shop': None, 'categories': [], 'goods': iter(())}
+    while True:
+        event = reader.next()
+        if isinstance(event, MappingEndEvent):
+            break
+
+        key = reader.construct(event)
+        if key == 'goods':
+            if data['shop'] is None:
+                raise PriceListFormatError('Поле shop должно предшествовать goods')
+            data['goods'] = _iter_goods(reader)
+            break
+        elif key in ('shop', 'categories'):
+            data[key] = reader.construct(reader.next())
+        else:
+            reader.skip(reader.next())
+
+    if data['shop'] is None:
+        raise PriceListFormatError('В прайс-листе не указан магазин (shop)')
+    return data
+
+
+def _iter_goods(reader):
+    """
+    Отдает товары из последовательности goods по одному.
+    """
+    event = reader.next()
+    if isinstance(event, ScalarEvent) and event.value in ('', '~', 'null'):
+        _check_after_goods(reader)
+        return
+    if not isinstance(event, SequenceStartEvent):
+        raise PriceListFormatError('Поле goods должно быть списком')
+
+    while True:
+        event = reader.next()
+        if isinstance(event, SequenceEndEvent):
+            _check_after_goods(reader)
+            return
+        yield reader.construct(event)
+
+
+def _check_after_goods(reader):
+    """
+    Проверяет, что после goods нет полей shop и categories.
+    """
+    while True:
+        event = reader.next()
+        if isinstance(event, MappingEndEvent):
+            return
+        key = reader.construct(event)
+        if key in ('shop', 'categories'):
+            raise PriceListFormatError(f'Поле {key} должно предшествовать goods')
+        reader.skip(reader.next())
+
+
+def dump_price_list_header(shop, categories):
+    """
+    Возвращает начало прайс-листа: shop, categories и ключ goods.
+
+    Товары дописываются после заголовка по одному через dump_good,
+    поэтому прайс-лист любого размера можно записывать потоково.
+    """
+    header = yaml.dump(
+        {'shop': shop, 'categories': categories},
+        Dumper=Dumper, allow_unicode=True, sort_keys=False,
+    )
+    return header + 'goods:\n'
+
+
+def dump_good(good):
+    """
+    Возвращает один товар как элемент последовательности goods.
+    """
+    return yaml.dump([good], Dumper=Dumper, allow_unicode=True, sort_keys=False)
+
+
+class PriceListDownload:
+    """
+    Результат загрузки прайс-листа.
+
+    Attributes:
+        file: Временный файл с содержимым (None, если not_modified)
+        etag (str): Заголовок ETag ответа
+        last_modified (str): Заголовок Last-Modified ответа
+        content_hash (str): SHA-256 содержимого
+        not_modified (bool): Сервер ответил 304 Not Modified
+    """
+
+    def __init__(self, file=None, etag='', last_modified='', content_hash='', not_modified=False):
+        self.file = file
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.not_modified = not_modified
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            self.file.close()
+
+
+def download_price_list(url, etag='', last_modified='', timeout=None):
+    """
+    Загружает прайс-лист условным запросом во временный файл.
+
+    Args:
+        url (str): Адрес прайс-листа
+        etag (str): ETag предыдущей загрузки для If-None-Match
+        last_modified (str): Last-Modified предыдущей загрузки для If-Modified-Since
+        timeout: Таймауты запроса (подключение, чтение)
+
+    Returns:
+        PriceListDownload: Загруженный файл и валидаторы ответа
+
+    Raises:
+        requests.RequestException: Ошибка загрузки
+    """
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    with get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            return PriceListDownload(etag=etag, last_modified=last_modified, not_modified=True)
+        response.raise_for_status()
+
+        file = tempfile.TemporaryFile()
+        digest = hashlib.sha256()
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            file.write(chunk)
+            digest.update(chunk)
+        file.seek(0)
+
+        return PriceListDownload(
+            file=file,
+            etag=response.headers.get('ETag', ''),
+            last_modified=response.headers.get('Last-Modified', ''),
+            content_hash=digest.hexdigest(),
+        )
@@ -0,0 +1,111 @@
+"""
+Карточка предложения: полная спецификация товара и предложения других
+магазинов (GET /api/products/<product_info_id>).
+
+Строки витрины всех предложений товара кэшируются одним ключом
+product_details:<product_id>. Кэш сбрасывается не по версии каталога, а
+точно: при изменении предложений товара, самого товара, его
+изображений или параметров (см. обработчики в backend.signals), поэтому
+изменения других товаров его не затрагивают.
+
+Ключ product_details:offer:<product_info_id> хранит товар предложения на
+момент кэширования: по нему находится прежний товар удаленного или
+перенесенного к другому товару предложения, кэш которого тоже
+сбрасывается.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import CatalogEntry
+from .serializers_fast import CATALOG_ENTRY_VALUES
+
+
+PRODUCT_DETAILS_TIMEOUT = 60 * 60
+
+
+def _product_key(product_id):
+    return f'product_details:{product_id}'
+
+
+def _offer_key(product_info_id):
+    return f'product_details:offer:{product_info_id}'
+
+
+def get_product_details(product_id):
+    """
+    Возвращает строки витрины всех предложений товара, начиная с самого дешевого.
+
+    Args:
+        product_id (int): Товар
+
+    Returns:
+        list: Строки .values(*CATALOG_ENTRY_VALUES)
+    """
+    rows = cache.get(_product_key(product_id))
+    if rows is None:
+        rows = list(
+            CatalogEntry.objects.filter(product_id=product_id)
+            .order_by('price', 'product_info_id')
+            .values(*CATALOG_ENTRY_VALUES)
+        )
+        cache.set_many({
+            _product_key(product_id): rows,
+            **{_offer_key(row['product_info_id']): product_id for row in rows},
+        }, PRODUCT_DETAILS_TIMEOUT)
+    return rows
+
+
+def get_offer_details(product_info_id):
+    """
+    Возвращает предложение и другие предложения того же товара в наличии.
+
+    Args:
+        product_info_id (int): Предложение
+
+    Returns:
+        tuple: (строка предложения, строки других предложений) или None, если предложения нет
+    """
+    product_id = cache.get(_offer_key(product_info_id))
+    if product_id is None:
+        product_id = CatalogEntry.objects.filter(pk=product_info_id).values_list('product_id', flat=True).first()
+        if product_id is None:
+            return None
+
+    rows = get_product_details(product_id)
+    offer = next((row for row in rows if row['product_info_id'] == product_info_id), None)
+    if offer is None:
+        return None
+    return offer, [row for row in rows if row is not offer and row['quantity'] > 0]
+
+
+def invalidate_offer_details(product_info_ids):
+    """
+    Сбрасывает после фиксации транзакции кэш товаров предложений -
+    текущих и тех, к которым предложения относились при кэшировании.
+
+    Args:
+        product_info_ids: Созданные, измененные и удаленные предложения
+    """
+    product_info_ids = list(product_info_ids)
+
+    def invalidate():
+        offer_keys = [_offer_key(product_info_id) for product_info_id in product_info_ids]
+        product_ids = set(cache.get_many(offer_keys).values())
+        product_ids.update(
+            CatalogEntry.objects.filter(pk__in=product_info_ids).values_list('product_id', flat=True)
+        )
+        cache.delete_many(offer_keys + [_product_key(product_id) for product_id in product_ids])
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_product_details(product_ids):
+    """
+    Сбрасывает кэш товаров после фиксации транзакции.
+
+    Args:
+        product_ids: Товары
+    """
+    keys = [_product_key(product_id) for product_id in product_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
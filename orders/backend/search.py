@@ -0,0 +1,161 @@
+"""
+Полнотекстовый поиск товаров (PostgreSQL).
+
+У каждого предложения хранится поисковый вектор (tsvector) из названия
+товара (вес A), модели (вес B) и значений параметров (вес C) с русской
+морфологией. Вектор пересчитывается множественным UPDATE при импорте
+и индексируется GIN, поэтому поиск не сканирует таблицы через ILIKE.
+
+Нечеткий поиск (опечатки в названии и модели, например "aple iphone"
+или "xs-mx") использует сходство триграмм pg_trgm по названию товара и
+модели предложения; оба столбца проиндексированы GIN (gin_trgm_ops).
+
+На других СУБД поиск выполняется через icontains.
+"""
+
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Func, Q
+from django.db.models.functions import Cast, Greatest
+
+from .models import Product, ProductInfo, ProductParameter
+
+
+SEARCH_BATCH_SIZE = 1000
+
+# Поля предложения, от которых зависит поисковый вектор
+SEARCH_VECTOR_FIELDS = {'product_id', 'model', 'parameters'}
+
+
+class AnyOf(Func):
+    """
+    Условие column = ANY(ARRAY(подзапрос)).
+
+    В отличие от IN (подзапрос) массив вычисляется один раз (InitPlan),
+    поэтому условие читается по индексу столбца и объединяется с другими
+    индексными условиями OR (BitmapOr).
+    """
+
+    output_field = BooleanField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column, subquery = self.get_source_expressions()
+        column_sql, column_params = compiler.compile(column)
+        subquery_sql, subquery_params = compiler.compile(subquery)
+        return f'{column_sql} = ANY({subquery_sql})', (*column_params, *subquery_params)
+
+
+def search_config():
+    return getattr(settings, 'SEARCH_CONFIG', 'russian')
+
+
+def trigram_threshold():
+    return getattr(settings, 'SEARCH_TRIGRAM_THRESHOLD', 0.4)
+
+
+def full_text_search_enabled():
+    return connection.vendor == 'postgresql'
+
+
+def refresh_search_vectors(product_info_ids=None, batch_size=SEARCH_BATCH_SIZE):
+    """
+    Пересчитывает поисковые векторы предложений.
+
+    Args:
+        product_info_ids: Предложения (None - все предложения)
+        batch_size (int): Размер пакета для UPDATE
+
+    Returns:
+        int: Число обновленных предложений
+    """
+    if not full_text_search_enabled():
+        return 0
+
+    product_info_table = ProductInfo._meta.db_table
+    sql = f'''
+        UPDATE {product_info_table} pi SET search_vector =
+            setweight(to_tsvector(%(config)s::regconfig, p.name), 'A')
+            || setweight(to_tsvector(%(config)s::regconfig, translate(pi.model, '/', ' ')), 'B')
+            || setweight(to_tsvector(%(config)s::regconfig, coalesce((
+                SELECT string_agg(pp.value, ' ')
+                FROM {ProductParameter._meta.db_table} pp
+                WHERE pp.product_info_id = pi.id
+            ), '')), 'C')
+        FROM {Product._meta.db_table} p
+        WHERE p.id = pi.product_id
+    '''
+    updated = 0
+    with connection.cursor() as cursor:
+        if product_info_ids is None:
+            cursor.execute(sql, {'config': search_config()})
+            return cursor.rowcount
+
+        product_info_ids = sorted(product_info_ids)
+        for start in range(0, len(product_info_ids), batch_size):
+            ids = product_info_ids[start:start + batch_size]
+            cursor.execute(sql + ' AND pi.id = ANY(%(ids)s)', {'config': search_config(), 'ids': ids})
+            updated += cursor.rowcount
+    return updated
+
+
+def search_offers(queryset, search):
+    """
+    Фильтрует предложения по поисковой строке.
+
+    На PostgreSQL использует полнотекстовый поиск (websearch-синтаксис:
+    слова, "фразы", -исключения) и добавляет аннотацию rank -
+    релевантность предложения.
+
+    Returns:
+        QuerySet: Отфильтрованные предложения
+    """
+    if not full_text_search_enabled():
+        return queryset.filter(Q(product__name__icontains=search) | Q(model__icontains=search))
+
+    query = SearchQuery(search, config=search_config(), search_type='websearch')
+    return queryset.filter(search_vector=query).annotate(
+        # float8 вместо real: значение rank точно переносится в курсор пагинации
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+    )
+
+
+def fuzzy_search_offers(queryset, search):
+    """
+    Фильтрует предложения по поисковой строке с учетом опечаток.
+
+    Предложение подходит, если сходство слов поисковой строки с названием
+    товара или с моделью не ниже SEARCH_TRIGRAM_THRESHOLD. Аннотация
+    rank - наибольшее из двух сходств.
+
+    Порог задается до конца текущей транзакции, поэтому вызов и все
+    запросы по результату выполняются внутри transaction.atomic().
+
+    Returns:
+        QuerySet: Отфильтрованные предложения
+    """
+    if not full_text_search_enabled():
+        return search_offers(queryset, search)
+
+    # Порог операторов pg_trgm задается параметром конфигурации; индексы
+    # GIN используются только с операторами, а не с функциями сходства.
+    # Локальное значение (is_local) не переходит к другим запросам соединения
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(trigram_threshold())],
+        )
+
+    # Товары ищутся отдельно по индексу названия, а предложения - по
+    # product_id = ANY(...), чтобы оба условия OR читались по индексам
+    products = Product.objects.filter(name__trigram_word_similar=search).order_by().values('id')
+    return queryset.filter(
+        Q(AnyOf(F('product_id'), ArraySubquery(products)))
+        | Q(model__trigram_word_similar=search)
+    ).annotate(
+        rank=Cast(Greatest(
+            TrigramWordSimilarity(search, 'product__name'),
+            TrigramWordSimilarity(search, 'model'),
+        ), FloatField()),
+    )
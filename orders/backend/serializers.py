@@ -6,6 +6,8 @@
 
 from rest_framework import serializers
 
+from backend.fieldsets import SparseFieldsetSerializerMixin
+from backend.serializers_fast import CATALOG_ENTRY_VALUES, catalog_entry_rows
 from backend.serializers_images import ProductWithImagesSerializer
 from .models import Shop, Category, Product, ProductInfo, Parameter, ProductParameter, Contact, Order, OrderItem
 from users.models import User
@@ -27,6 +29,28 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
 
 
+class CatalogStatsFieldsMixin(serializers.Serializer):
+    """Предложения в наличии и диапазон цен (аннотации backend.catalog_stats)."""
+
+    offers = serializers.IntegerField(read_only=True)
+    min_price = serializers.IntegerField(read_only=True, allow_null=True)
+    max_price = serializers.IntegerField(read_only=True, allow_null=True)
+
+
+class ShopStatsSerializer(CatalogStatsFieldsMixin, ShopSerializer):
+    """Магазин в справочнике магазинов."""
+
+    class Meta(ShopSerializer.Meta):
+        fields = ShopSerializer.Meta.fields + ['offers', 'min_price', 'max_price']
+
+
+class CategoryStatsSerializer(CatalogStatsFieldsMixin, CategorySerializer):
+    """Категория в справочнике категорий."""
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ['offers', 'min_price', 'max_price']
+
+
 class ProductSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Product (Продукт)."""
 
@@ -68,6 +92,20 @@ class ProductInfoSerializer(serializers.ModelSerializer):
         fields = ['id', 'product', 'shop', 'model', 'external_id',
                   'quantity', 'price', 'price_rrc', 'product_parameters']
         
+class CatalogEntrySerializer(serializers.BaseSerializer):
+    """
+    Сериализатор строки витрины каталога (CatalogEntry).
+
+    Возвращает те же данные, что ProductInfoSerializer, без обращения
+    к связанным таблицам. Список товаров сериализует строки .values()
+    напрямую через backend.serializers_fast.catalog_entry_rows.
+    """
+
+    def to_representation(self, entry):
+        row = {field: getattr(entry, field) for field in CATALOG_ENTRY_VALUES}
+        return catalog_entry_rows([row], self.context.get('request'))[0]
+
+
 class ContactSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Contact (Контакт пользователя)."""
 
@@ -120,7 +158,7 @@ class UserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для модели OrderItem (Позиция заказа)."""
 
     class Meta:
@@ -128,8 +166,8 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product_info', 'quantity']
         read_only_fields = ['id']
 
-class OrderSerializer(serializers.ModelSerializer):
-    """Сериализатор для модели Order (Заказ)."""
+class OrderSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Сериализатор для модели Order (Заказ). Поддерживает выбор полей (см. backend.fieldsets)."""
     
     ordered_items = OrderItemSerializer(read_only=True, many=True)
 
@@ -0,0 +1,335 @@
+"""
+Быстрая сериализация списка товаров без полей DRF.
+
+ModelSerializer сериализует строку поле за полем: для каждого поля
+вызываются get_attribute и to_representation, вложенные сериализаторы
+обходят связанные объекты. На больших страницах это основная часть
+времени ответа. Здесь строки собираются как обычные dict:
+
+- catalog_entry_rows - из строк витрины CatalogEntry (.values()),
+  параметры и изображения уже сохранены в строке;
+- product_info_rows - из строк ProductInfo (.values()), параметры
+  выбираются одним запросом и группируются по предложению, изображения -
+  по товару.
+
+Результат совпадает с CatalogEntrySerializer и ProductInfoSerializer
+(те же ключи в том же порядке и те же значения), поэтому JSON ответа
+не меняется байт в байт. Сравнение скорости - команда
+benchmark_serializers.
+
+shape_catalog_entry_rows строит строки витрины с ?fields= и ?expand=
+(см. backend.fieldsets): вычисляются только запрошенные поля, а
+catalog_entry_columns возвращает столбцы, которые нужно для них выбрать.
+"""
+
+from operator import itemgetter
+
+from rest_framework.exceptions import ValidationError
+
+from .fieldsets import validate_fieldset
+from .models import Category, Product, ProductImage, ProductParameter, Shop
+from .serializers_images import ProductWithImagesSerializer
+
+
+# Поля CatalogEntry, которые читает catalog_entry_rows
+CATALOG_ENTRY_VALUES = (
+    'product_info_id', 'product_id', 'product_name', 'category_id', 'image', 'image_url', 'thumbnail_url',
+    'additional_images', 'shop_id', 'model', 'external_id', 'quantity', 'price', 'price_rrc', 'parameters',
+)
+
+# Поля строки списка товаров -> столбцы CatalogEntry
+CATALOG_ENTRY_FIELDS = {
+    'id': ('product_info_id',),
+    'product': {
+        'id': ('product_id',),
+        'name': ('product_name',),
+        'category': ('category_id',),
+        'image': ('image',),
+        'image_url': ('image_url',),
+        'thumbnail_url': ('thumbnail_url',),
+        'additional_images': ('additional_images',),
+    },
+    'shop': ('shop_id',),
+    'model': ('model',),
+    'external_id': ('external_id',),
+    'quantity': ('quantity',),
+    'price': ('price',),
+    'price_rrc': ('price_rrc',),
+    'product_parameters': ('parameters',),
+}
+
+# Раскрываемые связи (?expand=) -> (столбец CatalogEntry, модель, поля объекта)
+CATALOG_ENTRY_EXPAND = {
+    'shop': ('shop_id', Shop, ('id', 'name', 'url')),
+    'product.category': ('category_id', Category, ('id', 'name')),
+}
+
+# Поля ProductInfo, которые читает product_info_rows
+PRODUCT_INFO_VALUES = (
+    'id', 'product_id', 'product__name', 'product__category_id', 'shop_id', 'model', 'external_id',
+    'quantity', 'price', 'price_rrc',
+)
+
+
+def absolute_url_builder(request):
+    """
+    Возвращает функцию, которая, как ImageField, делает URL абсолютным при наличии запроса.
+    """
+    if request is None:
+        return lambda url: url
+    build_absolute_uri = request.build_absolute_uri
+    return lambda url: build_absolute_uri(url) if url else url
+
+
+def additional_images(images, absolute_url):
+    """
+    Дополнительные изображения из строки витрины.
+
+    jsonb не сохраняет порядок ключей, он восстанавливается как в ProductImageSerializer.
+    """
+    return [
+        {
+            'id': image['id'],
+            'image': absolute_url(image['image']),
+            'image_url': image['image_url'],
+            'thumbnail_url': image['thumbnail_url'],
+            'order': image['order'],
+            'created_at': image['created_at'],
+        }
+        for image in images
+    ]
+
+
+def catalog_entry_rows(rows, request=None):
+    """
+    Сериализует строки витрины каталога.
+
+    Args:
+        rows: Словари с полями CATALOG_ENTRY_VALUES
+        request: Запрос (для абсолютных URL изображений)
+
+    Returns:
+        list: Данные в формате ProductInfoSerializer
+    """
+    absolute_url = absolute_url_builder(request)
+    return [
+        {
+            'id': row['product_info_id'],
+            'product': {
+                'id': row['product_id'],
+                'name': row['product_name'],
+                'category': row['category_id'],
+                'image': absolute_url(row['image']),
+                'image_url': row['image_url'],
+                'thumbnail_url': row['thumbnail_url'],
+                'additional_images': additional_images(row['additional_images'], absolute_url),
+            },
+            'shop': row['shop_id'],
+            'model': row['model'],
+            'external_id': row['external_id'],
+            'quantity': row['quantity'],
+            'price': row['price'],
+            'price_rrc': row['price_rrc'],
+            'product_parameters': [{'parameter': name, 'value': value} for name, value in row['parameters']],
+        }
+        for row in rows
+    ]
+
+
+def validate_catalog_entry_fieldset(fieldset, expand):
+    """
+    Проверяет ?fields= и ?expand= списка товаров.
+
+    Вложенные поля можно выбрать только у раскрытых связей: ?fields=shop.name&expand=shop.
+
+    Raises:
+        ValidationError: Неизвестное поле или связь
+    """
+    for path in expand:
+        if path not in CATALOG_ENTRY_EXPAND:
+            raise ValidationError(f'Неизвестная связь: {path}. Доступные: {", ".join(CATALOG_ENTRY_EXPAND)}')
+    if fieldset is None:
+        return
+
+    def available(fields, prefix=''):
+        tree = {}
+        for name, nested in fields.items():
+            path = prefix + name
+            if isinstance(nested, dict):
+                tree[name] = available(nested, f'{path}.')
+            elif path in expand:
+                tree[name] = dict.fromkeys(CATALOG_ENTRY_EXPAND[path][2])
+            else:
+                tree[name] = None
+        return tree
+
+    validate_fieldset(fieldset, available(CATALOG_ENTRY_FIELDS))
+
+
+def catalog_entry_columns(fieldset, fields=CATALOG_ENTRY_FIELDS):
+    """
+    Столбцы CatalogEntry, нужные для полей fieldset (None - для всех полей).
+
+    Returns:
+        list: Имена столбцов
+    """
+    columns = []
+    for name, nested in fields.items():
+        if fieldset is not None and name not in fieldset:
+            continue
+        if isinstance(nested, dict):
+            columns.extend(catalog_entry_columns(fieldset[name] if fieldset is not None else None, nested))
+        else:
+            columns.extend(nested)
+    return columns
+
+
+def _is_requested(fieldset, path):
+    """
+    Входит ли поле с путем path в дерево полей.
+    """
+    for name in path.split('.'):
+        if fieldset is None:
+            return True
+        if name not in fieldset:
+            return False
+        fieldset = fieldset[name]
+    return True
+
+
+def _catalog_entry_builders(rows, expand, request):
+    """
+    Путь поля -> функция, вычисляющая значение поля по строке витрины.
+
+    Раскрытые связи выбираются одним запросом на связь.
+    """
+    absolute_url = absolute_url_builder(request)
+    builders = {
+        'id': itemgetter('product_info_id'),
+        'product.id': itemgetter('product_id'),
+        'product.name': itemgetter('product_name'),
+        'product.category': itemgetter('category_id'),
+        'product.image': lambda row: absolute_url(row['image']),
+        'product.image_url': itemgetter('image_url'),
+        'product.thumbnail_url': itemgetter('thumbnail_url'),
+        'product.additional_images': lambda row: additional_images(row['additional_images'], absolute_url),
+        'shop': itemgetter('shop_id'),
+        'model': itemgetter('model'),
+        'external_id': itemgetter('external_id'),
+        'quantity': itemgetter('quantity'),
+        'price': itemgetter('price'),
+        'price_rrc': itemgetter('price_rrc'),
+        'product_parameters': lambda row: [{'parameter': name, 'value': value} for name, value in row['parameters']],
+    }
+    for path in expand:
+        column, model, fields = CATALOG_ENTRY_EXPAND[path]
+        objects = {
+            obj['id']: obj
+            for obj in model.objects.filter(id__in={row[column] for row in rows}).order_by().values(*fields)
+        }
+        builders[path] = lambda row, column=column, objects=objects: objects.get(row[column])
+    return builders
+
+
+def _catalog_entry_plan(fieldset, fields, builders, prefix=''):
+    """
+    Список (имя поля, функция строки) запрошенных полей в порядке ответа.
+    """
+    plan = []
+    for name, nested in fields.items():
+        if fieldset is not None and name not in fieldset:
+            continue
+        requested = fieldset[name] if fieldset is not None else None
+        path = prefix + name
+        if isinstance(nested, dict):
+            sub_plan = _catalog_entry_plan(requested, nested, builders, f'{path}.')
+            plan.append((name, lambda row, sub_plan=sub_plan: {key: build(row) for key, build in sub_plan}))
+        elif requested is not None:
+            # Часть полей раскрытой связи
+            plan.append((name, lambda row, build=builders[path], requested=requested: {
+                key: value for key, value in build(row).items() if key in requested
+            }))
+        else:
+            plan.append((name, builders[path]))
+    return plan
+
+
+def shape_catalog_entry_rows(rows, fieldset=None, expand=(), request=None):
+    """
+    Сериализует строки витрины с выбором полей и раскрытием связей.
+
+    Args:
+        rows: Словари со столбцами catalog_entry_columns(fieldset)
+        fieldset (dict): Дерево полей (см. backend.fieldsets.parse_fieldset), None - все поля
+        expand: Раскрываемые связи из CATALOG_ENTRY_EXPAND
+        request: Запрос (для абсолютных URL изображений)
+
+    Returns:
+        list: Данные в формате ProductInfoSerializer с выбранными полями
+    """
+    # Связи, поля которых не запрошены, не выбираются
+    expand = [path for path in expand if _is_requested(fieldset, path)]
+    plan = _catalog_entry_plan(fieldset, CATALOG_ENTRY_FIELDS, _catalog_entry_builders(rows, expand, request))
+    return [{name: build(row) for name, build in plan} for row in rows]
+
+
+def product_info_rows(queryset, request=None):
+    """
+    Сериализует предложения без ProductInfoSerializer.
+
+    Предложения, их параметры (в порядке id) и товары с дополнительными
+    изображениями выбираются тремя запросами. Товары с изображениями, которым
+    нужны URL миниатюр ImageKit, сериализуются ProductWithImagesSerializer.
+
+    Args:
+        queryset (QuerySet): Предложения ProductInfo
+        request: Запрос (для абсолютных URL изображений)
+
+    Returns:
+        list: Данные в формате ProductInfoSerializer
+    """
+    rows = list(queryset.values(*PRODUCT_INFO_VALUES, 'product__image'))
+    ids = [row['id'] for row in rows]
+
+    parameters = {}
+    for product_info_id, name, value in (
+        ProductParameter.objects.filter(product_info_id__in=ids)
+        .order_by('id')
+        .values_list('product_info_id', 'parameter__name', 'value')
+    ):
+        parameters.setdefault(product_info_id, []).append({'parameter': name, 'value': value})
+
+    default = Product()
+    product_ids = {row['product_id'] for row in rows}
+    with_images = (
+        {row['product_id'] for row in rows if row['product__image']}
+        | set(ProductImage.objects.filter(product_id__in=product_ids).order_by().values_list('product_id', flat=True))
+    )
+    images = {}
+    if with_images:
+        products = Product.objects.filter(id__in=with_images).prefetch_related('additional_images')
+        for data in ProductWithImagesSerializer(products, many=True, context={'request': request}).data:
+            images[data['id']] = data
+
+    return [
+        {
+            'id': row['id'],
+            'product': images.get(row['product_id']) or {
+                'id': row['product_id'],
+                'name': row['product__name'],
+                'category': row['product__category_id'],
+                'image': None,
+                'image_url': default.image_url,
+                'thumbnail_url': default.thumbnail_url,
+                'additional_images': [],
+            },
+            'shop': row['shop_id'],
+            'model': row['model'],
+            'external_id': row['external_id'],
+            'quantity': row['quantity'],
+            'price': row['price'],
+            'price_rrc': row['price_rrc'],
+            'product_parameters': parameters.get(row['id'], []),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,246 @@
+"""
+Сигналы каталога и их обработчики.
+
+offers_changed отправляется внутри транзакции после записи изменений
+предложений магазина (импорт прайс-листа, обновление остатков,
+сохранение предложения или его параметров), поэтому обработчики
+обновляют производные данные (поисковый индекс, фасеты, витрину и
+статистику каталога) в той же транзакции, меняют версии каталога (см.
+backend.catalog_version), сбрасывают кэш карточек товаров (см.
+backend.product_details) и планируют снимок индекса каталога (см.
+backend.catalog_snapshot). Изменения вне импорта сбрасывают состояние
+последнего импорта прайс-листов магазина (PriceListSource), чтобы
+повторный импорт того же файла не был пропущен. Аргументы сигнала:
+
+    shop_id (int): Магазин
+    product_info_ids (set): Созданные, измененные и удаленные предложения
+    fields (set): Измененные поля или None, если предложения могли
+        измениться целиком (импорт)
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .catalog_stats import CATALOG_STATS_FIELDS, refresh_catalog_stats
+from .catalog_version import bump_catalog_version
+from .catalog_snapshot import schedule_catalog_snapshot
+from .catalog_entries import refresh_catalog_entries, refresh_product_entries, refresh_product_images
+from .facets import FACET_COUNT_FIELDS, FACET_FIELDS, refresh_facet_counts, refresh_facets
+from .models import Parameter, PriceListSource, Product, ProductImage, ProductInfo, ProductParameter
+from .parameter_values import refresh_numeric_values
+from .product_details import invalidate_offer_details, invalidate_product_details
+from .search import SEARCH_VECTOR_FIELDS, refresh_search_vectors
+
+
+offers_changed = Signal()
+
+
+@receiver(offers_changed)
+def update_search_vectors(sender, product_info_ids, fields=None, **kwargs):
+    """
+    Пересчитывает поисковые векторы, если изменились индексируемые данные.
+    """
+    if fields is None or fields & SEARCH_VECTOR_FIELDS:
+        refresh_search_vectors(product_info_ids)
+
+
+@receiver(offers_changed)
+def update_facets(sender, shop_id, product_info_ids, fields=None, **kwargs):
+    """
+    Обновляет индекс фасетов: значения параметров предложений (в том числе
+    числовые) и счетчики магазина.
+    """
+    if fields is None or fields & FACET_FIELDS:
+        refresh_facets(product_info_ids)
+        refresh_numeric_values(product_info_ids)
+    if fields is None or 'product_id' in fields:
+        refresh_facet_counts(shop_id)
+    elif fields & FACET_COUNT_FIELDS:
+        refresh_facet_counts(shop_id, product_info_ids)
+
+
+@receiver(offers_changed)
+def update_catalog_entries(sender, product_info_ids, fields=None, **kwargs):
+    """
+    Обновляет строки витрины каталога.
+    """
+    refresh_catalog_entries(product_info_ids, fields)
+
+
+@receiver(offers_changed)
+def update_catalog_stats(sender, shop_id, product_info_ids, fields=None, **kwargs):
+    """
+    Пересчитывает статистику категорий магазина (после обновления витрины).
+    """
+    if fields is None or 'product_id' in fields:
+        refresh_catalog_stats(shop_id)
+    elif fields & CATALOG_STATS_FIELDS:
+        refresh_catalog_stats(shop_id, product_info_ids)
+
+
+@receiver(offers_changed)
+def update_catalog_version(sender, shop_id, **kwargs):
+    """
+    Меняет версию каталога магазина и глобальную версию.
+    """
+    bump_catalog_version(shop_id)
+
+
+@receiver(offers_changed)
+def update_catalog_snapshot(sender, **kwargs):
+    """
+    Планирует запись снимка индекса каталога для веб-процессов.
+    """
+    schedule_catalog_snapshot()
+
+
+@receiver(offers_changed)
+def update_product_details(sender, product_info_ids, **kwargs):
+    """
+    Сбрасывает кэш карточек товаров измененных предложений.
+    """
+    invalidate_offer_details(product_info_ids)
+
+
+def reset_price_list_sources(*shop_ids):
+    """
+    Сбрасывает ETag, Last-Modified и хэш содержимого последнего импорта
+    прайс-листов магазинов: следующий импорт загрузит и запишет прайс-лист,
+    даже если файл не изменился.
+
+    Args:
+        *shop_ids: Магазины, предложения которых изменены вне импорта
+    """
+    PriceListSource.objects.filter(shop_id__in=shop_ids).exclude(
+        etag='', last_modified='', content_hash='',
+    ).update(etag='', last_modified='', content_hash='')
+
+
+@receiver(offers_changed)
+def update_price_list_sources(sender, shop_id, **kwargs):
+    """
+    Изменения предложений вне импорта (остатки, админка) расходятся с
+    последним импортированным прайс-листом.
+    """
+    # importer импортирует этот модуль
+    from .importer import PriceListImporter
+
+    if not (isinstance(sender, type) and issubclass(sender, PriceListImporter)):
+        reset_price_list_sources(shop_id)
+
+
+def product_shops(product_ids):
+    """
+    Магазины, которые продают товары.
+    """
+    return set(ProductInfo.objects.filter(product_id__in=list(product_ids)).order_by().values_list('shop_id', flat=True))
+
+
+def bump_product_shops(product_ids):
+    """
+    Меняет версии каталога магазинов, которые продают товары.
+
+    Args:
+        product_ids: Товары
+    """
+    bump_catalog_version(*product_shops(product_ids))
+
+
+@receiver(post_save, sender=ProductInfo)
+def product_info_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Сохранение предложения (админка, оформление заказа) - изменение предложения.
+    """
+    if raw:
+        return
+    fields = None
+    if update_fields:
+        fields = {'product_id' if field == 'product' else field for field in update_fields}
+    offers_changed.send(sender=sender, shop_id=instance.shop_id, product_info_ids={instance.id}, fields=fields)
+
+
+def offers_by_shop(product_info_ids):
+    """
+    Группирует предложения по магазинам.
+
+    Returns:
+        dict: Магазин -> множество предложений
+    """
+    shops = {}
+    for product_info_id, shop_id in ProductInfo.objects.filter(id__in=set(product_info_ids)).values_list('id', 'shop_id'):
+        shops.setdefault(shop_id, set()).add(product_info_id)
+    return shops
+
+
+def notify_offers_changed(sender, shops, fields=None):
+    """
+    Отправляет offers_changed по магазинам.
+
+    Для удаленных предложений магазины нужно получить (offers_by_shop)
+    до удаления.
+
+    Args:
+        sender: Отправитель сигнала
+        shops (dict): Магазин -> предложения
+        fields (set): Измененные поля или None
+    """
+    for shop_id, ids in shops.items():
+        offers_changed.send(sender=sender, shop_id=shop_id, product_info_ids=ids, fields=fields)
+
+
+def notify_parameters_changed(product_info_ids):
+    """
+    Отправляет offers_changed для предложений, параметры которых изменены
+    вне импорта (например, в админке).
+
+    Args:
+        product_info_ids: Предложения
+    """
+    notify_offers_changed(ProductParameter, offers_by_shop(product_info_ids), {'parameters'})
+
+
+@receiver(post_save, sender=Parameter)
+def parameter_saved(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Переименование параметра меняет параметры предложений в витрине.
+    """
+    if created or raw:
+        return
+    product_info_ids = set(ProductParameter.objects.filter(parameter=instance).values_list('product_info_id', flat=True))
+    refresh_catalog_entries(product_info_ids, {'parameters'})
+    invalidate_offer_details(product_info_ids)
+    shop_ids = offers_by_shop(product_info_ids)
+    reset_price_list_sources(*shop_ids)
+    bump_catalog_version(*shop_ids)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Изменение товара (название, категория, изображение) обновляет
+    поисковые векторы его предложений, витрину, счетчики фасетов и
+    статистику категорий магазинов.
+    """
+    if not created and not raw:
+        product_info_ids = list(ProductInfo.objects.filter(product_id=instance.id).values_list('id', flat=True))
+        refresh_search_vectors(product_info_ids)
+        refresh_product_entries([instance.id])
+        invalidate_product_details([instance.id])
+        shop_ids = product_shops([instance.id])
+        for shop_id in shop_ids:
+            refresh_facet_counts(shop_id)
+            refresh_catalog_stats(shop_id)
+        reset_price_list_sources(*shop_ids)
+        bump_catalog_version(*shop_ids)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender, instance, raw=False, **kwargs):
+    """
+    Изменение дополнительных изображений товара обновляет витрину.
+    """
+    if not raw:
+        refresh_product_images([instance.product_id])
+        invalidate_product_details([instance.product_id])
+        bump_product_shops([instance.product_id])
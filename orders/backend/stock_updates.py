@@ -0,0 +1,134 @@
+"""
+Быстрое обновление остатков и цен предложений партнера.
+
+Партнер присылает пакет изменений в формате JSON Lines - по одному
+объекту {"external_id": ..., "quantity": ..., "price": ...} на строку.
+Изменения применяются множественными UPDATE ... FROM (VALUES ...)
+по ключу (shop, external_id) без разбора и синхронизации всего
+прайс-листа: каждый пакет обходится в два запроса к базе.
+"""
+
+import json
+
+from django.db import connection, transaction
+
+from .importer import DEFAULT_BATCH_SIZE, chunked
+from .models import ProductInfo
+from .signals import offers_changed
+
+
+# Поля, которые можно изменить через пакет изменений
+DELTA_FIELDS = ('quantity', 'price')
+
+# Наибольшее значение PositiveIntegerField (integer в PostgreSQL)
+MAX_VALUE = 2147483647
+
+
+class StockDeltaError(ValueError):
+    """
+    Ошибка формата пакета изменений остатков и цен.
+    """
+
+
+def read_stock_deltas(lines):
+    """
+    Разбирает пакет изменений в формате JSON Lines.
+
+    Пустые строки пропускаются. Поля quantity и price необязательны,
+    но хотя бы одно из них должно быть указано. При повторе external_id
+    учитывается последняя строка.
+
+    Args:
+        lines: Итерируемый объект строк (str или bytes)
+
+    Returns:
+        dict: external_id -> (quantity, price), отсутствующие поля - None
+
+    Raises:
+        StockDeltaError: Строка не является корректным изменением
+    """
+    deltas = {}
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise StockDeltaError(f'Строка {number}: некорректный JSON ({e})')
+        if not isinstance(item, dict):
+            raise StockDeltaError(f'Строка {number}: ожидался объект')
+
+        values = []
+        for field in ('external_id',) + DELTA_FIELDS:
+            value = item.get(field)
+            if value is None and field != 'external_id':
+                values.append(None)
+                continue
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise StockDeltaError(f'Строка {number}: поле {field} должно быть неотрицательным целым числом')
+            if value > MAX_VALUE:
+                raise StockDeltaError(f'Строка {number}: поле {field} должно быть не больше {MAX_VALUE}')
+            values.append(value)
+
+        external_id, quantity, price = values
+        if quantity is None and price is None:
+            raise StockDeltaError(f'Строка {number}: не указаны quantity или price')
+        deltas[external_id] = (quantity, price)
+
+    return deltas
+
+
+def apply_stock_deltas(shop_id, deltas, batch_size=None):
+    """
+    Применяет изменения остатков и цен к предложениям магазина.
+
+    Args:
+        shop_id (int): Магазин
+        deltas (dict): external_id -> (quantity, price), см. read_stock_deltas
+        batch_size (int): Размер пакета (по умолчанию DEFAULT_BATCH_SIZE)
+
+    Returns:
+        dict: received, updated, unchanged и список неизвестных external_id
+    """
+    table = ProductInfo._meta.db_table
+    result = {'received': len(deltas), 'updated': 0, 'unchanged': 0, 'unknown': []}
+    changed_ids = set()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for external_ids in chunked(deltas, batch_size or DEFAULT_BATCH_SIZE):
+            known = set(
+                ProductInfo.objects
+                .filter(shop_id=shop_id, external_id__in=external_ids)
+                .values_list('external_id', flat=True)
+            )
+            result['unknown'].extend(external_id for external_id in external_ids if external_id not in known)
+            if not known:
+                continue
+
+            params = []
+            for external_id in known:
+                params.extend((external_id, *deltas[external_id]))
+            rows = ', '.join(['(CAST(%s AS integer), CAST(%s AS integer), CAST(%s AS integer))'] * len(known))
+            cursor.execute(f'''
+                WITH deltas (external_id, quantity, price) AS (VALUES {rows})
+                UPDATE {table} SET
+                    quantity = COALESCE(deltas.quantity, {table}.quantity),
+                    price = COALESCE(deltas.price, {table}.price)
+                FROM deltas
+                WHERE {table}.shop_id = %s
+                  AND {table}.external_id = deltas.external_id
+                  AND ({table}.quantity <> COALESCE(deltas.quantity, {table}.quantity)
+                       OR {table}.price <> COALESCE(deltas.price, {table}.price))
+                RETURNING {table}.id
+            ''', params + [shop_id])
+            updated_ids = {product_info_id for product_info_id, in cursor.fetchall()}
+            result['updated'] += len(updated_ids)
+            result['unchanged'] += len(known) - len(updated_ids)
+            changed_ids |= updated_ids
+
+        if changed_ids:
+            offers_changed.send(
+                sender=apply_stock_deltas, shop_id=shop_id, product_info_ids=changed_ids, fields=set(DELTA_FIELDS)
+            )
+
+    return result
@@ -81,4 +81,7 @@ def send_order_confirmation_email_task(self, user_email, user_name, order_id):
     except Exception as e:
         self.retry(exc=e, countdown=60)
 
-from .tasks_rollbar import test_rollbar_celery_task
\ No newline at end of file
+from .tasks_rollbar import test_rollbar_celery_task
+from .tasks_import import import_price_list_task
+from .tasks_export import export_catalog_task
+from .tasks_catalog import write_catalog_snapshot_task
@@ -0,0 +1,32 @@
+"""
+Celery задачи для снимка индекса каталога.
+"""
+
+import logging
+
+from celery import shared_task
+from django.core.cache import cache
+
+from .catalog_snapshot import SCHEDULED_KEY, write_catalog_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def write_catalog_snapshot_task(self):
+    """
+    Асинхронная задача записи снимка индекса каталога для веб-процессов.
+
+    Метка запланированной задачи снимается до чтения каталога, поэтому
+    изменения, сделанные во время записи, планируют следующий снимок.
+    """
+    cache.delete(SCHEDULED_KEY)
+    try:
+        snapshot = write_catalog_snapshot()
+    except OSError as e:
+        logger.exception('Ошибка записи снимка каталога')
+        raise self.retry(exc=e, countdown=60)
+
+    if snapshot['reused']:
+        return f"Снимок каталога {snapshot['file']} актуален"
+    return f"Снимок каталога {snapshot['file']} записан: {snapshot['rows']} строк"
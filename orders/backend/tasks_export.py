@@ -0,0 +1,46 @@
+"""
+Celery задачи для выгрузки каталога в файлы.
+"""
+
+import logging
+import time
+
+from celery import shared_task
+
+from .export_jobs import update_export_job, write_snapshot
+from .import_jobs import JOB_FAILURE, JOB_RUNNING, JOB_SUCCESS
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def export_catalog_task(self, job_id, shop_ids, export_format):
+    """
+    Асинхронная задача выгрузки каталога в сжатый файл.
+
+    Если для текущей версии каталога выгрузка уже есть,
+    задача сразу возвращает ее.
+
+    Args:
+        job_id (str): Идентификатор задачи выгрузки
+        shop_ids (list): Магазины (пустой список - весь каталог)
+        export_format (str): Формат: yaml, jsonl или csv
+    """
+    update_export_job(job_id, state=JOB_RUNNING, started_at=time.time())
+    try:
+        snapshot = write_snapshot(shop_ids, export_format)
+    except Exception as e:
+        logger.exception(f'Ошибка выгрузки каталога {job_id}')
+        update_export_job(job_id, state=JOB_FAILURE, finished_at=time.time(), error=str(e))
+        return f'Выгрузка {job_id} завершилась ошибкой'
+
+    update_export_job(
+        job_id,
+        state=JOB_SUCCESS,
+        finished_at=time.time(),
+        file=snapshot['file'],
+        version=snapshot['version'],
+        rows=snapshot['rows'],
+        reused=snapshot['reused'],
+    )
+    return f"Выгрузка {job_id} завершена: {snapshot['file']}"
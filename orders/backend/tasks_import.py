@@ -0,0 +1,107 @@
+"""
+Celery задачи для импорта прайс-листов партнеров.
+"""
+
+import logging
+import time
+
+from celery import shared_task
+from django.conf import settings
+from requests import RequestException
+
+from .import_jobs import (
+    JOB_FAILURE, JOB_PENDING, JOB_RUNNING, JOB_SKIPPED, JOB_SUCCESS,
+    SKIP_NOT_MODIFIED, SKIP_UNCHANGED, update_job,
+)
+from .importer import get_importer
+from .models import PriceListSource, Shop
+from .price_list import download_price_list, read_price_list
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def import_price_list_task(self, job_id, url, engine=None, force=False):
+    """
+    Асинхронная задача загрузки и импорта прайс-листа по URL.
+
+    Прайс-лист загружается условным запросом с ETag/Last-Modified
+    предыдущего импорта по этому адресу. Если сервер ответил 304 или хэш
+    содержимого совпал с импортом по этому адресу (содержимое включает
+    магазин, поэтому совпадает и магазин), разбор и запись в базу
+    пропускаются. Состояние импорта хранится для пары (магазин, адрес):
+    изменения предложений магазина вне импорта сбрасывают его (см.
+    backend.signals), и прайс-лист импортируется заново.
+
+    Прогресс (обработано строк, скорость) сохраняется в состояние
+    задачи после каждого пакета товаров.
+
+    Args:
+        job_id (str): Идентификатор задачи импорта
+        url (str): Адрес YAML прайс-листа
+        engine (str): Движок импорта (по умолчанию PRICE_LIST_IMPORT_ENGINE)
+        force (bool): Импортировать, даже если прайс-лист не изменился
+    """
+
+    def report_progress(stats):
+        update_job(job_id, rows=stats.product_infos, rows_per_sec=round(stats.rows_per_sec, 1))
+
+    update_job(job_id, state=JOB_RUNNING, started_at=time.time(), finished_at=None)
+    # Последний импорт по адресу: его валидаторы - для условного запроса
+    source = None if force else PriceListSource.objects.filter(url=url).first()
+    try:
+        with download_price_list(
+            url,
+            etag=source.etag if source else '',
+            last_modified=source.last_modified if source else '',
+            timeout=settings.PRICE_LIST_DOWNLOAD_TIMEOUT,
+        ) as download:
+            if download.not_modified:
+                update_job(job_id, state=JOB_SKIPPED, finished_at=time.time(), skip_reason=SKIP_NOT_MODIFIED)
+                return f'Импорт {job_id} пропущен: прайс-лист не изменился'
+
+            if not force:
+                source = PriceListSource.objects.filter(url=url, content_hash=download.content_hash).first()
+            if source:
+                source.etag = download.etag
+                source.last_modified = download.last_modified
+                source.save(update_fields=['etag', 'last_modified'])
+                update_job(job_id, state=JOB_SKIPPED, finished_at=time.time(), skip_reason=SKIP_UNCHANGED)
+                return f'Импорт {job_id} пропущен: содержимое прайс-листа не изменилось'
+
+            data = read_price_list(download.file)
+            update_job(job_id, shop=data['shop'])
+            stats = get_importer(engine, progress=report_progress).run(data)
+
+        PriceListSource.objects.update_or_create(
+            shop=Shop.objects.filter(name=stats.shop).first(),
+            url=url,
+            defaults={
+                'etag': download.etag,
+                'last_modified': download.last_modified,
+                'content_hash': download.content_hash,
+            },
+        )
+
+    except RequestException as e:
+        logger.warning(f'Ошибка загрузки прайс-листа {url}: {e}')
+        if self.request.retries < self.max_retries:
+            update_job(job_id, state=JOB_PENDING, error=str(e))
+            raise self.retry(exc=e, countdown=60)
+        update_job(job_id, state=JOB_FAILURE, finished_at=time.time(), error=str(e))
+        return f'Импорт {job_id} завершился ошибкой'
+
+    except Exception as e:
+        logger.exception(f'Ошибка импорта прайс-листа {url}')
+        update_job(job_id, state=JOB_FAILURE, finished_at=time.time(), error=str(e))
+        return f'Импорт {job_id} завершился ошибкой'
+
+    update_job(
+        job_id,
+        state=JOB_SUCCESS,
+        finished_at=time.time(),
+        rows=stats.product_infos,
+        rows_per_sec=round(stats.rows_per_sec, 1),
+        stats=stats.as_dict(),
+    )
+    return f'Импорт {job_id} завершен: {stats.product_infos} строк'
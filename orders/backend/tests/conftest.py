@@ -0,0 +1,179 @@
+"""
+Общие фикстуры и данные тестов приложения backend.
+
+Константы и вспомогательные функции импортируются из этого модуля
+(from backend.tests.conftest import PRICE_LIST), фикстуры доступны
+тестам пакета без импорта.
+"""
+import os
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.importer import get_importer
+from backend.price_list import read_price_list
+
+
+SHOP1_PATH = os.path.join(os.path.dirname(__file__), '../../shop1.yaml')
+
+# Каталог списка товаров: два смартфона и часы одного магазина
+PRICE_LIST = """
+shop: Связной
+categories:
+  - id: 224
+    name: Смартфоны
+goods:
+  - id: 4216292
+    category: 224
+    model: apple/iphone/xs-max
+    name: Смартфон Apple iPhone XS Max 512GB (золотистый)
+    price: 110000
+    price_rrc: 116990
+    quantity: 14
+    parameters:
+      "Диагональ (дюйм)": 6.5
+      Цвет: золотистый
+  - id: 4216313
+    category: 224
+    model: samsung/galaxy/s9
+    name: Смартфон Samsung Galaxy S9 (черный)
+    price: 60000
+    price_rrc: 65000
+    quantity: 9
+    parameters:
+      Цвет: черный
+  - id: 4216314
+    category: 224
+    model: apple/watch/s4
+    name: Часы Apple Watch Series 4
+    price: 30000
+    price_rrc: 32000
+    quantity: 5
+    parameters:
+      Цвет: черный
+"""
+
+# Разобранный прайс-лист для тестов движков импорта и выгрузки
+PRICE_LIST_DATA = {
+    'shop': 'Связной',
+    'categories': [
+        {'id': 224, 'name': 'Смартфоны'},
+        {'id': 15, 'name': 'Аксессуары'},
+    ],
+    'goods': [
+        {
+            'id': 4216292,
+            'category': 224,
+            'model': 'apple/iphone/xs-max',
+            'name': 'Смартфон Apple iPhone XS Max 512GB (золотистый)',
+            'price': 110000,
+            'price_rrc': 116990,
+            'quantity': 14,
+            'parameters': {'Диагональ (дюйм)': 6.5, 'Цвет': 'золотистый'},
+        },
+        {
+            'id': 4216313,
+            'category': 224,
+            'model': 'apple/iphone/xr',
+            'name': 'Смартфон Apple iPhone XR 256GB (красный)',
+            'price': 65000,
+            'price_rrc': 69990,
+            'quantity': 9,
+            'parameters': {'Диагональ (дюйм)': 6.1, 'Цвет': 'красный'},
+        },
+        {
+            'id': 4672670,
+            'category': 15,
+            'model': 'apple/airpods',
+            'name': 'Наушники Apple AirPods',
+            'price': 12000,
+            'price_rrc': 12990,
+            'quantity': 3,
+            'parameters': {'Цвет': 'белый'},
+        },
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    """
+    Кэш (ответы, версии каталога, состояние задач, счетчики троттлинга)
+    в тестах - в памяти; одинаковые запросы разных тестов не должны пересекаться.
+    """
+    from django.core.cache import cache
+
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+
+
+@pytest.fixture
+def buyer_client(db):
+    """Клиент API, авторизованный покупателем."""
+    from users.models import User
+
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create(email='buyer@example.com', username='buyer'))
+    return client
+
+
+@pytest.fixture
+def client(buyer_client):
+    """Клиент API покупателя и каталог PRICE_LIST."""
+    get_importer('orm').run(read_price_list(PRICE_LIST))
+    return buyer_client
+
+
+@pytest.fixture
+def two_shops(client):
+    """Второй магазин: Galaxy S9 дешевле, iPhone дороже, часов нет в наличии."""
+    price_list = (
+        PRICE_LIST.replace('Связной', 'Евросеть')
+        .replace('price: 60000', 'price: 55000')
+        .replace('price: 110000', 'price: 120000')
+        .replace('quantity: 5', 'quantity: 0')
+    )
+    get_importer('orm').run(read_price_list(price_list))
+    return client
+
+
+@pytest.fixture
+def shop(db, django_capture_on_commit_callbacks):
+    """Магазин, импортированный из PRICE_LIST_DATA."""
+    from backend.models import Shop
+
+    with django_capture_on_commit_callbacks(execute=True):
+        get_importer('orm').run(dict(PRICE_LIST_DATA, goods=iter(PRICE_LIST_DATA['goods'])))
+    return Shop.objects.get(name=PRICE_LIST_DATA['shop'])
+
+
+@pytest.fixture
+def catalog_index(settings, monkeypatch):
+    """Индекс каталога в памяти, сверяемый с версией каталога при каждом запросе."""
+    import backend.catalog_index
+
+    settings.CATALOG_INDEX_ENABLED = True
+    settings.CATALOG_INDEX_CHECK_INTERVAL = 0
+    monkeypatch.setattr(backend.catalog_index, '_index', None)
+    return backend.catalog_index
+
+
+def products(client, **params):
+    response = client.get(reverse('product-list'), params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def walk(client, **params):
+    """Идентификаторы всех страниц вперед и затем назад по ссылкам previous."""
+    data = products(client, page_size=1, **params)
+    forward = [row['id'] for row in data['results']]
+    while data['next']:
+        data = client.get(data['next']).json()
+        forward += [row['id'] for row in data['results']]
+    backward = []
+    while data['previous']:
+        data = client.get(data['previous']).json()
+        backward = [row['id'] for row in data['results']] + backward
+    return forward, backward
@@ -0,0 +1,70 @@
+"""
+Тесты лучших предложений товаров среди магазинов.
+"""
+from django.urls import reverse
+
+from backend.stock_updates import apply_stock_deltas
+from backend.tests.conftest import products
+
+
+def offers(client, product_id, **extra):
+    return client.get(reverse('product-offers', args=[product_id]), **extra)
+
+
+def test_product_offers(two_shops, django_capture_on_commit_callbacks):
+    """Предложения товара по возрастанию цены, первое - лучшее; кэш сбрасывается с версией каталога."""
+    from backend.models import Product, Shop
+
+    product = Product.objects.get(name__startswith='Смартфон Samsung')
+    data = offers(two_shops, product.id).json()
+    assert [(row['shop'], row['price']) for row in data['offers']] == [
+        (Shop.objects.get(name='Евросеть').id, 55000),
+        (Shop.objects.get(name='Связной').id, 60000),
+    ]
+    assert data['best_offer'] == data['offers'][0]
+    assert data['product_id'] == product.id
+
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(Shop.objects.get(name='Евросеть').id, {4216313: (0, None)})
+    assert offers(two_shops, product.id).json()['best_offer']['price'] == 60000
+
+    watch = Product.objects.get(name__startswith='Часы')
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(Shop.objects.get(name='Связной').id, {4216314: (0, None)})
+    assert offers(two_shops, watch.id).json() == {'product_id': watch.id, 'best_offer': None, 'offers': []}
+
+    assert offers(two_shops, 0).status_code == 404
+
+
+def test_product_offers_etag(two_shops):
+    """Предложения товара отвечают 304 на совпадающий If-None-Match."""
+    from backend.models import Product
+
+    product = Product.objects.get(name__startswith='Смартфон Samsung')
+    etag = offers(two_shops, product.id)['ETag']
+    assert offers(two_shops, product.id, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+def test_best_offer_list(two_shops):
+    """?best_offer=1 оставляет самое дешевое предложение каждого товара в наличии."""
+    best = {'Смартфон Apple iPhone XS Max 512GB (золотистый)': 110000, 'Смартфон Samsung Galaxy S9 (черный)': 55000,
+            'Часы Apple Watch Series 4': 30000}
+
+    data = products(two_shops, best_offer=1, ordering='price')
+    assert [(row['product']['name'], row['price']) for row in data['results']] == sorted(best.items(), key=lambda item: item[1])
+    assert data['facets']['Цвет'] == {'золотистый': 1, 'черный': 2}
+
+    # Постранично по курсору в обе стороны
+    page = products(two_shops, best_offer=1, ordering='-price', page_size=1)
+    prices = [row['price'] for row in page['results']]
+    while page['next']:
+        page = two_shops.get(page['next']).json()
+        prices += [row['price'] for row in page['results']]
+    assert prices == sorted(best.values(), reverse=True)
+    assert [row['price'] for row in two_shops.get(page['previous']).json()['results']] == [55000]
+
+    data = products(two_shops, best_offer=1, search='смартфон')
+    assert sorted(row['price'] for row in data['results']) == [55000, 110000]
+
+    data = products(two_shops, best_offer=1, **{'param[Цвет]': 'черный'})
+    assert sorted(row['price'] for row in data['results']) == [30000, 55000]
@@ -0,0 +1,110 @@
+"""
+Тесты витрины каталога (CatalogEntry).
+"""
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from backend.catalog_entries import refresh_catalog_entries
+from backend.importer import get_importer
+from backend.price_list import read_price_list
+from backend.serializers import CatalogEntrySerializer, ProductInfoSerializer
+from backend.stock_updates import apply_stock_deltas
+from backend.tests.conftest import PRICE_LIST, products
+
+
+def serialize(request):
+    """Строки витрины и ProductInfoSerializer для всех предложений."""
+    from django.db.models import Prefetch
+
+    from backend.models import CatalogEntry, ProductInfo, ProductParameter
+
+    # Порядок параметров без сортировки не определен, витрина хранит их в порядке id
+    offers = ProductInfo.objects.select_related('product').prefetch_related(
+        Prefetch('product_parameters', queryset=ProductParameter.objects.select_related('parameter').order_by('id')),
+        'product__additional_images',
+    ).order_by('id')
+    entries = CatalogEntry.objects.order_by('pk')
+    context = {'request': request}
+    return (
+        CatalogEntrySerializer(entries, many=True, context=context).data,
+        ProductInfoSerializer(offers, many=True, context=context).data,
+    )
+
+
+@pytest.mark.parametrize('engine', ['orm', 'copy'])
+def test_catalog_entries_match_serializer(db, engine):
+    """Витрина после импорта совпадает с сериализацией ProductInfo."""
+    get_importer(engine).run(read_price_list(PRICE_LIST))
+    entries, offers = serialize(APIRequestFactory().get('/'))
+    assert len(entries) == 3
+    assert entries == offers
+
+
+def test_catalog_entries_follow_changes(db, settings, tmp_path):
+    """Витрина обновляется при изменении остатков, товаров, изображений и удалении предложений."""
+    from backend.models import CatalogEntry, Product, ProductImage, ProductInfo, Shop
+
+    settings.MEDIA_ROOT = tmp_path
+    get_importer('orm').run(read_price_list(PRICE_LIST))
+    shop = Shop.objects.get()
+
+    apply_stock_deltas(shop.id, {4216314: (0, 25000)})
+    entry = CatalogEntry.objects.get(external_id=4216314)
+    assert (entry.quantity, entry.price) == (0, 25000)
+
+    product = Product.objects.get(name__startswith='Часы')
+    product.name = 'Часы Apple Watch Series 5'
+    product.save()
+    ProductImage.objects.create(product=product, order=1)
+    entry.refresh_from_db()
+    assert entry.product_name == 'Часы Apple Watch Series 5'
+    assert len(entry.additional_images) == 1
+
+    offer = ProductInfo.objects.get(external_id=4216313)
+    offer.model = 'samsung/galaxy/s9-plus'
+    offer.save()
+    entries, offers = serialize(APIRequestFactory().get('/'))
+    assert entries == offers
+
+    get_importer('copy').run(read_price_list(PRICE_LIST.split('  - id: 4216314')[0]))
+    assert not CatalogEntry.objects.filter(external_id=4216314).exists()
+    assert sorted(CatalogEntry.objects.values_list('model', flat=True)) == ['apple/iphone/xs-max', 'samsung/galaxy/s9']
+
+
+def test_product_list_reads_catalog_entries(client):
+    """Строки списка товаров берутся из витрины, в том числе при поиске."""
+    from backend.models import CatalogEntry
+
+    CatalogEntry.objects.filter(external_id=4216292).update(product_name='Из витрины')
+    data = products(client, ordering='price')
+    assert [row['product']['name'] for row in data['results']][-1] == 'Из витрины'
+
+    data = products(client, search='смартфон', ordering='price')
+    assert [row['product']['name'] for row in data['results']] == ['Смартфон Samsung Galaxy S9 (черный)', 'Из витрины']
+
+
+def test_refresh_catalog_entries_is_idempotent(db):
+    """Повторный пересчет витрины не меняет строки."""
+    from backend.models import CatalogEntry, ProductInfo
+
+    get_importer('orm').run(read_price_list(PRICE_LIST))
+    before = list(CatalogEntry.objects.order_by('pk').values())
+    refresh_catalog_entries(ProductInfo.objects.values_list('id', flat=True))
+    assert list(CatalogEntry.objects.order_by('pk').values()) == before
+
+
+def test_refresh_catalog_entries_command(db, settings, tmp_path):
+    """Команда пересобирает витрину, в том числе изображения товаров, не заполненные миграцией."""
+    from django.core.management import call_command
+
+    from backend.models import CatalogEntry, Product, ProductImage
+
+    settings.MEDIA_ROOT = tmp_path
+    get_importer('orm').run(read_price_list(PRICE_LIST))
+    ProductImage.objects.create(product=Product.objects.get(name__startswith='Часы'), order=1)
+    CatalogEntry.objects.update(additional_images=[], parameters=[])
+
+    call_command('refresh_catalog_entries')
+    entries, offers = serialize(APIRequestFactory().get('/'))
+    assert entries == offers
+    assert len(CatalogEntry.objects.get(external_id=4216314).additional_images) == 1
@@ -0,0 +1,54 @@
+"""
+Тесты генератора синтетических прайс-листов и замеров импорта.
+"""
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from backend.catalog_generator import CATEGORY_ID_BASE, generate_price_list
+from backend.price_list import read_price_list
+
+
+def test_generate_price_list():
+    """Прайс-лист соответствует схеме shop1.yaml и воспроизводим по seed."""
+    file = io.StringIO()
+    generate_price_list(file, 'Магазин', categories=3, goods=20, parameters=4, seed=1)
+
+    data = read_price_list(file.getvalue())
+    goods = list(data['goods'])
+    assert data['shop'] == 'Магазин'
+    assert [category['id'] for category in data['categories']] == [CATEGORY_ID_BASE + i for i in range(3)]
+    assert len(goods) == 20
+    assert {good['category'] for good in goods} == {category['id'] for category in data['categories']}
+    assert all(len(good['parameters']) == 4 for good in goods)
+    assert all(good['price_rrc'] >= good['price'] for good in goods)
+
+    again = io.StringIO()
+    generate_price_list(again, 'Магазин', categories=3, goods=20, parameters=4, seed=1)
+    assert again.getvalue() == file.getvalue()
+
+
+@pytest.mark.django_db
+def test_benchmark_import(tmp_path):
+    """Замеры записываются в JSON, синтетический каталог удаляется."""
+    from backend.models import Category, ProductInfo
+
+    output = tmp_path / 'benchmark.json'
+    call_command(
+        'benchmark_import', '--shops', '2', '--goods', '30', '--categories', '3',
+        '--engine', 'orm', '--output', str(output), stdout=io.StringIO(),
+    )
+
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert [(result['engine'], result['run']) for result in report['results']] == [('orm', 'initial'), ('orm', 'reimport')]
+    initial, reimport = report['results']
+    assert initial['rows'] == 60
+    assert initial['changes']['created'] == 60
+    assert reimport['changes']['unchanged'] == 60
+    assert initial['peak_memory'] > 0
+    assert initial['queries'] > 0
+
+    assert not ProductInfo.objects.exists()
+    assert not Category.objects.exists()
@@ -0,0 +1,82 @@
+"""
+Тесты индекса каталога в памяти процесса.
+"""
+import pytest
+
+from backend.stock_updates import apply_stock_deltas
+from backend.tests.conftest import products, walk
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.mark.parametrize('ordering', ['id', '-id', 'price', '-price'])
+def test_catalog_index_matches_database(client, settings, catalog_index, ordering):
+    """Страницы по индексу совпадают со страницами из базы."""
+    from backend.models import ProductInfo, Shop
+
+    ProductInfo.objects.filter(external_id=4216313).update(price=110000)
+    shop = Shop.objects.get()
+    for params in ({}, {'category_id': 224}, {'shop_id': shop.id}, {'category_id': 1}):
+        settings.CATALOG_INDEX_ENABLED = True
+        with_index = walk(client, ordering=ordering, **params)
+        assert catalog_index._index is not None
+        settings.CATALOG_INDEX_ENABLED = False
+        assert walk(client, ordering=ordering, fields='id', **params) == with_index
+
+
+def test_catalog_index_patched_on_version_change(client, catalog_index, django_capture_on_commit_callbacks):
+    """Индекс перечитывает магазин, версия которого изменилась."""
+    from backend.models import Shop
+
+    shop = Shop.objects.get()
+    assert len(products(client)['results']) == 3
+    index = catalog_index._index
+
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(shop.id, {4216292: (0, None)})
+
+    assert [row['external_id'] for row in products(client, ordering='price')['results']] == [4216314, 4216313]
+    assert catalog_index._index is not index
+    assert len(catalog_index._index) == 3
+
+
+def test_catalog_index_follows_etag_version(client, settings, catalog_index, django_capture_on_commit_callbacks):
+    """Индекс отстающей версии сверяется сразу: строки страницы соответствуют ее ETag."""
+    from django.urls import reverse
+
+    from backend.catalog_version import get_catalog_version
+    from backend.models import Shop
+
+    url = reverse('product-list')
+    first = client.get(url)
+    settings.CATALOG_INDEX_CHECK_INTERVAL = 3600
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(Shop.objects.get().id, {4216292: (0, None)})
+
+    response = client.get(url)
+    assert len(response.json()['results']) == 2
+    assert response['ETag'] != first['ETag']
+
+    assert catalog_index._index.version == get_catalog_version()
+
+
+def test_catalog_index_select():
+    """Выборка по ключу курсора в обоих направлениях."""
+    from backend.catalog_index import CatalogIndex
+
+    # id, цена, остаток, магазин, категория
+    rows = np.array([
+        [1, 300, 1, 1, 10],
+        [2, 100, 1, 1, 10],
+        [3, 100, 0, 1, 10],
+        [4, 100, 5, 2, 20],
+        [5, 200, 2, 2, 10],
+    ])
+    index = CatalogIndex(rows, 'v', {})
+    key = ('price', 'product_info_id')
+    assert index.select(key, None, None, 10) == [2, 4, 5, 1]
+    assert index.select(key, [100, 2], 'next', 10) == [4, 5, 1]
+    assert index.select(key, [200, 5], 'prev', 10) == [4, 2]
+    assert index.select(('-price', '-product_info_id'), [200, 5], 'next', 1) == [4]
+    assert index.select(('-product_info_id',), None, None, 10, category_id=10) == [5, 2, 1]
+    assert index.select(('product_info_id',), [1], 'next', 10, shop_id=2) == [4, 5]
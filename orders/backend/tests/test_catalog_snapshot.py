@@ -0,0 +1,92 @@
+"""
+Тесты снимка индекса каталога в файле.
+"""
+import os
+
+import pytest
+
+from backend.stock_updates import apply_stock_deltas
+from backend.tests.conftest import walk
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def catalog_snapshot(settings, monkeypatch, tmp_path):
+    import backend.catalog_snapshot
+
+    settings.CATALOG_SNAPSHOT_ENABLED = True
+    settings.CATALOG_SNAPSHOT_DIR = str(tmp_path)
+    monkeypatch.setattr(backend.catalog_snapshot, '_snapshot', None)
+    return backend.catalog_snapshot
+
+
+def test_catalog_snapshot_round_trip(tmp_path):
+    """Индекс из снимка совпадает с исходным и читается без копирования."""
+    from backend.catalog_index import CatalogIndex
+    from backend.catalog_snapshot import dump_catalog_index, load_catalog_index
+
+    rows = np.array([[1, 300, 1, 1, 10], [2, 100, 1, 1, 10], [3, 100, 0, 2, 20]])
+    index = CatalogIndex(rows, '42', {1: '40', 2: '41'})
+    path = tmp_path / 'catalog.bin'
+    with open(path, 'wb') as file:
+        dump_catalog_index(index, file)
+
+    loaded = load_catalog_index(str(path))
+    assert (loaded.version, loaded.shop_versions) == ('42', {1: '40', 2: '41'})
+    for name, array in index.arrays().items():
+        assert getattr(loaded, name).dtype == array.dtype
+        assert getattr(loaded, name).tolist() == array.tolist()
+    assert not loaded.ids.flags.writeable
+    assert loaded.select(('price', 'product_info_id'), None, None, 10) == [2, 1]
+
+    empty = tmp_path / 'empty.bin'
+    with open(empty, 'wb') as file:
+        dump_catalog_index(CatalogIndex(np.empty((0, 5), dtype=np.int64), '1', {}), file)
+    assert len(load_catalog_index(str(empty))) == 0
+
+    with pytest.raises(ValueError):
+        load_catalog_index(__file__)
+
+
+def change_stock(settings, django_capture_on_commit_callbacks):
+    """Снимает с продажи предложение, не планируя запись снимка."""
+    from backend.models import Shop
+
+    settings.CATALOG_SNAPSHOT_ENABLED = False
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(Shop.objects.get().id, {4216292: (0, None)})
+    settings.CATALOG_SNAPSHOT_ENABLED = True
+
+
+def test_write_catalog_snapshot(client, settings, catalog_snapshot, tmp_path, django_capture_on_commit_callbacks):
+    """Снимок пишется для новой версии каталога, указатель переключается, прежний снимок удаляется."""
+    first = catalog_snapshot.write_catalog_snapshot()
+    assert first['rows'] == 3 and not first['reused']
+    assert catalog_snapshot.current_snapshot_path() == os.path.join(tmp_path, first['file'])
+    assert catalog_snapshot.write_catalog_snapshot()['reused']
+
+    change_stock(settings, django_capture_on_commit_callbacks)
+
+    second = catalog_snapshot.write_catalog_snapshot()
+    assert second['version'] != first['version']
+    assert sorted(os.listdir(tmp_path)) == sorted([second['file'], catalog_snapshot.CURRENT_POINTER])
+    assert catalog_snapshot.get_catalog_snapshot().version == second['version']
+
+
+def test_catalog_index_from_snapshot(client, settings, catalog_index, catalog_snapshot, django_capture_on_commit_callbacks):
+    """Процесс использует снимок текущей версии и дочитывает изменения после снимка."""
+    catalog_snapshot.write_catalog_snapshot()
+    assert len(walk(client, ordering='price')[0]) == 3
+    assert catalog_index._index is catalog_snapshot.get_catalog_snapshot()
+
+    # Новый процесс: снимок отстает от каталога
+    change_stock(settings, django_capture_on_commit_callbacks)
+    catalog_index._index = None
+
+    forward, backward = walk(client, ordering='price')
+    assert len(forward) == 2
+    assert catalog_index._index is not catalog_snapshot.get_catalog_snapshot()
+
+    settings.CATALOG_INDEX_ENABLED = False
+    assert walk(client, ordering='price', fields='id') == (forward, backward)
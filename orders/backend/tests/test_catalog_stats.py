@@ -0,0 +1,126 @@
+"""
+Тесты справочников категорий и магазинов со статистикой каталога.
+"""
+import pytest
+from django.db.models import Count, Max, Min
+from django.urls import reverse
+
+from backend.importer import get_importer
+from backend.price_list import read_price_list
+from backend.stock_updates import apply_stock_deltas
+from backend.tests.conftest import PRICE_LIST
+
+
+def directory(client, name, **params):
+    response = client.get(reverse(name), params)
+    assert response.status_code == 200
+    return {row['name']: (row['offers'], row['min_price'], row['max_price']) for row in response.json()}
+
+
+def assert_stats_match_catalog():
+    """Статистика совпадает с подсчетом по витрине."""
+    from backend.models import CatalogEntry, CatalogStats
+
+    expected = {
+        (row['shop_id'], row['category_id']): (row['offers'], row['min_price'], row['max_price'])
+        for row in CatalogEntry.objects.filter(quantity__gt=0).values('shop_id', 'category_id').annotate(
+            offers=Count('pk'), min_price=Min('price'), max_price=Max('price'),
+        )
+    }
+    assert {
+        (row.shop_id, row.category_id): (row.offers, row.min_price, row.max_price) for row in CatalogStats.objects.all()
+    } == expected
+
+
+@pytest.mark.parametrize('engine', ['orm', 'copy'])
+def test_catalog_stats_refreshed_once_per_import(two_shops, engine, monkeypatch):
+    """Статистика магазина пересчитывается целиком один раз на импорт, а не на пакет."""
+    from backend import signals
+
+    refresh_catalog_stats = signals.refresh_catalog_stats
+    calls = []
+
+    def count_refresh(shop_id, product_info_ids=None):
+        calls.append(product_info_ids)
+        refresh_catalog_stats(shop_id, product_info_ids)
+
+    monkeypatch.setattr(signals, 'refresh_catalog_stats', count_refresh)
+    price_list = PRICE_LIST.replace('price: 110000', 'price: 100000')
+    price_list = price_list[:price_list.index('  - id: 4216313')] + price_list[price_list.index('  - id: 4216314'):]
+    stats = get_importer(engine, batch_size=1).run(read_price_list(price_list))
+
+    assert stats.changes['updated'] == 1 and stats.changes['deleted'] == 1
+    assert calls == [None]
+    assert_stats_match_catalog()
+
+
+def test_catalog_directories(two_shops):
+    """Справочники суммируют предложения в наличии по категориям и магазинам."""
+    from backend.models import Category, Shop
+
+    Category.objects.create(id=1, name='Аксессуары')
+    assert directory(two_shops, 'category-list') == {
+        'Смартфоны': (5, 30000, 120000),
+        'Аксессуары': (0, None, None),
+    }
+    assert directory(two_shops, 'shop-list') == {
+        'Связной': (3, 30000, 110000),
+        'Евросеть': (2, 55000, 120000),
+    }
+
+    shop = Shop.objects.get(name='Евросеть')
+    assert directory(two_shops, 'category-list', shop_id=shop.id)['Смартфоны'] == (2, 55000, 120000)
+    assert directory(two_shops, 'shop-list', category_id=1)['Связной'] == (0, None, None)
+    assert two_shops.get(reverse('shop-list'), {'category_id': 'x'}).status_code == 400
+
+
+def test_catalog_stats_follow_changes(two_shops):
+    """Статистика пересчитывается при изменении остатков и цен, товаров и импорте."""
+    from backend.models import Category, Product, Shop
+
+    assert_stats_match_catalog()
+    shop = Shop.objects.get(name='Связной')
+
+    apply_stock_deltas(shop.id, {4216314: (0, None), 4216313: (None, 65000)})
+    assert directory(two_shops, 'shop-list')['Связной'] == (2, 65000, 110000)
+    assert_stats_match_catalog()
+
+    # Товар перенесен в другую категорию
+    product = Product.objects.get(name__startswith='Смартфон Samsung')
+    product.category = Category.objects.create(id=1, name='Аксессуары')
+    product.save()
+    assert directory(two_shops, 'category-list') == {
+        'Смартфоны': (2, 110000, 120000),
+        'Аксессуары': (2, 55000, 65000),
+    }
+    assert_stats_match_catalog()
+
+    # Повторный импорт без iPhone удаляет предложение
+    price_list = PRICE_LIST.replace('Связной', 'Евросеть')
+    price_list = price_list[:price_list.index('  - id: 4216292')] + price_list[price_list.index('  - id: 4216313'):]
+    get_importer('orm').run(read_price_list(price_list))
+    assert directory(two_shops, 'shop-list')['Евросеть'][0] == 2
+    assert_stats_match_catalog()
+
+
+def test_catalog_stats_upserted_under_shop_lock(two_shops):
+    """Статистика обновляется на месте под блокировкой магазина, а не удаляется и вставляется заново."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from backend.catalog_stats import CATALOG_STATS_LOCK_ID
+    from backend.models import CatalogStats, Shop
+
+    shop = Shop.objects.get(name='Связной')
+    row_ids = set(CatalogStats.objects.filter(shop=shop).values_list('pk', flat=True))
+
+    with CaptureQueriesContext(connection) as queries:
+        apply_stock_deltas(shop.id, {4216313: (None, 65000)})
+    assert f'SELECT pg_advisory_xact_lock({CATALOG_STATS_LOCK_ID}, {shop.id})' in [query['sql'] for query in queries]
+    assert set(CatalogStats.objects.filter(shop=shop).values_list('pk', flat=True)) == row_ids
+    assert_stats_match_catalog()
+
+    # Категория без предложений в наличии удаляется из статистики
+    apply_stock_deltas(shop.id, {4216292: (0, None), 4216313: (0, None), 4216314: (0, None)})
+    assert not CatalogStats.objects.filter(shop=shop).exists()
+    assert_stats_match_catalog()
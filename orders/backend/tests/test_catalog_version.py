@@ -0,0 +1,123 @@
+"""
+Тесты версий каталога и условных запросов к списку товаров.
+"""
+from django.urls import reverse
+
+from backend.catalog_version import get_catalog_version
+from backend.stock_updates import apply_stock_deltas
+
+
+def test_product_list_etag(client, django_assert_num_queries):
+    """Список товаров отдает ETag и отвечает 304 без запросов к базе."""
+    url = reverse('product-list')
+    response = client.get(url, {'ordering': 'price', 'page_size': 2})
+    assert response.status_code == 200
+    etag = response['ETag']
+    assert etag.startswith('"')
+
+    # Порядок параметров запроса не влияет на ETag
+    response = client.get(f'{url}?page_size=2&ordering=price')
+    assert response['ETag'] == etag
+
+    with django_assert_num_queries(0):
+        response = client.get(url, {'ordering': 'price', 'page_size': 2}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+    response = client.get(url, {'ordering': 'price', 'page_size': 2}, HTTP_IF_NONE_MATCH=f'W/{etag}')
+    assert response.status_code == 304
+
+    response = client.get(url, {'ordering': '-price', 'page_size': 2}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+def test_product_list_etag_changes_with_catalog(client, django_capture_on_commit_callbacks):
+    """После изменения каталога прежний ETag не подходит, а кэш ответов не используется."""
+    from backend.models import Shop
+
+    url = reverse('product-list')
+    shop = Shop.objects.get()
+    response = client.get(url, {'ordering': 'price'})
+    etag = response['ETag']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(shop.id, {4216292: (0, None)})
+
+    response = client.get(url, {'ordering': 'price'}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert 4216292 not in [row['external_id'] for row in response.json()['results']]
+
+
+def test_catalog_version_bumped_by_edits(client, django_capture_on_commit_callbacks):
+    """Версии магазина и каталога меняются при изменении предложений, товаров и параметров."""
+    from backend.models import Parameter, ProductInfo, ProductParameter, Shop
+    from backend.signals import notify_parameters_changed
+
+    shop = Shop.objects.get()
+
+    def changed(action):
+        versions = get_catalog_version(), get_catalog_version(shop.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            action()
+        new_versions = get_catalog_version(), get_catalog_version(shop.id)
+        return all(new != old for new, old in zip(new_versions, versions))
+
+    offer = ProductInfo.objects.get(external_id=4216292)
+    assert changed(lambda: ProductInfo.objects.get(pk=offer.pk).save(update_fields=['price']))
+
+    product = offer.product
+    product.name = 'Смартфон Apple iPhone XS Max 256GB'
+    assert changed(product.save)
+
+    product_parameter = ProductParameter.objects.filter(product_info=offer).first()
+    product_parameter.value = 'серебристый'
+    product_parameter.save()
+    assert changed(lambda: notify_parameters_changed([offer.id]))
+
+    parameter = Parameter.objects.get(name='Цвет')
+    parameter.name = 'Цвет корпуса'
+    assert changed(parameter.save)
+
+
+
+def test_catalog_version_bumped_by_category_changes(two_shops, django_capture_on_commit_callbacks):
+    """Переименование категории при импорте и удаление магазина или категории в админке меняют версии магазинов."""
+    from django.contrib import admin
+
+    from backend.importer import get_importer
+    from backend.models import CatalogEntry, Category, Shop
+    from backend.price_list import read_price_list
+    from backend.tests.conftest import PRICE_LIST
+
+    shops = {shop.name: shop.id for shop in Shop.objects.all()}
+
+    def changed(action, shop_id):
+        version = get_catalog_version(shop_id)
+        with django_capture_on_commit_callbacks(execute=True):
+            action()
+        return get_catalog_version(shop_id) != version
+
+    # Импорт одного магазина переименовывает категорию и в каталоге другого
+    price_list = read_price_list(PRICE_LIST.replace('name: Смартфоны', 'name: Телефоны'))
+    assert changed(lambda: get_importer('orm').run(price_list), shops['Евросеть'])
+
+    assert changed(lambda: admin.site._registry[Shop].delete_queryset(None, Shop.objects.filter(name='Евросеть')),
+                   shops['Евросеть'])
+    assert not CatalogEntry.objects.filter(shop_id=shops['Евросеть']).exists()
+
+    category = Category.objects.get(name='Телефоны')
+    assert changed(lambda: admin.site._registry[Category].delete_model(None, category), shops['Связной'])
+    assert not CatalogEntry.objects.filter(category_id=category.id).exists()
+
+def test_product_list_not_modified_without_response_cache(client, settings, django_assert_num_queries):
+    """Представление само отвечает 304, если ответ не закэширован."""
+    settings.MIDDLEWARE = [name for name in settings.MIDDLEWARE if not name.endswith('QueryCacheMiddleware')]
+    url = reverse('product-list')
+    etag = client.get(url, {'search': 'смартфон'})['ETag']
+
+    with django_assert_num_queries(0):
+        response = client.get(url, {'search': 'смартфон'}, HTTP_IF_NONE_MATCH=f'"other", {etag}')
+    assert response.status_code == 304
+    assert response['ETag'] == etag
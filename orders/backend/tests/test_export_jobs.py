@@ -0,0 +1,98 @@
+"""
+Тесты асинхронной выгрузки каталога в файлы.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.catalog_version import get_catalog_version
+from backend.export_jobs import write_snapshot
+from backend.import_jobs import JOB_SUCCESS
+from backend.price_list import read_price_list
+from backend.stock_updates import apply_stock_deltas
+from backend.tests.conftest import PRICE_LIST_DATA
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Файлы выгрузок - во временном каталоге."""
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+def read_snapshot(settings, snapshot):
+    with gzip.open(os.path.join(settings.MEDIA_ROOT, snapshot['file']), 'rt', encoding='utf-8') as file:
+        return file.read()
+
+
+def test_write_snapshot_formats(shop, settings):
+    """Выгрузки во всех форматах содержат все предложения магазина."""
+    external_ids = sorted(good['id'] for good in PRICE_LIST_DATA['goods'])
+
+    content = read_snapshot(settings, write_snapshot([shop.id], 'yaml', chunk_size=2))
+    assert [good['id'] for good in read_price_list(content)['goods']] == external_ids
+
+    content = read_snapshot(settings, write_snapshot([shop.id], 'jsonl'))
+    rows = [json.loads(line) for line in content.splitlines()]
+    assert [row['id'] for row in rows] == external_ids
+    assert rows[0]['shop_id'] == shop.id
+
+    content = read_snapshot(settings, write_snapshot([], 'csv'))
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [int(row['id']) for row in rows] == external_ids
+    assert json.loads(rows[0]['parameters'])
+
+
+def test_snapshot_reused_until_catalog_changes(shop, settings, django_capture_on_commit_callbacks):
+    """Выгрузка переиспользуется, пока не изменилась версия каталога."""
+    first = write_snapshot([shop.id], 'jsonl')
+    assert not first['reused']
+    assert first['rows'] == 3
+
+    second = write_snapshot([shop.id], 'jsonl')
+    assert second['reused']
+    assert second['file'] == first['file']
+
+    version = get_catalog_version(shop.id)
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(shop.id, {4216292: (0, None)})
+    assert get_catalog_version(shop.id) != version
+
+    third = write_snapshot([shop.id], 'jsonl')
+    assert not third['reused']
+    assert third['file'] != first['file']
+    assert not os.path.exists(os.path.join(settings.MEDIA_ROOT, first['file']))
+
+
+def test_export_job_endpoints(shop):
+    """Задача выгрузки ставится в очередь, статус содержит ссылку на файл."""
+    from backend.tasks_export import export_catalog_task
+    from users.models import User
+
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create(email='partner@example.com', username='partner'))
+    url = reverse('partner-export-jobs')
+
+    assert client.post(url, {'format': 'xml', 'shops': [shop.id]}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+    assert client.post(url, {'format': 'csv'}, format='json').status_code == status.HTTP_403_FORBIDDEN
+
+    with patch('backend.views.export_catalog_task.delay') as mock_delay:
+        response = client.post(url, {'format': 'csv', 'shops': [shop.id]}, format='json')
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()['job_id']
+    mock_delay.assert_called_once_with(job_id, [shop.id], 'csv')
+
+    export_catalog_task.apply(args=(job_id, [shop.id], 'csv'))
+    response = client.get(reverse('partner-export-job-status', kwargs={'job_id': job_id}))
+    job = response.json()['Job']
+    assert job['state'] == JOB_SUCCESS
+    assert job['rows'] == 3
+    assert job['download_url'].startswith('/media/exports/catalog_shop_')
+    assert job['download_url'].endswith('.csv.gz')
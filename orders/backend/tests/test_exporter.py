@@ -0,0 +1,63 @@
+"""
+Тесты потоковой выгрузки каталога магазина.
+"""
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.exporter import iter_goods, iter_price_list
+from backend.price_list import read_price_list
+from backend.tests.conftest import PRICE_LIST_DATA
+
+
+def expected_goods():
+    """Товары прайс-листа в том виде, в котором они хранятся в базе."""
+    return [
+        dict(good, parameters={name: str(value) for name, value in sorted(good['parameters'].items())})
+        for good in sorted(PRICE_LIST_DATA['goods'], key=lambda good: good['id'])
+    ]
+
+
+@pytest.mark.parametrize('export_format', ['yaml', 'json'])
+def test_export_round_trip(shop, export_format):
+    """Выгрузка читается импортом и совпадает с исходным прайс-листом."""
+    content = ''.join(iter_price_list(shop, export_format, chunk_size=2))
+    if export_format == 'json':
+        json.loads(content)
+
+    data = read_price_list(content)
+    assert data['shop'] == PRICE_LIST_DATA['shop']
+    assert sorted(data['categories'], key=lambda c: c['id']) == sorted(PRICE_LIST_DATA['categories'], key=lambda c: c['id'])
+    assert list(data['goods']) == expected_goods()
+
+
+def test_export_prefetches_parameters_per_chunk(shop, django_assert_num_queries):
+    """Параметры подгружаются одним запросом на пакет, а не на товар."""
+    with django_assert_num_queries(3):
+        assert len(list(iter_goods(shop, chunk_size=2))) == 3
+
+
+def test_partner_export_view(shop):
+    """Endpoint отдает каталог потоково в выбранном формате."""
+    from users.models import User
+
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create(email='partner@example.com', username='partner'))
+    url = reverse('partner-export')
+
+    response = client.get(url, {'shop': shop.id, 'output': 'json'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response['Content-Type'].startswith('application/json')
+    data = json.loads(b''.join(response.streaming_content))
+    assert [good['id'] for good in data['goods']] == [good['id'] for good in expected_goods()]
+
+    response = client.get(url, {'shop': shop.id})
+    assert response['Content-Type'].startswith('application/x-yaml')
+    assert 'shop_%d.yaml' % shop.id in response['Content-Disposition']
+
+    assert client.get(url, {'shop': shop.id, 'output': 'xml'}).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get(url).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,88 @@
+"""
+Тесты фасетной фильтрации по параметрам товаров.
+"""
+
+from backend.importer import get_importer
+from backend.price_list import read_price_list
+from backend.stock_updates import apply_stock_deltas
+from backend.tests.conftest import PRICE_LIST, products
+
+
+def test_param_filters(client):
+    """Фильтры по разным параметрам объединяются через И, по значениям одного - через ИЛИ."""
+    data = products(client, **{'param[Цвет]': 'черный'})
+    assert {row['external_id'] for row in data['results']} == {4216313, 4216314}
+
+    data = products(client, **{'param[Цвет]': ['черный', 'золотистый']})
+    assert len(data['results']) == 3
+
+    data = products(client, **{'param[Цвет]': 'золотистый', 'param[Диагональ (дюйм)]': '6.5'})
+    assert [row['external_id'] for row in data['results']] == [4216292]
+
+    data = products(client, **{'param[Цвет]': 'золотистый', 'param[Диагональ (дюйм)]': '5.8'})
+    assert data['results'] == []
+    assert data['facets'] == {}
+
+    data = products(client, **{'param[Вес]': '1'})
+    assert data['results'] == []
+
+
+def test_facet_counts(client):
+    """Счетчики фасетов для всего каталога, с фильтрами и с поиском."""
+    expected = {'Диагональ (дюйм)': {'6.5': 1}, 'Цвет': {'черный': 2, 'золотистый': 1}}
+    data = products(client)
+    assert data['facets'] == expected
+    assert list(data['facets']['Цвет']) == ['черный', 'золотистый']
+
+    data = products(client, **{'param[Цвет]': 'черный'})
+    assert data['facets'] == {'Цвет': {'черный': 2}}
+
+    data = products(client, search='смартфон')
+    assert data['facets'] == expected | {'Цвет': {'золотистый': 1, 'черный': 1}}
+
+    data = products(client, page_size=1)
+    assert 'facets' in data
+    assert 'facets' not in client.get(data['next']).json()
+
+
+def test_facet_counts_follow_stock(client):
+    """Предрасчитанные счетчики обновляются при изменении остатков и параметров."""
+    from backend.models import FacetCount, Shop
+
+    shop = Shop.objects.get()
+    apply_stock_deltas(shop.id, {4216314: (0, None)})
+    assert products(client, shop_id=shop.id)['facets']['Цвет'] == {'золотистый': 1, 'черный': 1}
+
+    get_importer('orm').run(read_price_list(PRICE_LIST.replace('Цвет: золотистый', 'Цвет: серебристый')))
+    counts = {
+        (count.facet_value.parameter.name, count.facet_value.value): count.count
+        for count in FacetCount.objects.select_related('facet_value__parameter')
+    }
+    assert counts == {('Диагональ (дюйм)', '6.5'): 1, ('Цвет', 'серебристый'): 1, ('Цвет', 'черный'): 2}
+
+
+def test_facet_counts_stock_update_scoped_to_categories(client):
+    """Изменение остатков пересчитывает счетчики только категорий измененных предложений."""
+    from backend.facets import refresh_facet_counts
+    from backend.models import Category, FacetCount, Product, Shop
+
+    shop = Shop.objects.get()
+    watch = Product.objects.get(name__startswith='Часы')
+    watch.category = Category.objects.create(id=1, name='Часы')
+    watch.save()
+
+    def counts():
+        return {
+            (count.category_id, count.facet_value.value): count.count
+            for count in FacetCount.objects.select_related('facet_value')
+        }
+
+    assert counts() == {(224, 'черный'): 1, (224, 'золотистый'): 1, (224, '6.5'): 1, (1, 'черный'): 1}
+
+    # Счетчик другой категории не пересчитывается
+    FacetCount.objects.filter(category_id=1).update(count=7)
+    apply_stock_deltas(shop.id, {4216313: (0, None)})
+    assert counts() == {(224, 'золотистый'): 1, (224, '6.5'): 1, (1, 'черный'): 7}
+
+    refresh_facet_counts(shop.id)
+    assert counts() == {(224, 'золотистый'): 1, (224, '6.5'): 1, (1, 'черный'): 1}
@@ -0,0 +1,91 @@
+"""
+Тесты выбора полей ответа (?fields=) и раскрытия связей (?expand=).
+"""
+import pytest
+from django.urls import reverse
+
+from backend.fieldsets import parse_fieldset
+from backend.tests.conftest import products
+
+
+def test_parse_fieldset():
+    """Вложенные поля собираются в дерево, объект целиком поглощает свои поля."""
+    assert parse_fieldset('') is None
+    assert parse_fieldset('id, product.name,product.thumbnail_url,,price') == {
+        'id': None, 'product': {'name': None, 'thumbnail_url': None}, 'price': None,
+    }
+    assert parse_fieldset('product.name,product') == {'product': None}
+    assert parse_fieldset('product,product.name') == {'product': None}
+
+
+def test_product_list_fields(client):
+    """?fields= оставляет в строках только запрошенные поля в обычном порядке."""
+    full = products(client, ordering='price')['results']
+
+    data = products(client, ordering='price', fields='product.thumbnail_url,price,id,product.name')
+    assert data['results'] == [
+        {
+            'id': row['id'],
+            'product': {'name': row['product']['name'], 'thumbnail_url': row['product']['thumbnail_url']},
+            'price': row['price'],
+        }
+        for row in full
+    ]
+    assert list(data['results'][0]) == ['id', 'product', 'price']
+    assert 'facets' in data
+
+    all_fields = 'id,product,shop,model,external_id,quantity,price,price_rrc,product_parameters'
+    assert products(client, ordering='price', fields=all_fields)['results'] == full
+
+    data = products(client, search='смартфон', fields='id,model')
+    assert {tuple(row) for row in data['results']} == {('id', 'model')}
+
+
+def test_product_list_fields_cursor(client):
+    """Курсор работает, даже если поля ключа сортировки не запрошены."""
+    first = products(client, ordering='-price', page_size=2, fields='product.name')
+    assert [list(row) for row in first['results']] == [['product'], ['product']]
+    second = client.get(first['next']).json()
+    assert len(second['results']) == 1
+
+
+def test_product_list_expand(client):
+    """?expand= раскрывает магазин и категорию в объекты."""
+    from backend.models import Shop
+
+    shop = Shop.objects.get()
+    row = products(client, expand='shop,product.category', ordering='price')['results'][0]
+    assert row['shop'] == {'id': shop.id, 'name': shop.name, 'url': shop.url}
+    assert row['product']['category'] == {'id': 224, 'name': 'Смартфоны'}
+
+    data = products(client, expand='shop', fields='id,shop.name')
+    assert data['results'][0] == {'id': data['results'][0]['id'], 'shop': {'name': shop.name}}
+
+
+@pytest.mark.parametrize('params', [
+    {'fields': 'id,color'},
+    {'fields': 'price.value'},
+    {'fields': 'shop.name'},
+    {'expand': 'parameters'},
+])
+def test_product_list_invalid_fields(client, params):
+    """Неизвестные поля и связи отклоняются."""
+    response = client.get(reverse('product-list'), params)
+    assert response.status_code == 400
+
+
+def test_order_list_fields(client):
+    """Список заказов с ?fields= не подгружает позиции, если они не запрошены."""
+    from backend.models import Order, OrderItem, ProductInfo
+
+    user = client.handler._force_user
+    order = Order.objects.create(user=user, state='new')
+    OrderItem.objects.create(order=order, product_info=ProductInfo.objects.first(), quantity=1)
+
+    response = client.get(reverse('order-list'), {'fields': 'id,state'})
+    assert response.json() == [{'id': order.id, 'state': 'new'}]
+
+    response = client.get(reverse('order-list'), {'fields': 'id,ordered_items.quantity'})
+    assert response.json() == [{'id': order.id, 'ordered_items': [{'quantity': 1}]}]
+
+    assert client.get(reverse('order-list'), {'fields': 'id,total'}).status_code == 400
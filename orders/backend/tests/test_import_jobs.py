@@ -0,0 +1,199 @@
+"""
+Тесты асинхронных задач импорта прайс-листов.
+"""
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.import_jobs import (
+    JOB_FAILURE, JOB_PENDING, JOB_SKIPPED, JOB_SUCCESS, SKIP_NOT_MODIFIED, SKIP_UNCHANGED,
+    create_job, get_job, job_as_dict, update_job,
+)
+from backend.tests.conftest import SHOP1_PATH
+
+
+def test_job_lifecycle():
+    """Тест создания и обновления состояния задачи."""
+    job = create_job(1, 'http://example.com/shop1.yaml')
+    assert job['state'] == JOB_PENDING
+    assert job_as_dict(job)['duration'] is None
+
+    update_job(job['id'], rows=10, error='Ошибка')
+    job = get_job(job['id'])
+    assert job['rows'] == 10
+    assert job['errors'] == ['Ошибка']
+    assert 'user_id' not in job_as_dict(job)
+
+    assert update_job('unknown', rows=1) is None
+
+
+def mock_response(mock_get, content, status_code=200, headers=None):
+    """Настраивает ответ requests.get для загрузки прайс-листа."""
+    response = mock_get.return_value.__enter__.return_value
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.iter_content.return_value = [content]
+    return response
+
+
+@pytest.mark.django_db
+def test_import_task_success():
+    """Задача импортирует прайс-лист и сохраняет статистику."""
+    from backend.models import PriceListSource
+    from backend.tasks_import import import_price_list_task
+
+    with open(SHOP1_PATH, 'rb') as file:
+        content = file.read()
+
+    job = create_job(1, 'http://example.com/shop1.yaml')
+    with patch('backend.price_list.get') as mock_get:
+        mock_response(mock_get, content, headers={'ETag': '"v1"'})
+        import_price_list_task.apply(args=(job['id'], job['url']))
+
+    job = get_job(job['id'])
+    assert job['state'] == JOB_SUCCESS
+    assert job['shop'] == 'Связной'
+    assert job['rows'] == 14
+    assert job['stats']['changes']['created'] == 14
+    assert job_as_dict(job)['duration'] >= 0
+
+    source = PriceListSource.objects.get(url='http://example.com/shop1.yaml')
+    assert source.shop.name == 'Связной'
+    assert source.etag == '"v1"'
+    assert len(source.content_hash) == 64
+
+
+@pytest.mark.django_db
+def test_import_task_skips_unchanged_price_list():
+    """Неизмененный прайс-лист не разбирается и не импортируется повторно."""
+    from backend.tasks_import import import_price_list_task
+
+    with open(SHOP1_PATH, 'rb') as file:
+        content = file.read()
+    url = 'http://example.com/shop1.yaml'
+
+    with patch('backend.price_list.get') as mock_get:
+        mock_response(mock_get, content, headers={'ETag': '"v1"'})
+        import_price_list_task.apply(args=(create_job(1, url)['id'], url))
+
+        job = create_job(1, url)
+        mock_response(mock_get, b'', status_code=304)
+        import_price_list_task.apply(args=(job['id'], url))
+        assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+        assert get_job(job['id'])['skip_reason'] == SKIP_NOT_MODIFIED
+
+        job = create_job(1, url)
+        mock_response(mock_get, content, headers={'ETag': '"v2"'})
+        with patch('backend.tasks_import.read_price_list') as mock_read:
+            import_price_list_task.apply(args=(job['id'], url))
+        mock_read.assert_not_called()
+        assert get_job(job['id'])['state'] == JOB_SKIPPED
+        assert get_job(job['id'])['skip_reason'] == SKIP_UNCHANGED
+
+        job = create_job(1, url)
+        import_price_list_task.apply(args=(job['id'], url), kwargs={'force': True})
+        assert get_job(job['id'])['state'] == JOB_SUCCESS
+        assert get_job(job['id'])['stats']['changes']['unchanged'] == 14
+
+
+
+@pytest.mark.django_db
+def test_import_task_sources_by_shop():
+    """Состояние импорта хранится для каждого магазина, загруженного по адресу."""
+    from backend.models import PriceListSource
+    from backend.tasks_import import import_price_list_task
+
+    with open(SHOP1_PATH, 'rb') as file:
+        content = file.read()
+    other = content.replace('Связной'.encode(), 'Евросеть'.encode())
+    url = 'http://example.com/price.yaml'
+
+    with patch('backend.price_list.get') as mock_get:
+        for body, etag in ((content, '"v1"'), (other, '"v2"')):
+            mock_response(mock_get, body, headers={'ETag': etag})
+            import_price_list_task.apply(args=(create_job(1, url)['id'], url))
+        assert sorted(PriceListSource.objects.filter(url=url).values_list('shop__name', 'etag')) == [
+            ('Евросеть', '"v2"'), ('Связной', '"v1"'),
+        ]
+
+        # Прайс-лист первого магазина снова по тому же адресу - не изменился
+        job = create_job(1, url)
+        mock_response(mock_get, content, headers={'ETag': '"v3"'})
+        import_price_list_task.apply(args=(job['id'], url))
+        assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v2"'}
+        assert get_job(job['id'])['skip_reason'] == SKIP_UNCHANGED
+        assert PriceListSource.objects.get(url=url, shop__name='Связной').etag == '"v3"'
+        assert PriceListSource.objects.filter(url=url).count() == 2
+
+@pytest.mark.django_db
+def test_import_task_after_stock_update():
+    """После изменения остатков вне импорта тот же прайс-лист импортируется заново."""
+    from backend.models import PriceListSource, ProductInfo
+    from backend.stock_updates import apply_stock_deltas
+    from backend.tasks_import import import_price_list_task
+
+    with open(SHOP1_PATH, 'rb') as file:
+        content = file.read()
+    url = 'http://example.com/shop1.yaml'
+
+    with patch('backend.price_list.get') as mock_get:
+        mock_response(mock_get, content, headers={'ETag': '"v1"'})
+        import_price_list_task.apply(args=(create_job(1, url)['id'], url))
+
+        source = PriceListSource.objects.get(url=url)
+        apply_stock_deltas(source.shop_id, {4216292: (0, None)})
+        source.refresh_from_db()
+        assert (source.etag, source.content_hash) == ('', '')
+
+        job = create_job(1, url)
+        import_price_list_task.apply(args=(job['id'], url))
+        assert mock_get.call_args.kwargs['headers'] == {}
+        assert get_job(job['id'])['state'] == JOB_SUCCESS
+        assert get_job(job['id'])['stats']['changes']['updated'] == 1
+
+    assert ProductInfo.objects.get(shop_id=source.shop_id, external_id=4216292).quantity == 14
+    assert len(PriceListSource.objects.get(url=url).content_hash) == 64
+
+
+@pytest.mark.django_db
+def test_import_task_failure():
+    """Ошибка разбора фиксируется в состоянии задачи."""
+    from backend.tasks_import import import_price_list_task
+
+    job = create_job(1, 'http://example.com/broken.yaml')
+    with patch('backend.price_list.get') as mock_get:
+        mock_response(mock_get, b'goods: []\n')
+        import_price_list_task.apply(args=(job['id'], job['url']))
+
+    job = get_job(job['id'])
+    assert job['state'] == JOB_FAILURE
+    assert job['errors']
+
+
+@pytest.mark.django_db
+def test_partner_update_enqueues_job():
+    """PartnerUpdate ставит задачу в очередь и возвращает ее id."""
+    from users.models import User
+
+    user = User.objects.create(email='partner@example.com', username='partner')
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with patch('backend.views.import_price_list_task.delay') as mock_delay:
+        response = client.post(reverse('partner-update'), {'url': 'http://example.com/shop1.yaml'}, format='json')
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()['job_id']
+    mock_delay.assert_called_once_with(job_id, 'http://example.com/shop1.yaml', None, False)
+
+    response = client.get(reverse('partner-import-status', kwargs={'job_id': job_id}))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['Job']['state'] == JOB_PENDING
+
+    other = User.objects.create(email='other@example.com', username='other')
+    client.force_authenticate(user=other)
+    response = client.get(reverse('partner-import-status', kwargs={'job_id': job_id}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,33 @@
+"""
+Тесты команды массового импорта прайс-листов.
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from backend.tests.conftest import SHOP1_PATH
+
+
+@pytest.mark.django_db
+def test_import_pricelist_dry_run():
+    """Пробный запуск выводит сводку изменений, но ничего не записывает."""
+    from backend.models import ProductInfo, Shop
+
+    with pytest.raises(CommandError):
+        call_command('import_pricelist', SHOP1_PATH, 'missing.yaml', '--dry-run', '--batch-size', '5')
+    assert not Shop.objects.exists()
+    assert not ProductInfo.objects.exists()
+
+    call_command('import_pricelist', SHOP1_PATH, stdout=StringIO())
+    assert ProductInfo.objects.count() == 14
+
+
+@pytest.mark.django_db
+def test_import_pricelist_summary(capsys):
+    """Выводится только сводная статистика по всем прайс-листам."""
+    call_command('import_pricelist', SHOP1_PATH, '--dry-run')
+    output = capsys.readouterr().out
+    assert 'Пробный запуск' in output
+    assert 'Прайс-листов: 1, успешно: 1, с ошибками: 0' in output
+    assert 'created=14' in output
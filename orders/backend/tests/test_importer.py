@@ -0,0 +1,218 @@
+"""
+Тесты движка пакетного импорта прайс-листов.
+"""
+import copy
+
+import pytest
+
+from backend.importer import DICTIONARIES_LOCK_ID, ImportStats, chunked, get_importer
+from backend.tests.conftest import PRICE_LIST_DATA
+
+
+@pytest.fixture(params=['orm', 'copy'])
+def engine(request):
+    """Движок импорта; copy проверяется только на PostgreSQL."""
+    from django.db import connection
+
+    if request.param == 'copy' and connection.vendor != 'postgresql':
+        pytest.skip('Движок copy требует PostgreSQL')
+    return request.param
+
+
+def test_chunked():
+    """Тест разбиения на пакеты."""
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 3)) == []
+
+
+def test_import_stats_rows_per_sec():
+    """Тест расчета скорости импорта."""
+    stats = ImportStats(shop='Связной')
+    assert stats.rows_per_sec == 0.0
+
+    stats.product_infos = 100
+    stats.duration = 2.0
+    assert stats.rows_per_sec == 50.0
+    assert stats.as_dict()['rows_per_sec'] == 50.0
+
+
+def test_get_importer_unknown_engine():
+    """Неизвестный движок импорта отклоняется."""
+    with pytest.raises(ValueError):
+        get_importer('unknown')
+
+
+@pytest.mark.django_db
+def test_price_list_import(engine):
+    """Тест пакетного импорта прайс-листа."""
+    from backend.models import Category, Parameter, ProductInfo, ProductParameter
+
+    stats = get_importer(engine, batch_size=2).run(PRICE_LIST_DATA)
+
+    assert stats.categories == 2
+    assert stats.products_created == 3
+    assert stats.product_infos == 3
+    assert stats.parameters_created == 2
+    assert stats.changes == {'created': 3, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'retired': 0}
+    assert stats.product_parameters_created == 5
+    assert stats.queries > 0
+
+    assert Category.objects.get(id=224).shops.filter(name='Связной').exists()
+    assert Parameter.objects.count() == 2
+    info = ProductInfo.objects.get(external_id=4216292)
+    assert info.price == 110000
+    assert ProductParameter.objects.get(product_info=info, parameter__name='Диагональ (дюйм)').value == '6.5'
+
+
+@pytest.mark.django_db
+def test_price_list_reimport_is_noop(engine):
+    """Повторный импорт того же прайс-листа ничего не пишет."""
+    from backend.models import Product, ProductInfo
+
+    get_importer(engine).run(PRICE_LIST_DATA)
+    ids = set(ProductInfo.objects.values_list('id', flat=True))
+    stats = get_importer(engine).run(PRICE_LIST_DATA)
+
+    assert stats.products_created == 0
+    assert stats.parameters_created == 0
+    assert stats.changes == {'created': 0, 'updated': 0, 'unchanged': 3, 'deleted': 0, 'retired': 0}
+    assert Product.objects.count() == 3
+    assert set(ProductInfo.objects.values_list('id', flat=True)) == ids
+
+
+@pytest.mark.django_db
+def test_price_list_dictionaries_lock(engine):
+    """Запись справочников выполняется под блокировкой, повторный импорт ее не берет."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def lock_queries():
+        return [
+            query for query in queries.captured_queries
+            if f'pg_advisory_xact_lock({DICTIONARIES_LOCK_ID})' in query['sql']
+        ]
+
+    with CaptureQueriesContext(connection) as queries:
+        get_importer(engine, batch_size=2).run(PRICE_LIST_DATA)
+    assert len(lock_queries()) == 1
+
+    with CaptureQueriesContext(connection) as queries:
+        get_importer(engine).run(PRICE_LIST_DATA)
+    assert lock_queries() == []
+
+
+@pytest.mark.django_db
+def test_price_list_dictionaries_added_concurrently(monkeypatch):
+    """Записи справочников, добавленные другим импортом после загрузки справочников, не дублируются."""
+    from backend.importer import PriceListImporter
+    from backend.models import Category, Parameter, Product
+
+    load_lookup_maps = PriceListImporter._load_lookup_maps
+
+    def load_and_add(self, shop, category_ids):
+        load_lookup_maps(self, shop, category_ids)
+        Product.objects.create(name='Наушники Apple AirPods', category=Category.objects.get(id=15))
+        Parameter.objects.create(name='Цвет')
+
+    # Категории уже есть: блокировка берется только при создании продуктов
+    for category in PRICE_LIST_DATA['categories']:
+        Category.objects.create(**category)
+    monkeypatch.setattr(PriceListImporter, '_load_lookup_maps', load_and_add)
+    stats = get_importer('orm').run(PRICE_LIST_DATA)
+
+    assert (stats.products_created, stats.parameters_created) == (2, 1)
+    assert Product.objects.filter(name='Наушники Apple AirPods').count() == 1
+    assert Parameter.objects.filter(name='Цвет').count() == 1
+
+
+@pytest.mark.django_db
+def test_price_list_import_refreshes_shop_once(monkeypatch):
+    """Данные магазина (счетчики фасетов) пересчитываются один раз на импорт, а не на пакет."""
+    from backend import signals
+
+    refresh_facet_counts = signals.refresh_facet_counts
+    calls = []
+
+    def count_refresh(shop_id):
+        calls.append(shop_id)
+        refresh_facet_counts(shop_id)
+
+    monkeypatch.setattr(signals, 'refresh_facet_counts', count_refresh)
+    get_importer('orm', batch_size=1).run(PRICE_LIST_DATA)
+    assert len(calls) == 1
+
+    calls.clear()
+    data = copy.deepcopy(PRICE_LIST_DATA)
+    data['goods'][0]['price'] = 100000
+    del data['goods'][1]
+    stats = get_importer('orm', batch_size=1).run(data)
+    assert stats.changes['updated'] == 1 and stats.changes['deleted'] == 1
+    assert len(calls) == 1
+
+
+
+@pytest.mark.django_db
+def test_price_list_import_sends_signal_once(engine):
+    """Импорт отправляет offers_changed один раз, вместе со снятыми с продажи, и не отправляет при пробном запуске."""
+    from backend.models import Order, OrderItem, ProductInfo
+    from backend.signals import offers_changed
+    from users.models import User
+
+    get_importer(engine).run(PRICE_LIST_DATA)
+    user = User.objects.create(email='buyer@example.com', username='buyer')
+    ordered = ProductInfo.objects.get(external_id=4672670)
+    OrderItem.objects.create(order=Order.objects.create(user=user, state='new'), product_info=ordered, quantity=1)
+    removed = ProductInfo.objects.get(external_id=4216313)
+
+    sent = []
+
+    def receiver(sender, product_info_ids, fields=None, **kwargs):
+        sent.append((set(product_info_ids), fields))
+
+    offers_changed.connect(receiver)
+    try:
+        data = dict(PRICE_LIST_DATA, goods=[
+            item for item in PRICE_LIST_DATA['goods'] if item['id'] not in (4672670, 4216313)
+        ])
+        stats = get_importer(engine, dry_run=True).run(data)
+        assert (stats.changes['deleted'], stats.changes['retired']) == (1, 1)
+        assert sent == []
+
+        get_importer(engine).run(data)
+        assert sent == [({ordered.id, removed.id}, None)]
+    finally:
+        offers_changed.disconnect(receiver)
+
+@pytest.mark.django_db
+def test_price_list_sync_diff(engine):
+    """Синхронизация записывает только изменения и сохраняет заказанные предложения."""
+    from backend.models import Order, OrderItem, ProductInfo, ProductParameter
+    from users.models import User
+
+    get_importer(engine).run(PRICE_LIST_DATA)
+    user = User.objects.create(email='buyer@example.com', username='buyer')
+    ordered = ProductInfo.objects.get(external_id=4672670)
+    OrderItem.objects.create(order=Order.objects.create(user=user, state='new'), product_info=ordered, quantity=1)
+
+    goods = copy.deepcopy(PRICE_LIST_DATA['goods'])
+    goods[0]['price'] = 99000
+    goods[1]['parameters']['Цвет'] = 'черный'
+    del goods[2]
+    goods.append({
+        'id': 1, 'category': 15, 'name': 'Чехол', 'price': 500, 'price_rrc': 600,
+        'quantity': 10, 'parameters': {},
+    })
+    stats = get_importer(engine).run(dict(PRICE_LIST_DATA, goods=goods))
+
+    assert stats.changes == {'created': 1, 'updated': 2, 'unchanged': 0, 'deleted': 0, 'retired': 1}
+    assert stats.product_parameters_updated == 1
+    assert ProductInfo.objects.get(external_id=4216292).price == 99000
+    assert ProductParameter.objects.get(
+        product_info__external_id=4216313, parameter__name='Цвет'
+    ).value == 'черный'
+    ordered.refresh_from_db()
+    assert ordered.quantity == 0
+    assert OrderItem.objects.filter(product_info=ordered).exists()
+
+    stats = get_importer(engine).run(dict(PRICE_LIST_DATA, goods=goods[:1]))
+    assert stats.changes['deleted'] == 2
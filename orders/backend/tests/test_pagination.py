@@ -0,0 +1,94 @@
+"""
+Тесты курсорной пагинации списка товаров.
+"""
+import base64
+import io
+import json
+import re
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from backend.catalog_generator import generate_price_list
+from backend.importer import get_importer
+from backend.price_list import read_price_list
+
+
+@pytest.fixture
+def client(buyer_client):
+    """Клиент API покупателя и сгенерированный каталог (вместо PRICE_LIST)."""
+    file = io.StringIO()
+    generate_price_list(file, 'Магазин', categories=2, goods=40, parameters=1, seed=3)
+    # Повторяющиеся цены проверяют сортировку по составному ключу (price, id)
+    content = re.sub(r'\bprice: (\d+)', lambda match: f'price: {int(match.group(1)) % 3 * 100 + 100}', file.getvalue())
+    get_importer('orm').run(read_price_list(content))
+    return buyer_client
+
+
+@pytest.mark.parametrize('ordering, key', [
+    ('id', lambda offer: offer.id),
+    ('-id', lambda offer: -offer.id),
+    ('price', lambda offer: (offer.price, offer.id)),
+    ('-price', lambda offer: (-offer.price, -offer.id)),
+])
+def test_keyset_pagination(client, ordering, key):
+    """Страницы вперед и назад покрывают все товары в наличии без повторов."""
+    from backend.models import ProductInfo
+
+    expected = [offer.id for offer in sorted(ProductInfo.objects.filter(quantity__gt=0), key=key)]
+    url = reverse('product-list')
+
+    response = client.get(url, {'ordering': ordering, 'page_size': 7})
+    data = response.json()
+    assert data['previous'] is None
+    assert len(data['results']) == 7
+
+    ids, pages = [], []
+    while True:
+        pages.append([row['id'] for row in data['results']])
+        ids.extend(pages[-1])
+        if not data['next']:
+            break
+        previous_page, data = data, client.get(data['next']).json()
+        assert client.get(data['previous']).json()['results'] == previous_page['results']
+    assert ids == expected
+
+
+def test_page_size_cap_and_invalid_cursor(client, settings):
+    """Размер страницы ограничен, неверный курсор и сортировка отклоняются."""
+    settings.PRODUCT_LIST_MAX_PAGE_SIZE = 5
+    url = reverse('product-list')
+
+    assert len(client.get(url, {'page_size': 1000}).json()['results']) == 5
+    assert client.get(url, {'cursor': 'garbage'}).status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(url, {'ordering': 'name'}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+def cursor(values, direction='next'):
+    return base64.urlsafe_b64encode(json.dumps({'k': values, 'd': direction}).encode()).decode()
+
+
+@pytest.mark.parametrize('index', [False, True])
+@pytest.mark.parametrize('ordering, values', [
+    ('price', ['x', {}]),
+    ('price', [100, 'x']),
+    ('price', [[1], 1]),
+    ('price', [True, 1]),
+    ('id', [2 ** 70]),
+    ('id', {'a': 1}),
+    ('id', [float('inf')]),
+])
+def test_crafted_cursor(client, request, index, ordering, values):
+    """Курсор со значениями не того типа отклоняется, а не приводит к ошибке сервера."""
+    if index:
+        request.getfixturevalue('catalog_index')
+    response = client.get(reverse('product-list'), {'ordering': ordering, 'cursor': cursor(values)})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_cursor_values_coerced(client):
+    """Строковые значения курсора приводятся к типам полей ключа."""
+    response = client.get(reverse('product-list'), {'ordering': 'price', 'cursor': cursor(['100', '0'])})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['results']
@@ -0,0 +1,59 @@
+"""
+Тесты числовых значений параметров и диапазонных фильтров.
+"""
+import pytest
+from django.urls import reverse
+
+from backend.importer import get_importer
+from backend.parameter_values import parse_numeric_value
+from backend.price_list import read_price_list
+from backend.tests.conftest import PRICE_LIST, products
+
+
+@pytest.mark.parametrize('name, value, expected', [
+    ('Диагональ (дюйм)', '6.5', (6.5, 'in')),
+    ('Диагональ', '6,1"', (6.1, 'in')),
+    ('Screen Size (inches)', '6.2', (6.2, 'in')),
+    ('Встроенная память (Гб)', '512', (512, 'GB')),
+    ('Встроенная память', '1 ТБ', (1024, 'GB')),
+    ('Internal Memory (GB)', '128', (128, 'GB')),
+    ('Количество ядер', '8', (8, '')),
+    ('Разрешение (пикс)', '2688x1242', (None, '')),
+    ('Цвет', 'черный', (None, '')),
+    ('Вес', '2 упаковки', (None, '')),
+])
+def test_parse_numeric_value(name, value, expected):
+    """Число и нормализованная единица берутся из значения или из названия параметра."""
+    assert parse_numeric_value(name, value) == expected
+
+
+def test_numeric_values_on_import(client):
+    """Импорт заполняет числовые значения и пересчитывает их при изменении."""
+    from backend.models import ProductParameter
+
+    values = dict(
+        ProductParameter.objects.filter(numeric_value__isnull=False).values_list('value', 'numeric_value')
+    )
+    assert values == {'6.5': 6.5}
+
+    get_importer('copy').run(read_price_list(PRICE_LIST.replace('"Диагональ (дюйм)": 6.5', '"Диагональ (дюйм)": 6.7')))
+    product_parameter = ProductParameter.objects.get(numeric_value__isnull=False)
+    assert (product_parameter.value, product_parameter.numeric_value, product_parameter.unit) == ('6.7', 6.7, 'in')
+
+
+@pytest.mark.parametrize('params, external_ids', [
+    ({'param_min[Диагональ (дюйм)]': '6', 'param_max[Диагональ (дюйм)]': '7'}, [4216292]),
+    ({'param_min[Диагональ (дюйм)]': '6,5'}, [4216292]),
+    ({'param_max[Диагональ (дюйм)]': '6'}, []),
+    ({'param_min[Цвет]': '1'}, []),
+])
+def test_range_filters(client, params, external_ids):
+    """Диапазонные фильтры по числовым значениям параметров."""
+    data = products(client, **params)
+    assert [row['external_id'] for row in data['results']] == external_ids
+
+
+def test_range_filter_validation(client):
+    """Нечисловая граница диапазона - ошибка запроса."""
+    response = client.get(reverse('product-list'), {'param_min[Диагональ (дюйм)]': 'шесть'})
+    assert response.status_code == 400
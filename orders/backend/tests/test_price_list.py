@@ -0,0 +1,75 @@
+"""
+Тесты потокового чтения прайс-листов.
+"""
+import io
+import tracemalloc
+import types
+
+import pytest
+import yaml
+
+from backend.price_list import PriceListFormatError, read_price_list
+from backend.tests.conftest import SHOP1_PATH
+
+
+def test_read_shop1_matches_full_load():
+    """Потоковое чтение shop1.yaml совпадает с загрузкой целиком."""
+    with open(SHOP1_PATH, 'rb') as file:
+        expected = yaml.safe_load(file)
+
+    with open(SHOP1_PATH, 'rb') as file:
+        data = read_price_list(file)
+        assert isinstance(data['goods'], types.GeneratorType)
+        goods = list(data['goods'])
+
+    assert data['shop'] == expected['shop']
+    assert data['categories'] == expected['categories']
+    assert goods == expected['goods']
+
+
+def test_read_price_list_skips_unknown_keys():
+    """Неизвестные поля пропускаются, пустой goods допустим."""
+    data = read_price_list(io.StringIO('version: {a: [1, 2]}\nshop: Тест\ngoods:\n'))
+    assert data['shop'] == 'Тест'
+    assert data['categories'] == []
+    assert list(data['goods']) == []
+
+
+def test_read_price_list_goods_before_shop():
+    """goods перед shop нельзя обработать потоково."""
+    with pytest.raises(PriceListFormatError):
+        read_price_list(io.StringIO('goods: []\nshop: Тест\n'))
+
+
+def test_read_price_list_categories_after_goods():
+    """categories после goods не теряются молча: чтение товаров завершается ошибкой."""
+    data = read_price_list(io.StringIO('shop: Тест\ngoods:\n  - id: 1\ncategories:\n  - id: 1\n    name: Смартфоны\n'))
+    with pytest.raises(PriceListFormatError):
+        list(data['goods'])
+
+    data = read_price_list(io.StringIO('shop: Тест\ngoods:\n  - id: 1\nversion: 2\n'))
+    assert list(data['goods']) == [{'id': 1}]
+
+
+def test_read_price_list_bounded_memory(tmp_path):
+    """Пиковая память не растет вместе с количеством товаров."""
+    path = tmp_path / 'big.yaml'
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('shop: Тест\ncategories:\n  - id: 1\n    name: Смартфоны\ngoods:\n')
+        for i in range(5000):
+            file.write(
+                f'  - id: {i}\n    category: 1\n    model: model/{i}\n'
+                f'    name: Товар {i}\n    price: 100\n    price_rrc: 110\n    quantity: 1\n'
+                f'    parameters:\n      "Цвет": черный\n'
+            )
+
+    tracemalloc.start()
+    try:
+        with open(path, 'rb') as file:
+            count = sum(1 for _ in read_price_list(file)['goods'])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count == 5000
+    assert peak < 2 * 1024 * 1024
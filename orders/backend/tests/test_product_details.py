@@ -0,0 +1,97 @@
+"""
+Тесты карточки предложения и ее кэша.
+"""
+import pytest
+from django.urls import reverse
+
+from backend.stock_updates import apply_stock_deltas
+from backend.tests.conftest import products
+
+
+@pytest.fixture
+def no_response_cache(settings):
+    """Без кэша ответов QueryCacheMiddleware - проверяется кэш карточек."""
+    settings.MIDDLEWARE = [name for name in settings.MIDDLEWARE if not name.endswith('QueryCacheMiddleware')]
+
+
+def detail(client, product_info_id):
+    return client.get(reverse('product-detail', args=[product_info_id]))
+
+
+def offer_id(shop_name, external_id):
+    from backend.models import ProductInfo
+
+    return ProductInfo.objects.get(shop__name=shop_name, external_id=external_id).id
+
+
+def test_product_detail(two_shops):
+    """Карточка совпадает со строкой списка и содержит предложения других магазинов."""
+    rows = {row['id']: row for row in products(two_shops, page_size=10)['results']}
+    product_info_id = offer_id('Связной', 4216313)
+
+    data = detail(two_shops, product_info_id).json()
+    offers = data.pop('offers')
+    assert data == rows[product_info_id]
+    assert offers == [rows[offer_id('Евросеть', 4216313)]]
+
+    # Карточка есть и у предложения не в наличии, в offers - только предложения в наличии
+    data = detail(two_shops, offer_id('Евросеть', 4216314)).json()
+    assert (data['quantity'], data['offers']) == (0, [rows[offer_id('Связной', 4216314)]])
+    assert detail(two_shops, offer_id('Связной', 4216314)).json()['offers'] == []
+
+    assert detail(two_shops, 0).status_code == 404
+
+
+def test_product_detail_cached(two_shops, no_response_cache, django_assert_num_queries):
+    """Повторный запрос карточки не обращается к базе."""
+    product_info_id = offer_id('Связной', 4216313)
+    first = detail(two_shops, product_info_id).json()
+    first.pop('offers')
+    sibling = offer_id('Евросеть', 4216313)
+    with django_assert_num_queries(0):
+        assert detail(two_shops, sibling).json()['offers'] == [first]
+
+
+def test_product_detail_invalidation(two_shops, no_response_cache, django_capture_on_commit_callbacks):
+    """Кэш карточки сбрасывается при изменении предложений, товара и параметров только этого товара."""
+    from django.core.cache import cache
+
+    from backend.models import Parameter, Product, ProductInfo, Shop
+    from backend.signals import offers_changed
+
+    galaxy = offer_id('Связной', 4216313)
+    iphone = offer_id('Связной', 4216292)
+    detail(two_shops, galaxy)
+    detail(two_shops, iphone)
+    product = Product.objects.get(name__startswith='Смартфон Samsung')
+
+    # Остатки другого товара не сбрасывают кэш
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(Shop.objects.get(name='Связной').id, {4216292: (3, None)})
+    assert cache.get(f'product_details:{product.id}') is not None
+    assert detail(two_shops, iphone).json()['quantity'] == 3
+
+    # Цена предложения в другом магазине
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_stock_deltas(Shop.objects.get(name='Евросеть').id, {4216313: (None, 50000)})
+    assert detail(two_shops, galaxy).json()['offers'][0]['price'] == 50000
+
+    # Товар
+    with django_capture_on_commit_callbacks(execute=True):
+        product.name = 'Смартфон Samsung Galaxy S9'
+        product.save()
+    assert detail(two_shops, galaxy).json()['product']['name'] == 'Смартфон Samsung Galaxy S9'
+
+    # Параметры
+    with django_capture_on_commit_callbacks(execute=True):
+        Parameter.objects.filter(name='Цвет').update(name='Цвет корпуса')
+        Parameter.objects.get(name='Цвет корпуса').save()
+    assert 'Цвет корпуса' in detail(two_shops, galaxy).json()['product_parameters'][0].values()
+
+    # Удаленное предложение (как при импорте)
+    deleted = offer_id('Евросеть', 4216313)
+    with django_capture_on_commit_callbacks(execute=True):
+        ProductInfo.objects.filter(pk=deleted).delete()
+        offers_changed.send(sender=ProductInfo, shop_id=Shop.objects.get(name='Евросеть').id, product_info_ids={deleted})
+    assert detail(two_shops, galaxy).json()['offers'] == []
+    assert detail(two_shops, deleted).status_code == 404
@@ -0,0 +1,104 @@
+"""
+Тесты полнотекстового поиска товаров.
+"""
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from backend.importer import get_importer
+from backend.price_list import read_price_list
+from backend.tests.conftest import PRICE_LIST
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'postgresql', reason='Полнотекстовый поиск работает на PostgreSQL')
+
+
+def search(client, text, **params):
+    response = client.get(reverse('product-list'), {'search': text, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize('text, external_ids', [
+    ('смартфоны', {4216292, 4216313}),
+    ('xs-max', {4216292}),
+    ('apple -часы', {4216292}),
+    ('черные', {4216313, 4216314}),
+    ('телевизор', set()),
+])
+def test_search(client, text, external_ids):
+    """Поиск учитывает морфологию, модель, параметры и исключения."""
+    data = search(client, text)
+    assert {row['external_id'] for row in data['results']} == external_ids
+
+
+def test_search_relevance(client):
+    """Совпадение в названии важнее совпадения в параметрах."""
+    data = search(client, 'золотистый apple')
+    assert [row['external_id'] for row in data['results']] == [4216292]
+
+    ranked = search(client, 'черный', page_size=1)
+    first = ranked['results'][0]['external_id']
+    assert first == 4216313
+    following = client.get(ranked['next']).json()
+    assert [row['external_id'] for row in following['results']] == [4216314]
+    assert following['next'] is None
+
+
+def test_search_vector_follows_import(client):
+    """Вектор пересчитывается при повторном импорте с новым названием."""
+    get_importer('orm').run(read_price_list(PRICE_LIST.replace('Часы Apple Watch', 'Умные часы Apple Watch')))
+    data = search(client, 'умные')
+    assert [row['external_id'] for row in data['results']] == [4216314]
+
+
+def test_search_vector_follows_product_rename(client):
+    """Вектор пересчитывается при переименовании товара."""
+    from backend.models import Product
+
+    product = Product.objects.get(name__startswith='Часы Apple Watch')
+    product.name = 'Умные часы Apple Watch Series 4'
+    product.save()
+    data = search(client, 'умные')
+    assert [row['external_id'] for row in data['results']] == [4216314]
+
+
+@pytest.mark.parametrize('text, external_ids', [
+    ('aple iphone', {4216292}),
+    ('apple/iphone/xs-mx', {4216292}),
+    ('galxy', {4216313}),
+    ('телевизор', set()),
+])
+def test_fuzzy_search(client, text, external_ids):
+    """Нечеткий поиск находит товары по названию и модели с опечатками."""
+    data = search(client, text, fuzzy=1)
+    assert {row['external_id'] for row in data['results']} == external_ids
+
+
+def test_fuzzy_search_ranking(client, settings):
+    """Лучшее совпадение идет первым, порог сходства настраивается."""
+    data = search(client, 'apple watch', fuzzy=1)
+    assert [row['external_id'] for row in data['results']][0] == 4216314
+
+    settings.SEARCH_TRIGRAM_THRESHOLD = 0.95
+    data = search(client, 'aple iphone', fuzzy=1)
+    assert data['results'] == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fuzzy_search_threshold_is_transaction_local():
+    """Порог нечеткого поиска не остается в сеансе соединения после транзакции."""
+    from django.db import transaction
+
+    from backend.models import ProductInfo
+    from backend.search import fuzzy_search_offers, trigram_threshold
+
+    def threshold():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT current_setting('pg_trgm.word_similarity_threshold')")
+            return float(cursor.fetchone()[0])
+
+    default = threshold()
+    with transaction.atomic():
+        list(fuzzy_search_offers(ProductInfo.objects.all(), 'iphone'))
+        assert threshold() == trigram_threshold()
+    assert threshold() == default != trigram_threshold()
@@ -0,0 +1,46 @@
+"""
+Тесты быстрой сериализации списка товаров.
+"""
+import pytest
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from backend.importer import get_importer
+from backend.price_list import read_price_list
+from backend.serializers import CatalogEntrySerializer, ProductInfoSerializer
+from backend.serializers_fast import CATALOG_ENTRY_VALUES, catalog_entry_rows, product_info_rows
+from backend.tests.conftest import PRICE_LIST
+
+
+@pytest.fixture
+def catalog(db, settings, tmp_path):
+    from backend.models import Product, ProductImage
+
+    settings.MEDIA_ROOT = tmp_path
+    get_importer('orm').run(read_price_list(PRICE_LIST))
+    ProductImage.objects.create(product=Product.objects.get(name__startswith='Часы'), order=1)
+
+
+@pytest.mark.parametrize('request_factory', [None, APIRequestFactory().get])
+def test_fast_rows_render_identical_json(catalog, request_factory):
+    """JSON быстрой сериализации совпадает с сериализаторами байт в байт."""
+    from backend.models import CatalogEntry, ProductInfo, ProductParameter
+
+    request = request_factory('/api/products') if request_factory else None
+    offers = ProductInfo.objects.order_by('id')
+    expected = JSONRenderer().render(ProductInfoSerializer(
+        offers.select_related('product').prefetch_related(
+            Prefetch('product_parameters', queryset=ProductParameter.objects.select_related('parameter').order_by('id')),
+            'product__additional_images',
+        ),
+        many=True,
+        context={'request': request},
+    ).data)
+
+    assert JSONRenderer().render(product_info_rows(offers, request)) == expected
+
+    entries = CatalogEntry.objects.order_by('pk')
+    assert JSONRenderer().render(catalog_entry_rows(entries.values(*CATALOG_ENTRY_VALUES), request)) == expected
+    assert JSONRenderer().render(CatalogEntrySerializer(entries, many=True, context={'request': request}).data) == expected
+
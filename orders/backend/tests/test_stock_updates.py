@@ -0,0 +1,84 @@
+"""
+Тесты быстрого обновления остатков и цен партнера.
+"""
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.stock_updates import StockDeltaError, apply_stock_deltas, read_stock_deltas
+
+
+def jsonl(*items):
+    return '\n'.join(json.dumps(item) for item in items)
+
+
+def test_read_stock_deltas():
+    """Тест разбора пакета изменений в формате JSON Lines."""
+    deltas = read_stock_deltas([
+        b'{"external_id": 1, "quantity": 5, "price": 100}\n',
+        b'\n',
+        b'{"external_id": 2, "quantity": 0}\n',
+        b'{"external_id": 1, "price": 90}\n',
+    ])
+    assert deltas == {1: (None, 90), 2: (0, None)}
+
+    for line in ('not json', '[1]', '{"quantity": 1}', '{"external_id": 1}',
+                 '{"external_id": 1, "quantity": -1}', '{"external_id": 1, "price": "10"}',
+                 '{"external_id": 1, "quantity": 2147483648}', '{"external_id": 4294967296, "price": 1}'):
+        with pytest.raises(StockDeltaError):
+            read_stock_deltas([line])
+
+
+def test_apply_stock_deltas(shop):
+    """Изменения применяются по (shop, external_id), неизвестные ИД возвращаются."""
+    from backend.models import ProductInfo
+
+    result = apply_stock_deltas(shop.id, {
+        4216292: (0, None),
+        4216313: (9, 60000),
+        4672670: (3, 12000),
+        999: (1, 1),
+    }, batch_size=2)
+
+    assert result == {'received': 4, 'updated': 2, 'unchanged': 1, 'unknown': [999]}
+    offers = {
+        offer.external_id: (offer.quantity, offer.price)
+        for offer in ProductInfo.objects.filter(shop=shop)
+    }
+    assert offers == {4216292: (0, 110000), 4216313: (9, 60000), 4672670: (3, 12000)}
+
+
+def test_partner_stock_update(shop):
+    """Endpoint принимает JSON Lines и возвращает сводку изменений."""
+    from backend.models import ProductInfo
+    from users.models import User
+
+    client = APIClient()
+    url = reverse('partner-stock')
+
+    response = client.post(f'{url}?shop={shop.id}', jsonl({'external_id': 4216292, 'quantity': 1}),
+                           content_type='application/x-ndjson')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    client.force_authenticate(user=User.objects.create(email='partner@example.com', username='partner'))
+    response = client.post(f'{url}?shop={shop.id}', jsonl(
+        {'external_id': 4216292, 'quantity': 1},
+        {'external_id': 4672670, 'quantity': 3, 'price': 11000},
+    ), content_type='application/x-ndjson')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {'Status': True, 'received': 2, 'updated': 2, 'unchanged': 0, 'unknown': []}
+    assert ProductInfo.objects.get(shop=shop, external_id=4216292).quantity == 1
+    assert ProductInfo.objects.get(shop=shop, external_id=4672670).price == 11000
+
+    response = client.post(f'{url}?shop={shop.id}', '{"external_id": 1}', content_type='application/x-ndjson')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.post(f'{url}?shop={shop.id}', jsonl({'external_id': 4216292, 'price': 2 ** 31}),
+                           content_type='application/x-ndjson')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.post(f'{url}?shop=0', '', content_type='application/x-ndjson')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
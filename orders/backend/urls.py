@@ -8,8 +8,8 @@ from django.urls import path
 
 from backend.views_cache import CacheManagementView, CacheStatsView
 from backend.views_images import AdditionalImageDetailView, AdditionalImageListView, ImageCleanupView, ProductImageUploadView, ThumbnailGenerationView, UserAvatarUploadView
-from .views import (APIRootView, BasketDetailView, BasketView, ContactDetailView, ContactListView,
-OrderConfirmView, OrderDetailView, OrderListView, PartnerUpdate, RegisterView, LoginView, ProductListView)
+from .views import (APIRootView, BasketDetailView, BasketView, CategoryListView, ContactDetailView, ContactListView,
+OrderConfirmView, OrderDetailView, OrderListView, PartnerExport, PartnerExportJobStatusView, PartnerExportJobView, PartnerImportStatusView, PartnerStockUpdate, PartnerUpdate, RegisterView, LoginView, ProductDetailView, ProductListView, ProductOffersView, ShopListView)
 
 from .views_social import SocialAuthCallbackView, SocialAuthLoginView, SocialAuthErrorView
 
@@ -31,6 +31,11 @@ urlpatterns = [
     
     # Endpoints для партнеров
     path('partner/update', PartnerUpdate.as_view(), name='partner-update'),
+    path('partner/import/<str:job_id>', PartnerImportStatusView.as_view(), name='partner-import-status'),
+    path('partner/stock', PartnerStockUpdate.as_view(), name='partner-stock'),
+    path('partner/export', PartnerExport.as_view(), name='partner-export'),
+    path('partner/export/jobs', PartnerExportJobView.as_view(), name='partner-export-jobs'),
+    path('partner/export/jobs/<str:job_id>', PartnerExportJobStatusView.as_view(), name='partner-export-job-status'),
 
     # Endpoints для пользователей
     path('user/register', RegisterView.as_view(), name='user-register'),
@@ -40,6 +45,10 @@ urlpatterns = [
 
     # Endpoints для товаров
     path('products', ProductListView.as_view(), name='product-list'),
+    path('products/<int:product_info_id>', ProductDetailView.as_view(), name='product-detail'),
+    path('products/<int:product_id>/offers', ProductOffersView.as_view(), name='product-offers'),
+    path('categories', CategoryListView.as_view(), name='category-list'),
+    path('shops', ShopListView.as_view(), name='shop-list'),
 
     # Endpoints для корзины
     path('basket', BasketView.as_view(), name='basket'),
@@ -5,26 +5,49 @@
 товарами, корзиной и заказами.
 """
 
-from django.shortcuts import render
+from contextlib import nullcontext
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
-from requests import get
-from yaml import load as load_yaml, Loader
+from django.urls import reverse
 
 from users.models import User
-from .models import Contact, Order, OrderItem, Shop, Category, Product, ProductInfo, Parameter, ProductParameter
-from .serializers import ContactSerializer, OrderItemSerializer, OrderSerializer, ProductInfoSerializer, ShopSerializer, UserSerializer
+from .models import CatalogEntry, Contact, Order, OrderItem, Shop, Category, ProductInfo
+from .serializers import (
+    CatalogEntrySerializer, CategoryStatsSerializer, ContactSerializer, OrderItemSerializer, OrderSerializer,
+    ShopStatsSerializer, UserSerializer,
+)
+from .best_offers import BEST_OFFER_QUERY_PARAM, best_offers, get_product_offers
+from .catalog_index import get_catalog_index
+from .catalog_stats import annotate_catalog_stats
+from .catalog_version import catalog_etag, get_catalog_version
+from .product_details import get_offer_details
+from .fieldsets import EXPAND_QUERY_PARAM, FIELDS_QUERY_PARAM, SparseFieldsetMixin, parse_expand, parse_fieldset
+from .serializers_fast import catalog_entry_columns, catalog_entry_rows, shape_catalog_entry_rows, validate_catalog_entry_fieldset
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.db.models import Q
 from django.db import transaction
 from rest_framework.authtoken.models import Token
 from .emails import send_order_confirmation_email, send_registration_email
+from .import_jobs import create_job, get_job, job_as_dict
+from .export_jobs import SNAPSHOT_FORMATS, create_export_job, export_job_as_dict, get_export_job
+from .exporter import EXPORT_FORMATS, iter_price_list
+from .importer import IMPORT_ENGINES
+from .facets import (
+    count_facets, filter_by_params, filter_by_ranges, parse_param_filters, parse_range_filters,
+    precomputed_facet_counts,
+)
+from .pagination import KeysetPagination
+from .search import full_text_search_enabled, fuzzy_search_offers, search_offers
+from .stock_updates import StockDeltaError, apply_stock_deltas, read_stock_deltas
+from .tasks_export import export_catalog_task
+from .tasks_import import import_price_list_task
 
 from rest_framework.throttling import ScopedRateThrottle
 
@@ -42,13 +65,15 @@ class PartnerUpdate(APIView):
     
     def post(self, request, *args, **kwargs):
         """
-        Загружает товары из YAML файла по указанному URL.
+        Ставит в очередь задачу импорта товаров из YAML файла по указанному URL.
         
         Args:
             request: Запрос с данными, содержащими URL YAML файла
+                и (опционально) движок импорта engine: orm или copy,
+                флаг force - импортировать, даже если прайс-лист не изменился
             
         Returns:
-            JsonResponse: Результат операции импорта
+            JsonResponse: Идентификатор задачи импорта и адрес для опроса статуса
         """
         if not request.user.is_authenticated:
             return JsonResponse({'Status': False, 'Error': 'Log in required'}, status=403)
@@ -61,51 +86,238 @@ class PartnerUpdate(APIView):
             except ValidationError as e:
                 return JsonResponse({'Status': False, 'Error': str(e)})
             else:
+                engine = request.data.get('engine')
+                if engine and engine not in IMPORT_ENGINES:
+                    return JsonResponse({'Status': False, 'Error': f'Неизвестный движок импорта: {engine}'})
+                force = str(request.data.get('force', '')).lower() in ('1', 'true', 'yes')
                 try:
-                    stream = get(url).content
-                    data = load_yaml(stream, Loader=Loader)
-                    shop, _ = Shop.objects.get_or_create(name=data['shop'])
-                    for category in data['categories']:
-                        category_object, _ = Category.objects.get_or_create(
-                            id=category['id'],
-                            name=category['name']
-                        )
-                        category_object.shops.add(shop.id)
-                        category_object.save()
-                    
-                    ProductInfo.objects.filter(shop_id=shop.id).delete()
-                    
-                    for item in data['goods']:
-                        product, _ = Product.objects.get_or_create(
-                            name=item['name'],
-                            category_id=item['category']
-                        )
-
-                        product_info = ProductInfo.objects.create(
-                            product_id=product.id,
-                            external_id=item['id'],
-                            model=item['model'],
-                            price=item['price'],
-                            price_rrc=item['price_rrc'],
-                            quantity=item['quantity'],
-                            shop_id=shop.id
-                        )
-
-                        for name, value in item['parameters'].items():
-                            parameter_object, _ = Parameter.objects.get_or_create(name=name)
-                            ProductParameter.objects.create(
-                                product_info_id=product_info.id,
-                                parameter_id=parameter_object.id,
-                                value=value
-                            )
-                    
-                    return JsonResponse({'Status': True})
-                
+                    job = create_job(request.user.id, url)
+                    import_price_list_task.delay(job['id'], url, engine, force)
                 except Exception as e:
                     return JsonResponse({'Status': False, 'Error': str(e)})
+
+                return JsonResponse({
+                    'Status': True,
+                    'job_id': job['id'],
+                    'status_url': reverse('partner-import-status', kwargs={'job_id': job['id']}),
+                }, status=202)
         
         return JsonResponse({'Status': False, 'Errors': 'Не указаны все необходимые аргументы'})
-    
+
+
+class PartnerImportStatusView(APIView):
+    """
+    API endpoint для получения статуса асинхронного импорта прайс-листа.
+
+    Состояние читается из Redis, запрос не обращается к базе данных.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id, *args, **kwargs):
+        """
+        Возвращает состояние, прогресс, скорость, ошибки и длительность импорта.
+
+        Args:
+            request: Запрос
+            job_id: Идентификатор задачи импорта
+
+        Returns:
+            Response: Состояние задачи импорта
+        """
+        job = get_job(job_id)
+        if job is None or (job['user_id'] != request.user.id and not request.user.is_staff):
+            return Response(
+                {'Status': False, 'Error': 'Задача импорта не найдена'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response({'Status': True, 'Job': job_as_dict(job)})
+
+
+def get_partner_shop(request):
+    """
+    Возвращает магазин из параметра shop запроса партнера.
+
+    Returns:
+        tuple: (Shop, None) или (None, Response с ошибкой)
+    """
+    shop_id = request.query_params.get('shop')
+    if not shop_id or not shop_id.isdigit():
+        return None, Response(
+            {'Status': False, 'Error': 'Не указан магазин (shop)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    shop = Shop.objects.filter(id=shop_id).first()
+    if shop is None:
+        return None, Response(
+            {'Status': False, 'Error': 'Магазин не найден'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return shop, None
+
+
+class PartnerStockUpdate(APIView):
+    """
+    API endpoint для частого обновления остатков и цен партнера.
+
+    Принимает пакет изменений в формате JSON Lines без полного
+    импорта прайс-листа.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'partner_stock'
+
+    def post(self, request, *args, **kwargs):
+        """
+        Применяет изменения остатков и цен к предложениям магазина.
+
+        Args:
+            request: Запрос с параметром shop (ИД магазина) и телом
+                в формате JSON Lines: {"external_id": 1, "quantity": 5, "price": 100}
+
+        Returns:
+            Response: Число полученных, измененных и неизмененных строк,
+                неизвестные external_id
+        """
+        shop, error = get_partner_shop(request)
+        if error:
+            return error
+
+        try:
+            deltas = read_stock_deltas(request.stream or ())
+        except StockDeltaError as e:
+            return Response({'Status': False, 'Error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'Status': True, **apply_stock_deltas(shop.id, deltas)})
+
+
+class PartnerExport(APIView):
+    """
+    API endpoint для потоковой выгрузки каталога магазина.
+
+    Каталог отдается в схеме прайс-листа (как для импорта) по частям,
+    без загрузки всех предложений в память.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'partner'
+
+    def get(self, request, *args, **kwargs):
+        """
+        Выгружает каталог магазина.
+
+        Args:
+            request: Запрос с параметрами shop (ИД магазина)
+                и output - формат выгрузки: yaml (по умолчанию) или json
+
+        Returns:
+            StreamingHttpResponse: Прайс-лист магазина
+        """
+        shop, error = get_partner_shop(request)
+        if error:
+            return error
+
+        # Параметр format зарезервирован DRF для выбора рендерера
+        export_format = request.query_params.get('output', 'yaml')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'Status': False, 'Error': f'Неизвестный формат экспорта: {export_format}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(
+            iter_price_list(shop, export_format),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="shop_{shop.id}.{export_format}"'
+        return response
+
+
+class PartnerExportJobView(APIView):
+    """
+    API endpoint для запуска асинхронной выгрузки каталога в файл.
+
+    Выгрузка всего каталога доступна только администраторам.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'partner'
+
+    def post(self, request, *args, **kwargs):
+        """
+        Ставит в очередь задачу выгрузки каталога.
+
+        Args:
+            request: Запрос с форматом format (yaml, jsonl или csv)
+                и списком ИД магазинов shops (без него - весь каталог)
+
+        Returns:
+            Response: Идентификатор задачи выгрузки и адрес для опроса статуса
+        """
+        export_format = request.data.get('format', 'jsonl')
+        if export_format not in SNAPSHOT_FORMATS:
+            return Response(
+                {'Status': False, 'Error': f'Неизвестный формат выгрузки: {export_format}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        shops = request.data.get('shops') or []
+        if not isinstance(shops, list) or not all(str(shop_id).isdigit() for shop_id in shops):
+            return Response(
+                {'Status': False, 'Error': 'shops должен быть списком ИД магазинов'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        shop_ids = sorted({int(shop_id) for shop_id in shops})
+        if not shop_ids and not request.user.is_staff:
+            return Response(
+                {'Status': False, 'Error': 'Выгрузка всего каталога доступна только администраторам'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if Shop.objects.filter(id__in=shop_ids).count() != len(shop_ids):
+            return Response(
+                {'Status': False, 'Error': 'Магазин не найден'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        job = create_export_job(request.user.id, shop_ids, export_format)
+        export_catalog_task.delay(job['id'], shop_ids, export_format)
+        return Response({
+            'Status': True,
+            'job_id': job['id'],
+            'status_url': reverse('partner-export-job-status', kwargs={'job_id': job['id']}),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class PartnerExportJobStatusView(APIView):
+    """
+    API endpoint для получения статуса выгрузки и ссылки на файл.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id, *args, **kwargs):
+        """
+        Возвращает состояние выгрузки и, после завершения, ссылку на файл.
+
+        Args:
+            request: Запрос
+            job_id: Идентификатор задачи выгрузки
+
+        Returns:
+            Response: Состояние задачи выгрузки
+        """
+        job = get_export_job(job_id)
+        if job is None or (job['user_id'] != request.user.id and not request.user.is_staff):
+            return Response(
+                {'Status': False, 'Error': 'Задача выгрузки не найдена'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response({'Status': True, 'Job': export_job_as_dict(job)})
+
+
 class RegisterView(APIView):
     """
     API endpoint для регистрации новых пользователей.
@@ -227,37 +439,360 @@ class ProductListView(generics.ListAPIView):
     API endpoint для получения списка товаров.
     
     Поддерживает фильтрацию по категории, магазину и поиск.
+    Выдача постраничная по курсору (см. KeysetPagination):
+    ?ordering=id|-id|price|-price, ?page_size=, ?cursor=.
+    Поиск ?search= на PostgreSQL полнотекстовый (см. backend.search),
+    с ?fuzzy=1 - нечеткий, с учетом опечаток (pg_trgm). Результаты
+    поиска дополнительно сортируются по relevance.
+    Фильтры по параметрам: ?param[<имя>]=<значение> и диапазоны числовых
+    значений ?param_min[<имя>]=, ?param_max[<имя>]= (см. backend.facets);
+    первая страница содержит счетчики значений параметров facets.
+
+    Строки списка читаются из витрины каталога CatalogEntry. Без поиска и
+    фильтров по параметрам выдача целиком выбирается из витрины, иначе
+    предложения отбираются по ProductInfo, а строки страницы берутся из
+    витрины по идентификаторам. Строки сериализуются как словари
+    .values() (см. backend.serializers_fast), ответ совпадает с
+    CatalogEntrySerializer.
+
+    ?fields=id,price,product.name,product.thumbnail_url оставляет в строках
+    только перечисленные поля, из витрины читаются только их столбцы;
+    ?expand=shop,product.category раскрывает магазин и категорию в объекты
+    (см. backend.fieldsets).
+
+    ?best_offer=1 оставляет для каждого товара только самое дешевое
+    предложение в наличии среди всех магазинов (см. backend.best_offers);
+    результаты поиска в этом режиме сортируются по цене или id.
+
+    Ответы поддерживают условные запросы: ETag и If-None-Match (304).
+    При CATALOG_INDEX_ENABLED запросы без поиска и фильтров по параметрам
+    выполняются по индексу каталога в памяти процесса (см.
+    backend.catalog_index).
     """
 
-    serializer_class = ProductInfoSerializer
+    serializer_class = CatalogEntrySerializer
+    pagination_class = KeysetPagination
+
+    # Ключи сортировки витрины: первичный ключ CatalogEntry - product_info
+    catalog_entry_orderings = {
+        'id': ('product_info_id',),
+        '-id': ('-product_info_id',),
+        'price': ('price', 'product_info_id'),
+        '-price': ('-price', '-product_info_id'),
+    }
+
+    def get_fieldset(self):
+        """
+        Возвращает проверенные (дерево полей, раскрываемые связи) из ?fields= и ?expand=.
+        """
+        fieldset = parse_fieldset(self.request.query_params.get(FIELDS_QUERY_PARAM))
+        expand = parse_expand(self.request.query_params.get(EXPAND_QUERY_PARAM))
+        validate_catalog_entry_fieldset(fieldset, expand)
+        return fieldset, expand
+
+    def get_catalog_entry_columns(self):
+        """
+        Столбцы витрины для запрошенных полей и ключа сортировки.
+        """
+        fieldset, _ = self.get_fieldset()
+        return list(dict.fromkeys(['product_info_id', 'price', *catalog_entry_columns(fieldset)]))
+
+    def uses_offer_filters(self):
+        """
+        Есть ли в запросе поиск или фильтры по параметрам, требующие ProductInfo.
+        """
+        query_params = self.request.query_params
+        return bool(
+            query_params.get('search') or parse_param_filters(query_params) or parse_range_filters(query_params)
+        )
+
+    def uses_best_offers(self):
+        """
+        Запрошены ли только лучшие предложения товаров (?best_offer=1).
+        """
+        return self.request.query_params.get(BEST_OFFER_QUERY_PARAM) in ('1', 'true')
+
+    def uses_fuzzy_search(self):
+        """
+        Запрошен ли нечеткий поиск (?search=...&fuzzy=1).
+        """
+        query_params = self.request.query_params
+        return bool(query_params.get('search')) and query_params.get('fuzzy') in ('1', 'true')
 
     def get_queryset(self):
         """
         Возвращает отфильтрованный queryset товаров.
         
         Returns:
-            QuerySet: Отфильтрованный список товаров
+            QuerySet: Строки витрины или отобранные предложения
         """
-        queryset = ProductInfo.objects.filter(
-            quantity__gt=0
-        ).select_related('product', 'shop', 'product__category').prefetch_related('product_parameters')
-
         category_id = self.request.query_params.get('category_id')
+        shop_id = self.request.query_params.get('shop_id')
+
+        if not self.uses_offer_filters():
+            queryset = CatalogEntry.objects.filter(quantity__gt=0)
+            if category_id:
+                queryset = queryset.filter(category_id=category_id)
+            if shop_id:
+                queryset = queryset.filter(shop_id=shop_id)
+            if self.uses_best_offers():
+                queryset = best_offers(queryset)
+            self.keyset_orderings = self.catalog_entry_orderings
+            return queryset.values(*self.get_catalog_entry_columns())
+
+        queryset = ProductInfo.objects.filter(quantity__gt=0).only('id', 'price')
+
         if category_id:
             queryset = queryset.filter(product__category_id=category_id)
 
-        shop_id = self.request.query_params.get('shop_id')
         if shop_id:
             queryset = queryset.filter(shop_id=shop_id)
 
+        param_filters = parse_param_filters(self.request.query_params)
+        if param_filters:
+            queryset = filter_by_params(queryset, param_filters)
+        range_filters = parse_range_filters(self.request.query_params)
+        if range_filters:
+            queryset = filter_by_ranges(queryset, range_filters)
+
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(product__name__icontains=search) |
-                Q(model__icontains=search)
-            )
+            if self.uses_fuzzy_search():
+                queryset = fuzzy_search_offers(queryset, search)
+            else:
+                queryset = search_offers(queryset, search)
+            if full_text_search_enabled() and not self.uses_best_offers():
+                # Результаты поиска по умолчанию упорядочены по релевантности
+                self.keyset_orderings = {'relevance': ('-rank', '-id')}
+                self.keyset_default_ordering = 'relevance'
+        if self.uses_best_offers():
+            queryset = best_offers(queryset).only('id', 'price')
         return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Возвращает страницу товаров, на первой странице - со счетчиками фасетов.
+
+        Ответ содержит ETag, зависящий от версии каталога и параметров
+        запроса. Если ETag из If-None-Match совпадает, возвращается 304 без
+        запросов к каталогу. Индекс каталога сверяется с текущей версией, а
+        страница по индексу получает ETag версии индекса.
+        """
+        shop_id = request.query_params.get('shop_id')
+        shop_id = int(shop_id) if shop_id and shop_id.isdigit() else None
+        etag = catalog_etag(request, shop_id)
+        conditional_response = get_conditional_response(request, etag=etag)
+        if conditional_response is not None:
+            conditional_response['ETag'] = etag
+            return conditional_response
+
+        # Порог нечеткого поиска действует до конца транзакции (см. fuzzy_search_offers)
+        with transaction.atomic() if self.uses_fuzzy_search() else nullcontext():
+            index = None
+            if not (self.uses_offer_filters() or self.uses_best_offers()):
+                index = get_catalog_index(get_catalog_version())
+            page = self.paginate_catalog_index(index) if index is not None else None
+            if page is not None:
+                # Индекс мог обновиться после чтения версии для ETag
+                etag = catalog_etag(request, shop_id, index.catalog_version(shop_id))
+            queryset = None
+            if page is None:
+                queryset = self.filter_queryset(self.get_queryset())
+                page = self.paginate_queryset(queryset)
+                if page and not isinstance(page[0], dict):
+                    page = self.load_catalog_entries([offer.id for offer in page])
+            # Строки .values() сериализуются без полей DRF (см. backend.serializers_fast)
+            fieldset, expand = self.get_fieldset()
+            if fieldset is None and not expand:
+                results = catalog_entry_rows(page, request)
+            else:
+                results = shape_catalog_entry_rows(page, fieldset, expand, request)
+            response = self.get_paginated_response(results)
+            if not request.query_params.get('cursor'):
+                response.data['facets'] = self.get_facets(queryset)
+        response['ETag'] = etag
+        return response
+
+    def load_catalog_entries(self, product_info_ids):
+        """
+        Загружает строки витрины по идентификаторам предложений в заданном порядке.
+        """
+        entries = {
+            entry['product_info_id']: entry
+            for entry in CatalogEntry.objects.filter(pk__in=product_info_ids).values(*self.get_catalog_entry_columns())
+        }
+        return [entries[product_info_id] for product_info_id in product_info_ids if product_info_id in entries]
+
+    def paginate_catalog_index(self, index):
+        """
+        Выбирает страницу по индексу каталога в памяти (см. backend.catalog_index).
+
+        Индекс отбирает и сортирует идентификаторы страницы, строки витрины
+        загружаются одним запросом по первичному ключу.
+
+        Returns:
+            list: Строки страницы или None, если запрос не поддерживается индексом
+        """
+        filters = {}
+        for name in ('category_id', 'shop_id'):
+            value = self.request.query_params.get(name)
+            if value:
+                if not value.isdigit():
+                    return None
+                filters[name] = int(value)
+        self.keyset_orderings = self.catalog_entry_orderings
+
+        def fetch(fields, values, direction, limit):
+            return self.load_catalog_entries(index.select(fields, values, direction, limit, **filters))
+
+        return self.paginator.paginate(fetch, self.request, view=self)
+
+    def get_facets(self, queryset):
+        """
+        Счетчики значений параметров для текущего набора фильтров.
+
+        Без поиска и фильтров по параметрам (в том числе диапазонных) берутся из предрасчитанного
+        FacetCount, иначе считаются по отобранным предложениям.
+
+        Returns:
+            dict: {параметр: {значение: число предложений}}
+        """
+        if self.uses_offer_filters():
+            return count_facets(queryset)
+        if self.uses_best_offers():
+            # Счетчики по лучшим предложениям, а не по всем предложениям витрины
+            return count_facets(ProductInfo.objects.filter(pk__in=queryset.values('pk')))
+        query_params = self.request.query_params
+        return precomputed_facet_counts(
+            category_id=query_params.get('category_id'),
+            shop_id=query_params.get('shop_id'),
+        )
     
+class ProductOffersView(APIView):
+    """
+    API endpoint предложений товара во всех магазинах.
+
+    GET: предложения товара в наличии по возрастанию цены и лучшее
+    (самое дешевое) предложение best_offer (см. backend.best_offers).
+    Строки в формате списка товаров; ответ поддерживает ETag и
+    If-None-Match (304).
+    """
+
+    def get(self, request, product_id):
+        """
+        Возвращает предложения товара.
+
+        Args:
+            product_id (int): Товар
+
+        Returns:
+            Response: product_id, best_offer (None - нет в наличии) и offers
+        """
+        etag = catalog_etag(request)
+        conditional_response = get_conditional_response(request, etag=etag)
+        if conditional_response is not None:
+            conditional_response['ETag'] = etag
+            return conditional_response
+
+        offers = get_product_offers(product_id)
+        if offers is None:
+            return Response({'Status': False, 'Error': 'Товар не найден'}, status=status.HTTP_404_NOT_FOUND)
+
+        offers = catalog_entry_rows(offers, request)
+        response = Response({
+            'product_id': product_id,
+            'best_offer': offers[0] if offers else None,
+            'offers': offers,
+        })
+        response['ETag'] = etag
+        return response
+
+class ProductDetailView(APIView):
+    """
+    API endpoint карточки предложения.
+
+    GET: предложение в формате списка товаров (все параметры и
+    изображения товара) и предложения того же товара в других магазинах
+    offers по возрастанию цены. Данные товара кэшируются до изменения
+    его предложений, самого товара или параметров (см.
+    backend.product_details); ответ поддерживает ETag и If-None-Match (304).
+    """
+
+    def get(self, request, product_info_id):
+        """
+        Возвращает карточку предложения.
+
+        Args:
+            product_info_id (int): Предложение
+
+        Returns:
+            Response: Строка предложения с полем offers
+        """
+        etag = catalog_etag(request)
+        conditional_response = get_conditional_response(request, etag=etag)
+        if conditional_response is not None:
+            conditional_response['ETag'] = etag
+            return conditional_response
+
+        details = get_offer_details(product_info_id)
+        if details is None:
+            return Response({'Status': False, 'Error': 'Предложение не найдено'}, status=status.HTTP_404_NOT_FOUND)
+
+        offer, siblings = details
+        data = catalog_entry_rows([offer], request)[0]
+        data['offers'] = catalog_entry_rows(siblings, request)
+        response = Response(data)
+        response['ETag'] = etag
+        return response
+
+class CatalogStatsListView(generics.ListAPIView):
+    """
+    Базовый справочник со статистикой каталога: число предложений в
+    наличии offers и диапазон цен min_price, max_price (см.
+    backend.catalog_stats). Параметр filter_param ограничивает статистику
+    одной категорией или одним магазином.
+    """
+
+    filter_param = None
+
+    def list(self, request, *args, **kwargs):
+        value = request.query_params.get(self.filter_param)
+        if value is not None and not value.isdigit():
+            return Response(
+                {'Status': False, 'Error': f'Некорректный параметр {self.filter_param}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        value = self.request.query_params.get(self.filter_param)
+        filters = {self.filter_param: int(value)} if value else {}
+        return annotate_catalog_stats(self.queryset.all(), **filters)
+
+class CategoryListView(CatalogStatsListView):
+    """
+    API endpoint справочника категорий.
+
+    GET: категории с числом предложений в наличии и диапазоном цен;
+    ?shop_id= - только по предложениям магазина.
+    """
+
+    queryset = Category.objects.all()
+    serializer_class = CategoryStatsSerializer
+    filter_param = 'shop_id'
+
+class ShopListView(CatalogStatsListView):
+    """
+    API endpoint справочника магазинов.
+
+    GET: магазины с числом предложений в наличии и диапазоном цен;
+    ?category_id= - только по предложениям категории.
+    """
+
+    queryset = Shop.objects.all()
+    serializer_class = ShopStatsSerializer
+    filter_param = 'category_id'
+
 class ContactListView(generics.ListCreateAPIView):
     """
     API endpoint для работы с контактами пользователя.
@@ -443,7 +978,7 @@ class OrderConfirmView(APIView):
                         )
                     
                     item.product_info.quantity -= item.quantity
-                    item.product_info.save()
+                    item.product_info.save(update_fields=['quantity'])
 
                 order.state ='new'
                 order.contact = contact
@@ -467,15 +1002,18 @@ class OrderConfirmView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-class OrderListView(generics.ListAPIView):
+class OrderListView(SparseFieldsetMixin, generics.ListAPIView):
     """
     API endpoint для получения списка заказов пользователя.
     
     Не включает заказы со статусом 'basket' (корзина).
+    Поддерживает ?fields= (например, ?fields=id,dt,state): позиции
+    заказов подгружаются, только если запрошено поле ordered_items.
     """
 
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    fieldset_prefetch = {'ordered_items': ('ordered_items',)}
 
     def get_queryset(self):
         """
@@ -484,17 +1022,20 @@ class OrderListView(generics.ListAPIView):
         Returns:
             QuerySet: Заказы пользователя
         """
-        return Order.objects.filter(
+        return self.prefetch_fieldset(Order.objects.filter(
             user=self.request.user
-        ).exclude(state='basket').order_by('-dt')
+        ).exclude(state='basket').order_by('-dt'))
     
-class OrderDetailView(generics.RetrieveAPIView):
+class OrderDetailView(SparseFieldsetMixin, generics.RetrieveAPIView):
     """
     API endpoint для получения деталей конкретного заказа.
+
+    Поддерживает ?fields= (см. OrderListView).
     """
 
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    fieldset_prefetch = {'ordered_items': ('ordered_items',)}
     
     def get_queryset(self):
         """
@@ -503,7 +1044,7 @@ class OrderDetailView(generics.RetrieveAPIView):
         Returns:
             QuerySet: Заказы пользователя
         """
-        return Order.objects.filter(user=self.request.user)
+        return self.prefetch_fieldset(Order.objects.filter(user=self.request.user))
     
 class APIRootView(APIView):
     """
@@ -527,6 +1068,11 @@ class APIRootView(APIView):
             'endpoints': {
                 'partner': {
                     'update': '/api/partner/update',
+                    'import_status': '/api/partner/import/<id>',
+                    'stock': '/api/partner/stock?shop=<id>',
+                    'export': '/api/partner/export?shop=<id>&output=yaml|json',
+                    'export_jobs': '/api/partner/export/jobs',
+                    'export_job_status': '/api/partner/export/jobs/<id>',
                     'description': 'Обновление товаров партнера'
                 },
                 'user': {
@@ -538,8 +1084,18 @@ class APIRootView(APIView):
                 },
                 'products': {
                     'list': '/api/products',
+                    'detail': '/api/products/<product_info_id>',
+                    'offers': '/api/products/<id>/offers',
                     'description': 'Список товаров с фильтрацией'
                 },
+                'categories': {
+                    'list': '/api/categories',
+                    'description': 'Категории с числом предложений и диапазоном цен'
+                },
+                'shops': {
+                    'list': '/api/shops',
+                    'description': 'Магазины с числом предложений и диапазоном цен'
+                },
                 'basket': {
                     'list_create': '/api/basket',
                     'detail': '/api/basket/<id>',
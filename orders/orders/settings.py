@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Сторонние приложения
     'rest_framework',
@@ -217,6 +218,7 @@ REST_FRAMEWORK = {
         'register': '10/hour',
         'login': '20/hour',
         'partner': '50/day',
+        'partner_stock': '2000/day',
     },
 }
 
@@ -260,6 +262,9 @@ CACHALOT_ONLY_CACHEBLE_TABLES = (
     'backend_productinfo',
     'backend_parameter',
     'backend_productparameter',
+    'backend_facetvalue',
+    'backend_facetcount',
+    'backend_catalogstats',
     'users_user',
 )
 
@@ -267,12 +272,40 @@ CACHALOT_QUERY_KEYGEN = 'cachalot.utils.get_query_cache_key'
 CACHALOT_TABLE_KEYGEN = 'cachalot.utils.get_table_cache_key'
 
 CACHALOT_INVALID_RAW = True
+# Не кэшировать .iterator(): иначе результат целиком читается в память
+CACHALOT_CACHE_ITERATORS = False
 CACHALOT_CACHE_RANDOM = True
 
 if DEBUG:
     CACHALOT_ENABLED = True
     CACHALOT_TIMEOUT = 60 * 5
 
+# Настройки импорта прайс-листов
+PRICE_LIST_IMPORT_BATCH_SIZE = int(os.getenv('PRICE_LIST_IMPORT_BATCH_SIZE', 1000))
+# Движок импорта: orm (bulk_create/bulk_update) или copy (PostgreSQL COPY)
+PRICE_LIST_IMPORT_ENGINE = os.getenv('PRICE_LIST_IMPORT_ENGINE', 'orm')
+PRICE_LIST_IMPORT_JOB_TTL = 60 * 60 * 24
+# Таймауты загрузки прайс-листа (подключение, чтение), сек
+PRICE_LIST_DOWNLOAD_TIMEOUT = (10, 60)
+# Размер пакета чтения предложений при потоковой выгрузке каталога
+PARTNER_EXPORT_CHUNK_SIZE = int(os.getenv('PARTNER_EXPORT_CHUNK_SIZE', 2000))
+
+# Настройки каталога
+# Размер страницы списка товаров и его верхняя граница (?page_size=)
+PRODUCT_LIST_PAGE_SIZE = 50
+PRODUCT_LIST_MAX_PAGE_SIZE = 200
+# Конфигурация полнотекстового поиска PostgreSQL (морфология языка)
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'russian')
+# Порог сходства слов для нечеткого поиска (?fuzzy=1), от 0 до 1
+SEARCH_TRIGRAM_THRESHOLD = float(os.getenv('SEARCH_TRIGRAM_THRESHOLD', 0.4))
+# Индекс каталога в памяти веб-процесса (требует numpy) и интервал сверки его версии, сек
+CATALOG_INDEX_ENABLED = os.getenv('CATALOG_INDEX_ENABLED', 'False') == 'True'
+CATALOG_INDEX_CHECK_INTERVAL = float(os.getenv('CATALOG_INDEX_CHECK_INTERVAL', 1.0))
+# Общий для процессов снимок индекса каталога (mmap), его каталог и задержка записи после изменений, сек
+CATALOG_SNAPSHOT_ENABLED = os.getenv('CATALOG_SNAPSHOT_ENABLED', 'False') == 'True'
+CATALOG_SNAPSHOT_DIR = os.getenv('CATALOG_SNAPSHOT_DIR', os.path.join(BASE_DIR, 'catalog_snapshot'))
+CATALOG_SNAPSHOT_DELAY = int(os.getenv('CATALOG_SNAPSHOT_DELAY', 30))
+
 # Настройки email
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_HOST = 'localhost'